@@ -0,0 +1,569 @@
+import json
+import os
+import random
+import struct
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Self
+from urllib.parse import parse_qs, urlsplit
+
+# 每个目录中的文件数，生成的目录树大约为 files / FILES_PER_DIR 个目录，两层嵌套
+FILES_PER_DIR = 100
+DIRS_PER_PARENT = 50
+
+
+def make_tree(root: Path, files: int) -> Path:
+    """生成合成目录树，文件内容为 0~4KB 的稀疏大小（只 truncate，不写数据）。
+
+    目录结构: root/d{i}/s{j}/f{k}.bin，已存在且文件数一致时直接复用
+    """
+    marker = root / ".bench_tree"
+    if marker.exists() and marker.read_text() == str(files):
+        return root
+
+    root.mkdir(parents=True, exist_ok=True)
+    created = 0
+    leaf = 0
+    while created < files:
+        parent = root / f"d{leaf // DIRS_PER_PARENT}"
+        directory = parent / f"s{leaf % DIRS_PER_PARENT}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for k in range(min(FILES_PER_DIR, files - created)):
+            with open(directory / f"f{k}.bin", "wb") as f:
+                f.truncate((created + k) % 4096)
+        created += FILES_PER_DIR
+        leaf += 1
+
+    marker.write_text(str(files))
+    return root
+
+
+def _align(n: int, alignment: int) -> int:
+    return (n + alignment - 1) // alignment * alignment
+
+
+def build_pe(version=(1, 2, 3, 4), pe32_plus: bool = False, payload: int = 0) -> bytes:
+    """构造一个最小的、带 VS_VERSIONINFO 资源的 PE 文件。
+
+    只包含一个 .rsrc 节，payload 为追加在末尾的填充字节数，用于模拟大体积 exe
+    """
+    ms = (version[0] << 16) | version[1]
+    ls = (version[2] << 16) | version[3]
+
+    # VS_VERSIONINFO: 头部 + "VS_VERSION_INFO" 键 + 对齐 + VS_FIXEDFILEINFO
+    key = "VS_VERSION_INFO\0".encode("utf-16-le")
+    fixed = struct.pack("<13I", 0xFEEF04BD, 0x10000, ms, ls, ms, ls, 0x3F, 0, 4, 1, 0, 0, 0)
+    header = 6 + len(key)
+    body = struct.pack("<HH", len(fixed), 0) + key + b"\0" * (_align(header, 4) - header) + fixed
+    version_info = struct.pack("<H", len(body) + 2) + body
+
+    # 资源目录: 根 -> 类型 16 -> 名称 1 -> 语言 0x409 -> 数据项
+    section_rva = 0x1000
+
+    def directory(entries):
+        return struct.pack("<IIHHHH", 0, 0, 0, 0, 0, len(entries)) + b"".join(
+            struct.pack("<II", ident, offset) for ident, offset in entries
+        )
+
+    type_dir, name_dir, data_entry, data = 24, 48, 72, 88
+    rsrc = directory([(16, 0x80000000 | type_dir)])
+    rsrc += directory([(1, 0x80000000 | name_dir)])
+    rsrc += directory([(0x409, data_entry)])
+    rsrc += struct.pack("<IIII", section_rva + data, len(version_info), 0, 0)
+    rsrc += version_info
+    raw_size = _align(len(rsrc), 0x200)
+    rsrc = rsrc.ljust(raw_size, b"\0")
+
+    optional_size = 240 if pe32_plus else 224
+    pe_offset = 0x80
+    headers_size = _align(pe_offset + 4 + 20 + optional_size + 40, 0x200)
+
+    dos = (b"MZ" + b"\0" * 0x3A + struct.pack("<I", pe_offset)).ljust(pe_offset, b"\0")
+    coff = struct.pack("<HHIIIHH", 0x8664 if pe32_plus else 0x14C, 1, 0, 0, 0, optional_size, 0x22)
+    optional = bytearray(optional_size)
+    struct.pack_into("<H", optional, 0, 0x20B if pe32_plus else 0x10B)
+    count_offset, dirs_offset = (108, 112) if pe32_plus else (92, 96)
+    struct.pack_into("<I", optional, count_offset, 16)
+    struct.pack_into("<II", optional, dirs_offset + 2 * 8, section_rva, raw_size)
+    section = struct.pack(
+        "<8sIIIIIIHHI", b".rsrc", raw_size, section_rva, raw_size, headers_size, 0, 0, 0, 0, 0x40000040
+    )
+
+    headers = (dos + b"PE\0\0" + coff + bytes(optional) + section).ljust(headers_size, b"\0")
+    return headers + rsrc + b"\0" * payload
+
+
+def write_pe(path: Path, version=(1, 2, 3, 4), payload: int = 0) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(build_pe(version, payload=payload))
+    return path
+
+
+class DummyProcesses:
+    """启动若干个名称可被进程注册表匹配的空闲进程。
+
+    以 `python <dir>/<name>.exe` 的形式运行一个 sleep 脚本，
+    注册表通过命令行中的文件名匹配到它们
+    """
+
+    def __init__(self, directory: Path, name: str = "BenchDummy", count: int = 3):
+        self.script = directory / f"{name}.exe"
+        self.count = count
+        self._procs: list[subprocess.Popen] = []
+
+    def __enter__(self) -> Path:
+        self.script.parent.mkdir(parents=True, exist_ok=True)
+        self.script.write_text("import time\ntime.sleep(3600)\n")
+        for _ in range(self.count):
+            self._procs.append(subprocess.Popen([sys.executable, str(self.script)]))
+        # 等待进程完成启动
+        time.sleep(0.5)
+        return self.script
+
+    def __exit__(self, *exc) -> None:
+        for proc in self._procs:
+            proc.kill()
+        for proc in self._procs:
+            proc.wait()
+        self._procs.clear()
+
+
+def make_clip_store(directory: Path, count: int) -> tuple[Path, Path]:
+    """生成包含 count 条切片的 clips.jsonl 与去重索引（无封面图，避免发起网络请求）"""
+    path, index_path = directory / "clips.jsonl", directory / "clip_index.json"
+    marker = directory / ".bench_clips"
+    if marker.exists() and marker.read_text() == str(count):
+        return path, index_path
+
+    directory.mkdir(parents=True, exist_ok=True)
+    index = {}
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            bvid = f"BV1bench{i:07d}"
+            pubdate = 1_600_000_000 + i * 60
+            index[bvid] = pubdate
+            f.write(json.dumps({
+                "bvid": bvid,
+                "title": f"合成切片 #{i} " + "标题" * (i % 20),
+                "author": f"up{i % 97}",
+                "pubdate": pubdate,
+                "duration": i % 3600,
+                "play": i,
+                "cover": "",
+                "description": "",
+            }, ensure_ascii=False) + "\n")
+    index_path.write_text(json.dumps(index), encoding="utf-8")
+    marker.write_text(str(count))
+    return path, index_path
+
+
+# 合成搜索文档用的词表：中文词组与常见的英文词混排
+_SEARCH_CJK = "神经网络直播唱歌切片合集游戏恶魔姐妹可爱高能名场面翻唱联动整活日常精选中文字幕熟肉生日会"
+_SEARCH_WORDS = [
+    "neuro", "sama", "evil", "vedal", "cover", "karaoke", "minecraft", "osu",
+    "stream", "highlights", "collab", "filian", "anny", "camila", "twitch",
+]
+
+
+def make_search_docs(count: int, seed: int = 0) -> list[tuple[str, str, str]]:
+    """生成 count 条 (key, 标题, 正文) 的合成文档，中英文混排"""
+    rng = random.Random(seed)
+
+    def text(parts: int) -> str:
+        words = []
+        for _ in range(parts):
+            if rng.random() < 0.5:
+                words.append(rng.choice(_SEARCH_WORDS))
+            else:
+                words.append("".join(rng.choice(_SEARCH_CJK) for _ in range(rng.randint(2, 6))))
+        return " ".join(words)
+
+    return [
+        (f"clip:BV1bench{i:07d}", f"{text(rng.randint(2, 5))} #{i}", text(rng.randint(0, 8)))
+        for i in range(count)
+    ]
+
+
+def make_duplicate_tree(root: Path, files: int, seed: int = 0) -> tuple[Path, int]:
+    """生成含重复文件的目录树（真实内容，64 KB ~ 2 MB），返回 (根目录, 重复文件可释放的字节数)。
+
+    约 1/4 的文件是其他文件的副本；另有大小相同但内容不同、以及头尾相同只有中间不同的文件，
+    分别在快速哈希与完整哈希阶段被排除
+    """
+    marker = root / ".bench_dups"
+    expected_path = root / ".bench_dups_wasted"
+    if marker.exists() and marker.read_text() == f"{files}:{seed}":
+        return root, int(expected_path.read_text())
+
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    originals: list[bytes] = []
+    wasted = 0
+    for i in range(files):
+        directory = root / f"album{i % 20}"
+        directory.mkdir(exist_ok=True)
+        kind = rng.random()
+        if originals and kind < 0.25:
+            data = rng.choice(originals)  # 副本
+            wasted += len(data)
+        elif originals and kind < 0.35:
+            base = rng.choice(originals)
+            data = rng.randbytes(len(base))  # 大小相同、内容不同
+        elif originals and kind < 0.4 and len(rng.choice(originals)) > 256 * 1024:
+            base = rng.choice([o for o in originals if len(o) > 256 * 1024])
+            middle = len(base) // 2
+            data = base[:middle] + i.to_bytes(4, "little") + base[middle + 4:]  # 只有中间不同
+        else:
+            data = rng.randbytes(rng.randint(64 * 1024, 2 * 1024 * 1024))
+            originals.append(data)
+        (directory / f"song{i}.mp3").write_bytes(data)
+    # 硬链接不占额外空间，不应计为重复
+    first = root / "album0" / "song0.mp3"
+    hardlink = root / "album0" / "hardlink.mp3"
+    if not hardlink.exists():
+        os.link(first, hardlink)
+    expected_path.write_text(str(wasted))
+    marker.write_text(f"{files}:{seed}")
+    return root, wasted
+
+
+def touch_random_dirs(root: Path, count: int) -> None:
+    """在 count 个目录中各新增一个文件，用于测量增量扫描"""
+    dirs = sorted(p for p in root.glob("d*/s*") if p.is_dir())
+    step = max(1, len(dirs) // max(1, count))
+    for directory in dirs[::step][:count]:
+        (directory / f"new_{os.getpid()}_{time.time_ns()}.bin").write_bytes(b"x")
+
+
+class FakeBilibiliApi:
+    """本地模拟的 Bilibili 搜索/详情接口，供切片爬虫端到端验证。
+
+    视频按发布时间倒序分页返回，publish() 模拟有新视频上传；
+    requests 记录收到的请求路径，latency 为每个请求的模拟延迟（秒）
+    """
+
+    PAGE_SIZE = 20
+
+    def __init__(self, videos: int = 200, latency: float = 0.0):
+        self.latency = latency
+        self.requests: list[str] = []
+        self._lock = threading.Lock()
+        self._videos: list[dict] = []
+        self._serial = 0
+        self.publish(videos)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def publish(self, count: int) -> None:
+        with self._lock:
+            new = []
+            for _ in range(count):
+                self._serial += 1
+                new.append({
+                    "bvid": f"BV1fake{self._serial:06d}",
+                    "title": f"<em class=\"keyword\">Neuro</em> 切片 #{self._serial}",
+                    "author": f"up{self._serial % 7}",
+                    "pubdate": 1_700_000_000 + self._serial * 60,
+                    "duration": f"{self._serial % 10}:{self._serial % 60:02d}",
+                    "play": self._serial * 10,
+                    "pic": f"//i0.hdslb.com/{self._serial}.jpg",
+                })
+            self._videos[:0] = reversed(new)
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 头部与正文分两次写出，避免 Nagle 算法带来的 40ms 延迟
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                with api._lock:
+                    api.requests.append(parts.path)
+                    videos = list(api._videos)
+                if api.latency:
+                    time.sleep(api.latency)
+
+                if parts.path == "/x/web-interface/search/type":
+                    page = int(query.get("page", 1))
+                    start = (page - 1) * api.PAGE_SIZE
+                    data = {
+                        "numPages": max(1, -(-len(videos) // api.PAGE_SIZE)),
+                        "result": videos[start:start + api.PAGE_SIZE],
+                    }
+                elif parts.path == "/x/web-interface/view":
+                    video = next((v for v in videos if v["bvid"] == query.get("bvid")), None)
+                    if video is None:
+                        return self._send({"code": -404, "message": "啥都木有"})
+                    data = {
+                        "bvid": video["bvid"],
+                        "title": video["title"].replace("<em class=\"keyword\">", "").replace("</em>", ""),
+                        "pubdate": video["pubdate"],
+                        "duration": video["pubdate"] % 600,
+                        "owner": {"name": video["author"]},
+                        "stat": {"view": video["play"] + 1},
+                        "desc": "详情简介",
+                    }
+                else:
+                    self.send_error(404)
+                    return
+                self._send({"code": 0, "message": "0", "data": data})
+
+            def _send(self, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeScheduleServer:
+    """本地模拟的直播时间表接口，支持 ETag 条件请求（未变化时返回 304）。
+
+    从当前时间起每 12 小时一场直播，publish() 追加一场使内容发生变化；
+    latency 为每个请求的模拟延迟（秒），requests 记录收到的请求次数
+    """
+
+    def __init__(self, events: int = 50, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._start = int(time.time())
+        self._events: list[dict] = []
+        self.publish(events)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/schedule.json"
+
+    def publish(self, count: int = 1) -> None:
+        with self._lock:
+            for _ in range(count):
+                n = len(self._events)
+                self._events.append({
+                    "title": f"直播 #{n}",
+                    "start": self._start + n * 12 * 3600,
+                    "end": self._start + n * 12 * 3600 + 2 * 3600,
+                    "url": f"https://live.example/{n}",
+                })
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    events = list(server._events)
+                if server.latency:
+                    time.sleep(server.latency)
+                etag = f'"{len(events)}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps({"events": events}, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class RangeFileServer:
+    """本地模拟的文件下载服务器，支持 Range / If-Range，供分段下载器端到端验证。
+
+    rate 为每个连接的限速（字节/秒，0 不限速），模拟单连接带宽受限的 CDN；
+    fail_after(n) 使下一个请求在发送 n 字节后断开连接；ranges=False 时忽略 Range 头；
+    replace() 修改文件内容与 ETag
+    """
+
+    def __init__(self, data: bytes, rate: int = 0, ranges: bool = True):
+        self.rate = rate
+        self.ranges = ranges
+        self.requests: list[str | None] = []  # 每个请求的 Range 头
+        self._lock = threading.Lock()
+        self._fail_after: int | None = None
+        self.replace(data)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/file.bin"
+
+    def replace(self, data: bytes) -> None:
+        with self._lock:
+            self.data = data
+            self.etag = f'"{len(data):x}-{time.time_ns():x}"'
+
+    def fail_after(self, count: int) -> None:
+        with self._lock:
+            self._fail_after = count
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def handle(self):
+                try:
+                    super().handle()
+                except ConnectionError:
+                    # 客户端取消下载时直接断开连接
+                    pass
+
+            def do_GET(self):
+                header = self.headers.get("Range")
+                with server._lock:
+                    server.requests.append(header)
+                    data, etag = server.data, server.etag
+                    fail_after, server._fail_after = server._fail_after, None
+
+                start, end = 0, len(data) - 1
+                partial = False
+                if_range = self.headers.get("If-Range")
+                if server.ranges and header and header.startswith("bytes=") and if_range in (None, etag):
+                    first, _, last = header[6:].partition("-")
+                    start = int(first)
+                    end = min(int(last), len(data) - 1) if last else len(data) - 1
+                    if start >= len(data):
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{len(data)}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    partial = True
+
+                self.send_response(206 if partial else 200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(end - start + 1))
+                self.send_header("ETag", etag)
+                if server.ranges:
+                    self.send_header("Accept-Ranges", "bytes")
+                if partial:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+                self.end_headers()
+
+                view = memoryview(data)[start:end + 1]
+                block = 64 * 1024
+                began = time.perf_counter()
+                sent = 0
+                while sent < len(view):
+                    if fail_after is not None and sent >= fail_after:
+                        # 模拟网络中断：不发送剩余内容直接断开
+                        self.close_connection = True
+                        self.connection.shutdown(2)
+                        return
+                    size = block if fail_after is None else min(block, max(1, fail_after - sent))
+                    self.wfile.write(view[sent:sent + size])
+                    sent += size
+                    if server.rate:
+                        delay = sent / server.rate - (time.perf_counter() - began)
+                        if delay > 0:
+                            time.sleep(delay)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class InstanceServerProcess:
+    """在子进程中运行单实例服务端（InstanceServer），供转发命令的端到端验证。
+
+    使用独立的实例名（SWARM_INSTANCE_NAME），不会与正在运行的工具箱冲突
+    """
+
+    SCRIPT = (
+        "import sys\n"
+        "from PyQt6.QtCore import QCoreApplication\n"
+        "app = QCoreApplication(sys.argv)\n"
+        "from src.ui.instance_server import InstanceServer\n"
+        "server = InstanceServer(lambda command, args: (True, command))\n"
+        "assert server.listen()\n"
+        "print('ready', flush=True)\n"
+        "app.exec()\n"
+    )
+
+    def __init__(self, name: str):
+        self.env = {**os.environ, "SWARM_INSTANCE_NAME": name, "QT_QPA_PLATFORM": "offscreen"}
+        self._process: subprocess.Popen | None = None
+
+    def __enter__(self) -> Self:
+        self._process = subprocess.Popen(
+            [sys.executable, "-c", self.SCRIPT],
+            cwd=Path(__file__).resolve().parent.parent,
+            env=self.env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        # qfluentwidgets 导入时会先输出提示信息
+        for line in self._process.stdout:
+            if line.strip() == "ready":
+                return self
+        raise RuntimeError("单实例服务端启动失败")
+
+    def __exit__(self, *exc) -> None:
+        self._process.terminate()
+        self._process.wait()
@@ -0,0 +1,728 @@
+"""swarmToolbox 性能基准。
+
+在普通 Linux 机器上无界面运行（QT_QPA_PLATFORM=offscreen），覆盖:
+    - get_folder_size / scan_folder: 合成目录树的冷扫描、带索引的热扫描和增量扫描
+    - check_exe_running / get_exe_usage: 针对启动的空闲进程
+    - get_exe_version: 针对生成的 PE 文件
+    - ClipCrawler: 针对本地模拟的 Bilibili 接口的首次爬取与增量爬取
+    - ScheduleService: 针对本地模拟的时间表接口的刷新耗时，以及刷新进行中时的查询延迟
+    - 主页信息流: 10 万条历史的滚动帧耗时与内存占用
+    - 无界面模式: 核心模块与界面的导入耗时、后台服务与界面程序的内存对比
+    - MainWindow 构造耗时
+    - 指标注册表: 埋点的记录开销与 Prometheus 文本导出耗时
+
+结果以 JSON 输出，并与保存的基线比较，中位数变慢超过容差时以返回码 1 退出，找不到基线时以返回码 2 退出。
+
+用法:
+    python -m benchmarks.run                      # 运行并与 benchmarks/baseline.json 比较
+    python -m benchmarks.run --update-baseline    # 运行并把结果保存为新基线
+    python -m benchmarks.run --sizes 10k,100k,1m --only folder
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = REPO_ROOT / "benchmarks" / "baseline.json"
+DEFAULT_OUTPUT = REPO_ROOT / "benchmarks" / "results" / "latest.json"
+
+# 变慢幅度低于该绝对值（秒）时视为噪声，不算回归
+MIN_REGRESSION_SECONDS = 0.002
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+# 不同规模的重复次数
+REPEATS = {10_000: 5, 100_000: 3, 1_000_000: 1}
+
+Results = dict[str, dict[str, float]]
+
+
+# 各组共用同一个 QApplication 并保持到进程结束：
+# 组内的局部变量被回收时 QApplication 随之销毁，之后 qfluentwidgets 的全局 qconfig 也不能再用
+_qt_app = None
+
+
+def qt_application():
+    global _qt_app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+
+    if _qt_app is None:
+        _qt_app = QApplication.instance() or QApplication(sys.argv)
+    return _qt_app
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Callable[[], object] | None = None) -> dict[str, float]:
+    """执行 repeat 次并返回耗时统计（秒），setup 不计入耗时"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "runs": len(samples),
+    }
+
+
+def bench_folder(workdir: Path, sizes: list[int]) -> Results:
+    from benchmarks.fixtures import make_tree, touch_random_dirs
+    from src.utils.file_system_utils import get_folder_size
+    from src.utils.folder_scanner import FolderIndex, scan_folder
+
+    results: Results = {}
+    for files in sizes:
+        label = next(k for k, v in SIZES.items() if v == files)
+        print(f"  生成 {files} 个文件的目录树...", flush=True)
+        tree = make_tree(workdir / "trees" / label, files)
+        exe = tree / "app.exe"
+        exe.touch()
+        repeat = REPEATS.get(files, 3)
+
+        index_path = workdir / f"index_{label}.json"
+        results[f"folder.scan_cold.{label}"] = measure(
+            lambda t=tree, i=index_path: scan_folder(t, force=True, index=FolderIndex(i)), repeat
+        )
+
+        # 热扫描：索引已建立，目录均未变化
+        get_folder_size(exe)
+        results[f"folder.get_folder_size_warm.{label}"] = measure(lambda e=exe: get_folder_size(e), repeat)
+
+        # 增量扫描：每次有 10 个目录发生变化
+        results[f"folder.scan_incremental.{label}"] = measure(
+            lambda t=tree: scan_folder(t), repeat, setup=lambda t=tree: touch_random_dirs(t, 10)
+        )
+    return results
+
+
+def bench_process(workdir: Path) -> Results:
+    from benchmarks.fixtures import DummyProcesses
+    from src.utils.file_system_utils import check_exe_running, get_exe_usage
+    from src.utils.process_registry import ProcessRegistry, process_registry
+
+    results: Results = {}
+    with DummyProcesses(workdir / "procs") as exe:
+        path = str(exe)
+        results["process.registry_refresh_cold"] = measure(
+            lambda: (registry := ProcessRegistry(), registry.add_target(path), registry.refresh()), 5
+        )
+
+        process_registry.add_target(path)
+        process_registry.refresh()
+        results["process.registry_refresh_warm"] = measure(process_registry.refresh, 20)
+
+        assert check_exe_running(path), "未检测到空闲进程"
+        results["process.check_exe_running"] = measure(lambda: check_exe_running(path), 200)
+
+        # 第一次调用包含 cpu_percent 打底等待，不计入
+        get_exe_usage(path)
+        results["process.get_exe_usage"] = measure(lambda: get_exe_usage(path), 50)
+    return results
+
+
+def bench_version(workdir: Path) -> Results:
+    from benchmarks.fixtures import write_pe
+    from src.utils.file_system_utils import get_exe_version
+    from src.utils.pe_version import read_pe_version
+
+    exe = write_pe(workdir / "pe" / "Fixture.exe", (1, 2, 3, 4), payload=32 * 1024 * 1024)
+    assert read_pe_version(exe) == "1.2.3.4"
+
+    results: Results = {}
+    results["version.read_pe_version"] = measure(lambda: read_pe_version(exe), 50)
+    get_exe_version(exe)
+    results["version.get_exe_version_cached"] = measure(lambda: get_exe_version(exe), 200)
+    return results
+
+
+def bench_crawler(workdir: Path) -> Results:
+    from benchmarks.fixtures import FakeBilibiliApi
+    from src.core.clip_crawler import ClipCrawler, ClipStore
+
+    results: Results = {}
+    runs = iter(range(1000))
+
+    def crawler() -> ClipCrawler:
+        n = next(runs)
+        store = ClipStore(workdir / "clips" / f"{n}.jsonl", workdir / "clips" / f"{n}_index.json")
+        return ClipCrawler("neuro", store, api_base=api.url, concurrency=4, rate=1000)
+
+    with FakeBilibiliApi(videos=200, latency=0.01) as api:
+        # 首次爬取：10 页搜索结果 + 200 条详情
+        results["crawler.full_crawl"] = measure(lambda: crawler().crawl(), 3)
+
+        # 增量爬取：已有 200 条，新上传 5 条，只需要请求第一页和 5 条详情
+        incremental = crawler()
+        incremental.crawl()
+        result = None
+
+        def crawl():
+            nonlocal result
+            result = incremental.crawl()
+
+        results["crawler.incremental"] = measure(crawl, 5, setup=lambda: api.publish(5))
+        assert result.pages == 1 and len(result.new) == 5 and result.requests == 6, result
+    return results
+
+
+def bench_schedule(workdir: Path) -> Results:
+    import threading
+
+    from benchmarks.fixtures import FakeScheduleServer
+    from src.core.schedule_service import ScheduleService
+    from src.utils.http_client import HttpClient
+
+    results: Results = {}
+    with FakeScheduleServer(events=50, latency=0.05) as server:
+        service = ScheduleService(server.url, workdir / "schedule_cache.json", HttpClient())
+        results["schedule.refresh_full"] = measure(lambda: service.refresh(force=True), 10)
+        # 内容未变化：条件请求得到 304，不下载也不解析
+        results["schedule.refresh_not_modified"] = measure(service.refresh, 10)
+        assert not service.refresh()
+
+        # 刷新的网络请求进行中时查询下一场直播，不应等待请求完成
+        refreshing: list[threading.Thread] = []
+
+        def start_refresh():
+            while refreshing:
+                refreshing.pop().join()
+            seen = server.requests
+            thread = threading.Thread(target=service.refresh, kwargs={"force": True})
+            thread.start()
+            refreshing.append(thread)
+            while server.requests == seen:
+                time.sleep(0.001)
+
+        results["schedule.query_during_refresh"] = measure(service.next_stream, 10, setup=start_refresh)
+        for thread in refreshing:
+            thread.join()
+    return results
+
+
+def bench_feed(workdir: Path) -> Results:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    import random
+
+    import psutil
+
+    from benchmarks.fixtures import make_clip_store
+    from src.core.clip_crawler import ClipStore
+    from src.ui.interface.home.feed_model import PagedFeedModel
+    from src.ui.interface.home.feed_sources import ClipFeedSource
+    from src.ui.interface.home.feed_view import FeedView
+
+    rows = 100_000
+    app = qt_application()
+    store = ClipStore(*make_clip_store(workdir / "feed", rows))
+    # 界面中由后台线程完成首次统计
+    store.count()
+    model = PagedFeedModel(ClipFeedSource(store))
+    view = FeedView()
+    view.setModel(model)
+    view.resize(680, 530)
+    view.show()
+    app.processEvents()
+    bar = view.verticalScrollBar()
+
+    def frame(value: int) -> None:
+        bar.setValue(value)
+        app.processEvents()
+        view.viewport().repaint()
+
+    results: Results = {}
+    # 连续向下滚动 2000 行，滚到底部时由 fetchMore 追加下一页
+    step = view.viewport().height() // 2
+    results["feed.scroll_frame"] = measure(lambda: frame(bar.value() + step), 300)
+
+    # 展开全部行后随机跳转，测量换页读取的耗时与内存是否保持平稳
+    while model.canFetchMore():
+        model.fetchMore()
+    app.processEvents()
+    assert model.rowCount() == rows
+    rng = random.Random(0)
+    process = psutil.Process()
+    for _ in range(50):
+        frame(rng.randrange(bar.maximum()))
+    rss_before = process.memory_info().rss
+    results["feed.jump_frame"] = measure(lambda: frame(rng.randrange(bar.maximum())), 500)
+    rss_growth = (process.memory_info().rss - rss_before) / 1024 / 1024
+    print(f"  随机跳转 500 次后 RSS 增长 {rss_growth:.1f} MB，缓存页数 {model.cached_pages}")
+    assert model.cached_pages <= model.max_cached_pages
+
+    view.hide()
+    view.deleteLater()
+    app.processEvents()
+    return results
+
+
+def bench_search(workdir: Path) -> Results:
+    from benchmarks.fixtures import make_search_docs
+    from src.utils.text_index import TextIndex
+
+    docs = make_search_docs(100_000)
+    results: Results = {}
+
+    def build() -> TextIndex:
+        index = TextIndex()
+        for key, title, body in docs:
+            index.add(key, title, body)
+        return index
+
+    results["search.build_100k"] = measure(build, 1)
+    index = build()
+    path = workdir / "search_index.bin"
+    results["search.save_100k"] = measure(lambda: index.save(path), 3)
+    results["search.load_100k"] = measure(lambda: TextIndex.load(path), 3)
+    print(f"  索引文件 {path.stat().st_size / 1024 / 1024:.1f} MB，词项 {len(index._postings)} 个")
+
+    index = TextIndex.load(path)
+    # 模拟边输入边搜索：单字母前缀、完整单词、CJK 单字与二元组、中英文混合
+    for name, query in (
+            ("prefix_1", "n"),
+            ("prefix_3", "neu"),
+            ("word", "karaoke"),
+            ("cjk_1", "唱"),
+            ("cjk_2", "唱歌"),
+            ("mixed", "evil neuro 唱"),
+            ("mixed_prefix", "合集 neuro s"),
+    ):
+        results[f"search.query_{name}"] = measure(lambda q=query: index.search(q), 50)
+    return results
+
+
+def bench_discovery(workdir: Path) -> Results:
+    from benchmarks.fixtures import make_tree
+    from src.config import cfg
+    from src.core.app_discovery import AppDiscovery, AppTarget
+    from src.utils.exe_finder import find_files
+
+    tree = make_tree(workdir / "trees" / "100k", SIZES["100k"])
+    # 目标放在目录树中间，另有一个隐藏目录（应被剪枝）
+    exe = tree / "d10" / "s25" / "NeuroSongSpider.exe"
+    exe.touch()
+    (tree / ".cache").mkdir(exist_ok=True)
+
+    results: Results = {}
+    results["discovery.find_early_stop"] = measure(lambda: find_files([tree], [exe.name]), 5)
+    # 目标不存在时需要遍历整棵树
+    results["discovery.find_full_walk"] = measure(lambda: find_files([tree], ["missing.exe"]), 5)
+    early, full = find_files([tree], [exe.name]), find_files([tree], ["missing.exe"])
+    print(f"  提前结束扫描 {early.dirs_scanned} 个目录，完整遍历 {full.dirs_scanned} 个目录")
+
+    # 路径已知时的检查只需要 stat
+    item = cfg.nsp_path
+    old = item.value
+    try:
+        item.value = str(exe)
+        discovery = AppDiscovery((AppTarget("nsp", "NSP", item, (exe.name,)),), workdir / "app_locations.json")
+        results["discovery.check_warm"] = measure(discovery.check, 1000)
+    finally:
+        item.value = old
+    return results
+
+
+def bench_analyzer(workdir: Path) -> Results:
+    from benchmarks.fixtures import make_duplicate_tree, make_tree
+    from src.utils.folder_analyzer import analyze_folder
+
+    results: Results = {}
+    # 只统计最大文件/目录：10 万个文件，堆只保留 top 条
+    tree = make_tree(workdir / "trees" / "100k", SIZES["100k"])
+    results["analyzer.top_n_100k"] = measure(lambda: analyze_folder(tree, duplicates=False), 3)
+
+    root, wasted = make_duplicate_tree(workdir / "dups", 400)
+    report = analyze_folder(root)
+    assert report.wasted_size == wasted, (report.wasted_size, wasted)
+    print(
+        f"  共 {report.total_size / 1024 / 1024:.0f} MB，为检测重复读取 {report.hashed_bytes / 1024 / 1024:.0f} MB，"
+        f"{len(report.duplicates)} 组重复，可释放 {wasted / 1024 / 1024:.0f} MB"
+    )
+    results["analyzer.duplicates_auto"] = measure(lambda: analyze_folder(root), 3)
+    results["analyzer.duplicates_processes"] = measure(lambda: analyze_folder(root, processes=os.cpu_count()), 3)
+    results["analyzer.duplicates_threads"] = measure(lambda: analyze_folder(root, processes=0), 3)
+    return results
+
+
+def bench_download(workdir: Path) -> Results:
+    import hashlib
+    import random
+    import threading
+
+    from benchmarks.fixtures import RangeFileServer
+    from src.utils.downloader import DownloadCancelled, SegmentedDownloader
+
+    data = random.Random(0).randbytes(64 * 1024 * 1024)
+    checksum = hashlib.sha256(data).hexdigest()
+    dest = workdir / "download" / "app.zip"
+    results: Results = {}
+    # 单连接限速 32 MB/s，模拟按连接限速的 CDN
+    with RangeFileServer(data, rate=32 * 1024 * 1024) as server:
+        def download(segments: int) -> SegmentedDownloader:
+            dest.unlink(missing_ok=True)
+            downloader = SegmentedDownloader(server.url, dest, checksum=checksum, segments=segments)
+            downloader.download()
+            return downloader
+
+        results["download.single_64mb"] = measure(lambda: download(1), 3)
+        results["download.segments_64mb"] = measure(lambda: download(4), 3)
+        downloader = download(4)
+        print(f"  4 段下载时为计算校验值从系统缓存补读 {downloader.reread / 1024 / 1024:.0f} MB")
+
+        def interrupted() -> None:
+            # 下载约一半时取消，之后的续传计时
+            dest.unlink(missing_ok=True)
+            cancel = threading.Event()
+            timer = threading.Timer(0.25, cancel.set)
+            timer.start()
+            try:
+                SegmentedDownloader(server.url, dest, checksum=checksum, cancel=cancel).download()
+            except DownloadCancelled:
+                pass
+            timer.cancel()
+
+        results["download.resume_64mb"] = measure(lambda: download(4), 3, setup=interrupted)
+    return results
+
+
+def bench_telemetry(workdir: Path) -> Results:
+    import random
+
+    from src.utils.launch_telemetry import LaunchRecord, LaunchTelemetry
+
+    rng = random.Random(0)
+    path = workdir / "launch_telemetry.jsonl"
+    path.unlink(missing_ok=True)
+    telemetry = LaunchTelemetry(path)
+    # 1000 次启动，10 个版本，每个版本的耗时逐渐增加
+    for i in range(1000):
+        version = f"1.{i // 100}"
+        telemetry.add(LaunchRecord(
+            "NSP", version, 1_700_000_000 + i * 3600, rng.uniform(0.005, 0.02),
+            rng.uniform(1.0, 1.5) + i // 100 * 0.05, None, rng.randrange(100, 200) << 20, False,
+        ))
+    print(f"  1000 条记录占用 {path.stat().st_size / 1024:.0f} KB")
+
+    results: Results = {}
+    results["telemetry.load_1000"] = measure(lambda: LaunchTelemetry(path).records(), 10)
+    results["telemetry.summarize_1000"] = measure(lambda: telemetry.summarize("NSP"), 20)
+    return results
+
+
+def bench_assets(workdir: Path) -> Results:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtGui import QColor, QImage
+
+    from src.utils.asset_bundle import AssetBundle
+
+    app = qt_application()
+    results: Results = {}
+    for count in (10, 1000):
+        source = workdir / "assets" / str(count)
+        if not source.exists():
+            (source / "icons").mkdir(parents=True)
+            for i in range(count):
+                image = QImage(64, 64, QImage.Format.Format_ARGB32)
+                image.fill(QColor(i % 256, 128, 0))
+                image.save(str(source / "icons" / f"icon{i}.png"))
+        bundle_path = workdir / "assets" / f"{count}.bundle"
+        AssetBundle(bundle_path, source).names()
+
+        # 启动时打开资源包：与资源数量无关
+        results[f"assets.open_bundle_{count}"] = measure(lambda b=bundle_path, s=source: len(AssetBundle(b, s)), 50)
+        # 对比：逐个打开文件
+        results[f"assets.read_files_{count}"] = measure(
+            lambda s=source: [p.read_bytes() for p in (s / "icons").iterdir()], 5
+        )
+
+    from src.ui.icon_cache import IconCache
+
+    cache = IconCache(AssetBundle(bundle_path, source))
+    names = cache.bundle.names("icons/")[:100]
+    results["assets.icon_decode_100"] = measure(
+        lambda: [IconCache(cache.bundle).pixmap(n, 32, 1.0, "light") for n in names], 5
+    )
+    for n in names:
+        cache.pixmap(n, 32, 1.0, "light")
+    results["assets.icon_cached_100"] = measure(lambda: [cache.pixmap(n, 32, 1.0, "light") for n in names], 20)
+    # 切换主题与缩放比例：不重新解码，只缩放
+    results["assets.icon_rescale_100"] = measure(
+        lambda: [cache.pixmap(n, 32, 1.5, "dark") for n in names], 1, setup=lambda: cache._pixmaps.clear()
+    )
+    print(f"  切换主题与缩放比例后的解码次数: {cache.decodes}（资源数 {len(names)}）")
+    app.processEvents()
+    return results
+
+
+def bench_instance(workdir: Path) -> Results:
+    import subprocess
+    import uuid
+
+    from benchmarks.fixtures import InstanceServerProcess
+
+    def run(*args: str) -> None:
+        subprocess.run([sys.executable, *args], cwd=REPO_ROOT, env=server.env, check=True, stdout=subprocess.DEVNULL)
+
+    results: Results = {}
+    with InstanceServerProcess(f"swarmToolbox-bench-{uuid.uuid4().hex[:8]}") as server:
+        # 对比基准：解释器启动本身
+        results["instance.python_startup"] = measure(lambda: run("-c", "pass"), 10)
+        results["instance.send_command"] = measure(
+            lambda: run("-c", "from src.utils.single_instance import send_command; assert send_command('ping')"), 10
+        )
+        # 第二次启动 main.py：转发命令后退出的总耗时
+        results["instance.second_launch"] = measure(lambda: run("main.py"), 10)
+    return results
+
+
+# 无界面模式对比用：各子进程导入的模块
+_CORE_MODULES = (
+    "src.core, src.core.schedule_service, src.core.notification_scheduler, "
+    "src.core.clip_crawler, src.core.news_aggregator, src.core.thumbnail_cache, src.utils.resource_monitor"
+)
+_RSS_SNIPPET = "import psutil; print('rss', psutil.Process().memory_info().rss)"
+
+
+def bench_headless(workdir: Path) -> Results:
+    import subprocess
+    import uuid
+
+    import psutil
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(REPO_ROOT),
+        "QT_QPA_PLATFORM": "offscreen",
+        "SWARM_INSTANCE_NAME": f"swarmToolbox-bench-{uuid.uuid4().hex[:8]}",
+    }
+
+    def run(*args: str) -> str:
+        return subprocess.run(
+            [sys.executable, *args], cwd=workdir, env=env, check=True, capture_output=True, text=True
+        ).stdout
+
+    def rss_of(code: str) -> float:
+        # qfluentwidgets 导入时会向标准输出打印提示，只取最后的 rss 行
+        line = [line for line in run("-c", f"{code}\n{_RSS_SNIPPET}").splitlines() if line.startswith("rss ")][-1]
+        return int(line.split()[1]) / 1024 / 1024
+
+    core_check = f"import sys, {_CORE_MODULES}\nassert 'PyQt6.QtCore' not in sys.modules, '核心模块导入了 Qt'"
+    gui = (
+        "import sys\nfrom PyQt6.QtWidgets import QApplication\nfrom src.config import load_config\n"
+        "from src.ui import MainWindow\nload_config(); app = QApplication(sys.argv); w = MainWindow(); app.processEvents()"
+    )
+    results: Results = {
+        "headless.import_core": measure(lambda: run("-c", core_check), 5),
+        "headless.import_ui": measure(lambda: run("-c", "import src.ui"), 5),
+        "headless.status": measure(lambda: run("-m", "src.daemon", "-q", "status"), 5),
+    }
+
+    core_rss = rss_of(core_check)
+    gui_rss = rss_of(gui)
+
+    # 常驻的后台服务（不爬取、不刷新资讯）
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "src.daemon", "-q", "run", "--crawl-minutes", "0", "--news-minutes", "0"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        state = workdir / "data" / "daemon.json"
+        deadline = time.monotonic() + 30
+        while not state.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(1.0)
+        daemon_rss = psutil.Process(daemon.pid).memory_info().rss / 1024 / 1024
+    finally:
+        run("-m", "src.daemon", "-q", "stop")
+        daemon.wait(10)
+
+    print(f"  RSS: 核心模块 {core_rss:.1f} MB, 后台服务 {daemon_rss:.1f} MB, 界面程序 {gui_rss:.1f} MB "
+          f"(后台服务为界面程序的 {daemon_rss / gui_rss:.0%})")
+    return results
+
+
+def bench_window(workdir: Path) -> Results:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # 导入耗时由 headless.import_ui 在新进程中测量，这里的模块可能已被前面的分组导入
+    from src.config import load_config
+    from src.ui import MainWindow
+
+    load_config()
+    app = qt_application()
+    windows = []
+
+    def build():
+        windows.append(MainWindow())
+
+    def teardown():
+        while windows:
+            window = windows.pop()
+            window.hide()
+            window.deleteLater()
+        app.processEvents()
+
+    results: Results = {
+        "window.construct": measure(build, 5, setup=teardown),
+    }
+    teardown()
+    return results
+
+
+def bench_metrics(workdir: Path) -> Results:
+    from src.utils.metrics import MetricsRegistry, instrument
+
+    registry = MetricsRegistry()
+    duration = registry.histogram("bench_call_duration_seconds", "基准", ("function",))
+    failures = registry.counter("bench_call_failures_total", "基准", ("function",))
+    calls = 100_000
+
+    def plain() -> tuple[bool, str]:
+        return True, ""
+
+    wrapped = instrument(duration, failures)(plain)
+
+    def run(fn) -> None:
+        for _ in range(calls):
+            fn()
+
+    results: Results = {
+        "metrics.plain_100k": measure(lambda: run(plain), 5),
+        "metrics.instrumented_100k": measure(lambda: run(wrapped), 5),
+    }
+    overhead = (results["metrics.instrumented_100k"]["median"] - results["metrics.plain_100k"]["median"]) / calls
+    print(f"  每次调用的记录开销约 {overhead * 1e6:.2f} µs")
+
+    # 100 个函数各有观测时导出一次
+    for i in range(100):
+        duration.labels(f"fn{i}").observe(i / 1000)
+    results["metrics.prometheus_text_100"] = measure(registry.to_prometheus, 20)
+    results["metrics.write_textfile_100"] = measure(lambda: registry.write_textfile(workdir / "swarm.prom"), 20)
+    return results
+
+
+def compare(results: Results, baseline: Results, tolerance: float) -> list[str]:
+    """返回回归项的描述列表"""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        median, base_median = stats["median"], base["median"]
+        if median > base_median * (1 + tolerance) and median - base_median > MIN_REGRESSION_SECONDS:
+            regressions.append(
+                f"{name}: {median * 1000:.2f} ms (基线 {base_median * 1000:.2f} ms, "
+                f"+{(median / base_median - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="swarmToolbox 性能基准")
+    parser.add_argument("--only", default="folder,process,version,crawler,schedule,feed,search,discovery,analyzer,download,telemetry,instance,headless,window,assets,metrics", help="要运行的基准组，逗号分隔")
+    parser.add_argument("--sizes", default="10k,100k", help="目录树规模: 10k,100k,1m")
+    parser.add_argument("--workdir", type=Path, help="工作目录（保留生成的目录树以便复用），默认使用临时目录")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="结果 JSON 输出路径")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="基线 JSON 路径")
+    parser.add_argument("--update-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的变慢比例")
+    args = parser.parse_args(argv)
+
+    groups = {g.strip() for g in args.only.split(",") if g.strip()}
+    sizes = [SIZES[s.strip().lower()] for s in args.sizes.split(",") if s.strip()]
+
+    temp = None
+    if args.workdir:
+        workdir = args.workdir.resolve()
+        workdir.mkdir(parents=True, exist_ok=True)
+    else:
+        temp = tempfile.TemporaryDirectory(prefix="swarm-bench-")
+        workdir = Path(temp.name)
+
+    # 程序的 data/、logs/ 都相对于当前目录，切换到工作目录避免污染仓库
+    sys.path.insert(0, str(REPO_ROOT))
+    os.chdir(workdir)
+
+    from loguru import logger
+
+    logger.remove()
+
+    results: Results = {}
+    try:
+        for group, run in (
+                ("folder", lambda: bench_folder(workdir, sizes)),
+                ("process", lambda: bench_process(workdir)),
+                ("version", lambda: bench_version(workdir)),
+                ("crawler", lambda: bench_crawler(workdir)),
+                ("schedule", lambda: bench_schedule(workdir)),
+                ("feed", lambda: bench_feed(workdir)),
+                ("search", lambda: bench_search(workdir)),
+                ("discovery", lambda: bench_discovery(workdir)),
+                ("analyzer", lambda: bench_analyzer(workdir)),
+                ("download", lambda: bench_download(workdir)),
+                ("telemetry", lambda: bench_telemetry(workdir)),
+                ("instance", lambda: bench_instance(workdir)),
+                ("headless", lambda: bench_headless(workdir)),
+                ("window", lambda: bench_window(workdir)),
+                ("assets", lambda: bench_assets(workdir)),
+                ("metrics", lambda: bench_metrics(workdir)),
+        ):
+            if group in groups:
+                print(f"[{group}]", flush=True)
+                group_results = run()
+                for name, stats in group_results.items():
+                    print(f"  {name:<45} {stats['median'] * 1000:10.3f} ms  (min {stats['min'] * 1000:.3f}, n={stats['runs']})")
+                results.update(group_results)
+    finally:
+        os.chdir(REPO_ROOT)
+        if temp is not None:
+            temp.cleanup()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"结果已写入 {args.output}")
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {"results": {}}
+        baseline["meta"] = report["meta"]
+        baseline["results"].update(results)
+        args.baseline.write_text(json.dumps(baseline, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"基线已更新: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        # 没有基线时无法判断是否回归，不能当作通过
+        print(f"未找到基线 {args.baseline}，无法比较（使用 --update-baseline 生成）", file=sys.stderr)
+        return 2
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+    if regressions:
+        print("检测到性能回归:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("未检测到性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,38 +1,57 @@
+import argparse
+import multiprocessing
 import sys
 
-from loguru import logger
-from datetime import datetime
+from src.utils.single_instance import send_command
 
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QApplication
+# 日志、Qt、qfluentwidgets 与配置在确认没有正在运行的实例之后才导入（见 main 部分）
 
-from src.app_context import app_context
-from src.ui import MainWindow
 
-LOG_FORMAT = "<g>{time:HH:mm:ss}</g> [<lvl>{level:<7}</lvl>] <c><u>{name}</u></c>:<c>{function}:{line}</c> | {message}"
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="swarmToolbox")
+    parser.add_argument("--launch", metavar="APP", help="启动托管的程序（nsp / evz / neurolings）")
+    return parser.parse_args(argv)
 
 
-def setup_logger() -> None:
-    logger.remove()
+def _command(args: argparse.Namespace) -> tuple[str, list[str]]:
+    if args.launch:
+        return "launch", [args.launch]
+    return "activate", []
+
+
+def forward_to_running_instance(args: argparse.Namespace) -> bool:
+    """已有实例在运行时把命令转发给它，返回是否已转发（本进程应直接退出）"""
+    reply = send_command(*_command(args))
+    if reply is None:
+        return False
+    ok, message = reply
+    stream = sys.stdout if ok else sys.stderr
+    # pyinstaller 打包并禁用控制台后没有标准输出
+    if stream:
+        print(message, file=stream)
+    return True
 
-    # pyinstaller 打包并禁用控制台后, sys.stdout 为 None
-    if sys.stdout:
-        logger.add(
-            sys.stdout,
-            format=LOG_FORMAT,
-            level="DEBUG",
-            colorize=True,
-        )
 
-    now = datetime.now()
-    logger.add(
-        f"logs/{now:%Y-%m-%d}/{now:%Y-%m-%d_%H-%M-%S}.log",
-        format=LOG_FORMAT,
-        level="DEBUG",
-        diagnose=True,
-    )
-    
 if __name__ == "__main__":
+    # 打包后的程序中，进程池（文件夹分析的哈希计算）的子进程从这里返回
+    multiprocessing.freeze_support()
+
+    # 单实例：已在运行时转发命令后立即退出，不再启动 Qt、不读写配置
+    cli_args = parse_args(sys.argv[1:])
+    if forward_to_running_instance(cli_args):
+        sys.exit(0)
+
+    from loguru import logger
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+
+    from src.app_context import app_context
+    from src.config import load_config
+    from src.daemon import request_daemon_stop
+    from src.utils.log_utils import setup_logger
+    from src.ui import MainWindow
+    from src.ui.instance_server import InstanceServer
+
     # --- 启用高 DPI 支持 ---
     if hasattr(Qt.ApplicationAttribute, "AA_EnableHighDpiScaling"):
         # noinspection PyArgumentList
@@ -45,9 +64,26 @@ if __name__ == "__main__":
             # noinspection PyArgumentList
             QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
 
-    setup_logger()
-    
     app = QApplication(sys.argv)
+    # 两个实例几乎同时启动时，后监听的一方转发命令后退出
+    instance_server = InstanceServer()
+    if not instance_server.listen():
+        forward_to_running_instance(cli_args)
+        sys.exit(0)
+
+    setup_logger()
+    load_config()
+
+    # 无界面的后台服务与界面程序共用缓存，由界面接管：这里只发出停止请求，
+    # 主窗口在后台线程中等它退出后再开始定期刷新，启动不会被阻塞
+    daemon = request_daemon_stop()
+    if daemon is not None:
+        logger.info(f"正在停止后台服务 (pid {daemon})")
+
     window = app_context.main_window = MainWindow()
+    instance_server.handler = window.handle_instance_command
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    command, command_args = _command(cli_args)
+    if command != "activate":
+        window.handle_instance_command(command, command_args)
+    sys.exit(app.exec())
@@ -1,11 +1,23 @@
+import atexit
+import json
 import sys
+import threading
 
+from collections.abc import Callable
 from pathlib import Path
 from enum import Enum
-from qfluentwidgets import QConfig, ConfigItem, OptionsValidator, setTheme
-from qfluentwidgets import Theme as QtTheme
 from loguru import logger
 
+from src.utils.atomic_io import atomic_write_bytes
+from src.utils.metrics import metrics
+from src.utils.settings import BaseConfig, BoolValidator, ConfigItem, OptionsValidator, RangeConfigItem, RangeValidator
+
+# 配置修改后延迟多久（秒）写入文件，期间的多次修改合并为一次写入
+SAVE_DELAY = 0.5
+
+_save_total = metrics.counter("swarm_config_saves_total", "配置保存次数，result 为 written / unchanged / failed", ("result",))
+_write_seconds = metrics.histogram("swarm_config_write_duration_seconds", "配置文件写入耗时")
+
 
 class Theme(str, Enum):
     """主题枚举"""
@@ -15,8 +27,11 @@ class Theme(str, Enum):
     DARK = "Dark"
 
 
-class Config(QConfig):
-    """应用程序配置类"""
+class Config(BaseConfig):
+    """应用程序配置类。
+
+    不依赖 Qt：核心模块与无界面模式导入配置时不会载入 Qt 与 qfluentwidgets
+    """
 
     # 持久化配置项
     theme_mode = ConfigItem(
@@ -45,13 +60,189 @@ class Config(QConfig):
         ""
     )
 
+    # 资源监控配置项
+    monitor_interval = RangeConfigItem(
+        "Monitor",
+        "SampleInterval",
+        2,
+        RangeValidator(1, 60)
+    )
+
+    monitor_history_size = RangeConfigItem(
+        "Monitor",
+        "HistorySize",
+        1800,
+        RangeValidator(60, 86400)
+    )
+
+    # 直播时间表配置项
+    schedule_url = ConfigItem(
+        "Schedule",
+        "Url",
+        ""
+    )
+
+    schedule_refresh_minutes = RangeConfigItem(
+        "Schedule",
+        "RefreshMinutes",
+        30,
+        RangeValidator(5, 24 * 60)
+    )
+
+    # 开播提醒配置项
+    notify_enabled = ConfigItem(
+        "Notification",
+        "Enabled",
+        True,
+        BoolValidator()
+    )
+
+    notify_lead_minutes = RangeConfigItem(
+        "Notification",
+        "LeadMinutes",
+        5,
+        RangeValidator(0, 120)
+    )
+
+    # 切片爬取配置项
+    clip_keyword = ConfigItem(
+        "Clips",
+        "Keyword",
+        "Neurosama"
+    )
+
+    clip_concurrency = RangeConfigItem(
+        "Clips",
+        "Concurrency",
+        4,
+        RangeValidator(1, 16)
+    )
+
+    clip_requests_per_second = RangeConfigItem(
+        "Clips",
+        "RequestsPerSecond",
+        3,
+        RangeValidator(1, 20)
+    )
+
+    # 后台定期爬取的间隔（分钟），0 表示不自动爬取
+    clip_crawl_minutes = RangeConfigItem(
+        "Clips",
+        "CrawlMinutes",
+        60,
+        RangeValidator(0, 24 * 60)
+    )
+
+    # 自动查找配置项：{"nsp" / "evz" / "neurolings": [可执行文件名, ...]}，覆盖默认文件名
+    discovery_exe_names = ConfigItem(
+        "Discovery",
+        "ExeNames",
+        {}
+    )
+
+    # 启动测量配置项：记录托管应用的启动耗时与峰值内存
+    launch_telemetry_enabled = ConfigItem(
+        "Telemetry",
+        "LaunchEnabled",
+        True,
+        BoolValidator()
+    )
+
+    # 指标导出配置项：Prometheus 文本文件路径（例如 node exporter 的 textfile 目录下的 swarm.prom），为空时不写出
+    metrics_textfile = ConfigItem(
+        "Metrics",
+        "TextfilePath",
+        ""
+    )
+
+    metrics_textfile_interval = RangeConfigItem(
+        "Metrics",
+        "TextfileInterval",
+        15,
+        RangeValidator(5, 3600)
+    )
+
+    # 资讯源配置项：地址字符串，或 {"name": ..., "url": ..., "kind": "rss/atom/json"}
+    news_feeds = ConfigItem(
+        "News",
+        "Feeds",
+        []
+    )
+
+    # 后台定期刷新资讯的间隔（分钟），0 表示不自动刷新
+    news_refresh_minutes = RangeConfigItem(
+        "News",
+        "RefreshMinutes",
+        15,
+        RangeValidator(0, 24 * 60)
+    )
+
     def __init__(self, path: Path):
         # 指定配置文件路径
-        super().__init__()
-        self.file = path
+        super().__init__(path)
+
+        # 延迟写入状态
+        self._save_lock = threading.Lock()
+        self._save_timer: threading.Timer | None = None
+        self._pending: bytes | None = None
+        self._last_written: bytes | None = None
+
+    def _serialize(self) -> bytes:
+        return json.dumps(self.toDict(), ensure_ascii=False, indent=4).encode("utf-8")
+
+    def load(self, file=None):
+        super().load(file)
+        try:
+            self._last_written = self.file.read_bytes()
+        except OSError:
+            self._last_written = None
+
+    def save(self) -> None:
+        """保存配置。
+
+        不直接写文件：SAVE_DELAY 秒内的多次保存合并为一次，在后台线程原子写入；
+        内容与上次写入相同时跳过。程序退出时会自动 flush()
+        """
+        data = self._serialize()
+        with self._save_lock:
+            if data == self._last_written:
+                self._pending = None
+                _save_total.labels("unchanged").inc()
+                return
+            self._pending = data
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self) -> None:
+        """立即写入尚未保存的修改"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            data, self._pending = self._pending, None
+            if data is None:
+                return
+            try:
+                with _write_seconds.time():
+                    atomic_write_bytes(self.file, data)
+                self._last_written = data
+                _save_total.labels("written").inc()
+            except OSError as e:
+                _save_total.labels("failed").inc()
+                logger.error(f"保存配置文件失败: {e}")
+
+    def subscribe(self, item: ConfigItem, callback: Callable[[object], None]) -> Callable[[], None]:
+        """订阅配置项的变化，值改变时以新值回调，返回取消订阅的函数"""
+        item.valueChanged.connect(callback)
+        return lambda: item.valueChanged.disconnect(callback)
 
     def set_theme(self, theme: Theme) -> None:
-        """设置主题"""
+        """设置主题，只在界面中调用"""
+        from qfluentwidgets import Theme as QtTheme
+        from qfluentwidgets import setTheme
+
         setTheme(QtTheme(theme.value))
         self.theme_mode.value = theme
         self.save()
@@ -62,17 +253,37 @@ IS_WINDOWS = sys.platform == "win32"
 MAIN_PATH = Path.cwd()
 DATA_DIR = MAIN_PATH / "data"
 ASSETS_DIR = MAIN_PATH / "assets"
-
-# 确保数据目录存在
-DATA_DIR.mkdir(exist_ok=True)
+# assets/ 打包后的资源包，见 src.utils.asset_bundle
+ASSETS_BUNDLE = MAIN_PATH / "assets.bundle"
+LOGS_DIR = MAIN_PATH / "logs"
 
 CONFIG_PATH = DATA_DIR / "config.json"
 cfg = Config(CONFIG_PATH)
+atexit.register(cfg.flush)
+
+_loaded = False
+
+
+def load_config() -> Config:
+    """加载配置文件，只在第一次调用时执行。
+
+    导入本模块不做任何文件读写或主题设置，由程序入口显式调用
+    """
+    global _loaded
+    if _loaded:
+        return cfg
+    _loaded = True
+
+    # 确保数据目录存在
+    DATA_DIR.mkdir(exist_ok=True)
+
+    if CONFIG_PATH.exists():
+        cfg.load()
 
-if CONFIG_PATH.exists():
-    cfg.load()
+    else:
+        # 主题由界面在创建窗口时应用
+        logger.info("未找到配置文件，使用默认配置")
+        cfg.theme_mode.value = Theme.AUTO
+        cfg.save()
 
-else:
-    logger.info("未找到配置文件，正在应用默认主题: AUTO")
-    cfg.set_theme(Theme.AUTO)
-    setTheme(QtTheme.AUTO)
+    return cfg
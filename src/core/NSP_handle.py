@@ -6,27 +6,93 @@ import sys
 # 智能路径处理：支持直接运行和模块导入
 
 try:
-    from src.config import cfg
+    from src.config import cfg, load_config
     from src.utils.file_system_utils import (
-        start_exe, check_exe_running)
+        start_exe, start_exe_blocking, check_exe_running, get_exe_usage,
+        get_folder_size, get_folder_report, get_exe_version, get_launch_summary)
+    from src.utils.folder_analyzer import FolderReport
+    from src.utils.metrics import instrument, metrics
 except ModuleNotFoundError:
     # 如果导入失败，添加项目根目录到sys.path
     current_file = Path(__file__).resolve()
     project_root = current_file.parent.parent.parent
     if str(project_root) not in sys.path:
         sys.path.insert(0, str(project_root))
-    from src.config import cfg
+    from src.config import cfg, load_config
     from src.utils.file_system_utils import (
-        start_exe, check_exe_running, get_exe_usage)
+        start_exe, start_exe_blocking, check_exe_running, get_exe_usage,
+        get_folder_size, get_folder_report, get_exe_version, get_launch_summary)
+    from src.utils.folder_analyzer import FolderReport
+    from src.utils.metrics import instrument, metrics
 
+# 各操作的耗时与失败次数，在诊断页面中查看
+_duration = metrics.histogram("swarm_nsp_call_duration_seconds", "NSP 操作耗时", ("function",))
+_failures = metrics.counter("swarm_nsp_call_failures_total", "NSP 操作失败次数（异常或返回失败）", ("function",))
 
+
+def _nsp_path() -> str:
+    """配置中的NSP路径（首次使用时载入配置，导入本模块不读取文件）"""
+    return load_config().nsp_path.value
+
+
+@instrument(_duration, _failures)
 def set_nsp_path(path: str) -> None:
     """设置NSP文件路径"""
+    # 会保存整个配置文件，必须先载入已有配置
+    load_config()
     cfg.nsp_path.value = path
     cfg.save()
     logger.info(f"NSP路径已设置为: {path}")
 
 
+@instrument(_duration, _failures)
+def start_nsp_exe() -> bool:
+    """启动NSP"""
+    return start_exe(_nsp_path())
+
+
+@instrument(_duration, _failures)
+def start_nsp_exe_blocking() -> tuple[bool, str]:
+    """启动NSP并等待执行完成"""
+    return start_exe_blocking(_nsp_path())
+
+
+@instrument(_duration)
+def check_nsp_running() -> bool:
+    """检查NSP是否正在运行"""
+    return check_exe_running(_nsp_path())
+
+
+@instrument(_duration, _failures)
+def get_nsp_folder_size() -> tuple[bool, str]:
+    """获取NSP文件夹空间占用"""
+    return get_folder_size(_nsp_path())
+
+
+@instrument(_duration, _failures)
+def get_nsp_folder_report() -> tuple[bool, FolderReport | str]:
+    """分析NSP文件夹：最大的文件与目录、重复下载的文件"""
+    return get_folder_report(_nsp_path())
+
+
+@instrument(_duration, _failures)
+def get_nsp_memory_usage() -> tuple[bool, list[str]]:
+    """获取NSP进程资源占用"""
+    return get_exe_usage(_nsp_path())
+
+
+@instrument(_duration, _failures)
+def get_nsp_version() -> tuple[bool, str]:
+    """获取NSP版本号"""
+    return get_exe_version(_nsp_path())
+
+
+@instrument(_duration, _failures)
+def get_nsp_launch_summary() -> tuple[bool, str]:
+    """按版本汇总NSP的启动耗时"""
+    return get_launch_summary(_nsp_path())
+
+
 if __name__ == "__main__":
     # 测试用例
     test_path = "C:/neuroSangSpider/NeuroSongSpider.exe"
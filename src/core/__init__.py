@@ -5,8 +5,10 @@ from .NSP_handle import (
     start_nsp_exe_blocking, 
     check_nsp_running,
     get_nsp_folder_size,
+    get_nsp_folder_report,
     get_nsp_memory_usage,
-    get_nsp_version
+    get_nsp_version,
+    get_nsp_launch_summary
 )
 
 __all__ = [
@@ -15,6 +17,8 @@ __all__ = [
     "start_nsp_exe_blocking",
     "check_nsp_running",
     "get_nsp_folder_size",
+    "get_nsp_folder_report",
     "get_nsp_memory_usage", 
-    "get_nsp_version"
+    "get_nsp_version",
+    "get_nsp_launch_summary"
 ]
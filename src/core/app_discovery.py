@@ -0,0 +1,234 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import psutil
+from loguru import logger
+
+from src.config import DATA_DIR, IS_WINDOWS, cfg
+from src.core.task_executor import current_token
+from src.utils.atomic_io import atomic_write_json, read_json
+from src.utils.exe_finder import find_files
+from src.utils.settings import ConfigItem
+
+LOCATIONS_PATH = DATA_DIR / "app_locations.json"
+# 上次没有找到的程序，间隔该秒数后才重新查找，避免每次启动都遍历整个磁盘
+RETRY_INTERVAL = 24 * 3600
+# 单次查找的最长时间（秒）
+SEARCH_TIMEOUT = 120.0
+
+
+@dataclass(slots=True, frozen=True)
+class AppTarget:
+    key: str
+    label: str
+    item: ConfigItem
+    exe_names: tuple[str, ...]  # 默认文件名，可用配置 Discovery/ExeNames 覆盖
+
+    def names(self) -> tuple[str, ...]:
+        custom = (cfg.discovery_exe_names.value or {}).get(self.key)
+        if isinstance(custom, str):
+            return (custom,)
+        return tuple(custom) if custom else self.exe_names
+
+
+TARGETS = (
+    AppTarget("nsp", "NSP", cfg.nsp_path, ("NeuroSongSpider.exe",)),
+    AppTarget("evz", "EvZ", cfg.evz_path, ("EvZ.exe",)),
+    AppTarget("neurolings", "Neurolings", cfg.neurolings_path, ("Neurolings.exe",)),
+)
+
+
+def _is_file(path) -> bool:
+    try:
+        return bool(path) and os.path.isfile(path)
+    except (OSError, ValueError):
+        return False
+
+
+def candidate_roots(hints: list[Path]) -> list[Path]:
+    """按可能性从高到低排列的查找起点：
+
+    上次所在位置附近、常见安装目录、用户目录，最后是各个本地磁盘
+    """
+    roots: list[Path] = []
+    for hint in hints:
+        # 程序被移动或更新时通常仍在原来的上一两级目录中
+        roots += [hint.parent, hint.parent.parent]
+
+    home = Path.home()
+    if IS_WINDOWS:
+        for var in ("ProgramFiles", "ProgramFiles(x86)", "ProgramW6432"):
+            if value := os.environ.get(var):
+                roots.append(Path(value))
+        if local := os.environ.get("LOCALAPPDATA"):
+            roots.append(Path(local) / "Programs")
+        roots += [home / "Desktop", home / "Downloads", home / "Documents", home]
+    else:
+        roots += [home, Path("/opt")]
+
+    try:
+        partitions = psutil.disk_partitions(all=False)
+    except OSError:
+        partitions = []
+    for part in partitions:
+        # 跳过光驱等没有文件系统的设备
+        if part.fstype and "cdrom" not in part.opts:
+            roots.append(Path(part.mountpoint))
+
+    unique: dict[str, Path] = {}
+    for root in roots:
+        unique.setdefault(os.path.normcase(str(root)), root)
+    return list(unique.values())
+
+
+class AppDiscovery:
+    """自动查找 NSP / EvZ / Neurolings 的安装位置。
+
+    找到的位置记录在 data/app_locations.json。check() 只对配置路径或记录的位置做一次 stat，
+    只有配置的路径失效（或从未设置）时，refresh() 才会并行遍历常见安装目录与本地磁盘，
+    全部找到后立即停止。找到的路径会写入配置，但不会覆盖仍然有效的配置
+    """
+
+    def __init__(self, targets: tuple[AppTarget, ...] = TARGETS, path: Path = LOCATIONS_PATH):
+        self.targets = {t.key: t for t in targets}
+        self.path = path
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._locations: dict[str, str] | None = None
+        self._searched_at: dict[str, float] = {}
+
+    def _ensure_loaded(self) -> dict[str, str]:
+        if self._locations is None:
+            data = read_json(self.path, {})
+            self._locations = {k: str(v) for k, v in data.get("locations", {}).items()}
+            self._searched_at = {k: float(v) for k, v in data.get("searched_at", {}).items()}
+        return self._locations
+
+    def _save(self) -> None:
+        try:
+            atomic_write_json(self.path, {"locations": self._locations, "searched_at": self._searched_at})
+        except OSError as e:
+            logger.warning(f"保存程序位置失败: {e}")
+
+    # ---- 检查 ----
+
+    def locate(self, key: str) -> Path | None:
+        """返回程序的有效路径：优先配置的路径，其次上次找到的位置，都无效时返回 None"""
+        target = self.targets[key]
+        if _is_file(target.item.value):
+            return Path(target.item.value)
+        with self._lock:
+            remembered = self._ensure_loaded().get(key)
+        if _is_file(remembered):
+            return Path(remembered)
+        return None
+
+    def check(self) -> dict[str, Path | None]:
+        """检查所有程序，每个程序最多两次 stat"""
+        return {key: self.locate(key) for key in self.targets}
+
+    # ---- 查找 ----
+
+    def _apply(self, key: str, path: Path) -> bool:
+        """配置的路径无效时写入新路径，返回是否修改了配置"""
+        item = self.targets[key].item
+        if _is_file(item.value) or item.value == str(path):
+            return False
+        item.value = str(path)
+        logger.info(f"已自动设置 {self.targets[key].label} 路径: {path}")
+        return True
+
+    def refresh(self, force: bool = False, cancel: threading.Event | None = None) -> dict[str, Path]:
+        """查找配置路径无效的程序，返回本次找到的 {key: 路径}
+
+        Parameters:
+            force: bool = False  # 忽略重试间隔，立即查找所有缺失的程序
+            cancel: threading.Event | None = None  # 置位后尽快结束查找，在 TaskExecutor 中执行时默认使用任务的取消标记
+        """
+        if cancel is None and (token := current_token()) is not None:
+            cancel = token.event
+        with self._refresh_lock:
+            changed = False
+            missing: list[str] = []
+            now = time.time()
+            for key, target in self.targets.items():
+                if _is_file(target.item.value):
+                    continue
+                remembered = self.locate(key)
+                if remembered is not None:
+                    changed |= self._apply(key, remembered)
+                    continue
+                with self._lock:
+                    self._ensure_loaded()
+                    searched = self._searched_at.get(key, 0.0)
+                if force or now - searched >= RETRY_INTERVAL:
+                    missing.append(key)
+
+            found: dict[str, Path] = {}
+            if missing:
+                found, finished = self._search(missing, cancel)
+                with self._lock:
+                    self._ensure_loaded()
+                    # 重试间隔只用于没有找到的程序：找到的程序之后若再次失效，应立即重新查找。
+                    # 被取消或超时的查找不算数，下次仍会重新查找
+                    for key, path in found.items():
+                        self._locations[key] = str(path)
+                        self._searched_at.pop(key, None)
+                    if finished:
+                        for key in missing:
+                            if key not in found:
+                                self._searched_at[key] = now
+                    self._save()
+                for key, path in found.items():
+                    changed |= self._apply(key, path)
+            if changed:
+                cfg.save()
+            return found
+
+    def _search(self, keys: list[str], cancel: threading.Event | None) -> tuple[dict[str, Path], bool]:
+        """返回 (找到的路径, 是否完整查找过)"""
+        names = {name.lower(): key for key in keys for name in self.targets[key].names()}
+        hints = [Path(p) for p in (self.targets[k].item.value for k in keys) if p]
+        with self._lock:
+            hints += [Path(p) for k, p in self._ensure_loaded().items() if k in keys]
+
+        result = find_files(
+            candidate_roots(hints),
+            names,
+            timeout=SEARCH_TIMEOUT,
+            cancel=cancel,
+            # 每个程序找到任意一个文件名即可
+            until=lambda found: {names[name] for name in found} >= set(keys),
+        )
+        found: dict[str, Path] = {}
+        for name, path in result.found.items():
+            found.setdefault(names[name], path)
+        logger.info(
+            f"查找程序完成: 找到 {', '.join(self.targets[k].label for k in found) or '无'}，"
+            f"扫描 {result.dirs_scanned} 个目录，用时 {result.elapsed:.2f}s"
+        )
+        return found, not result.interrupted
+
+
+app_discovery = AppDiscovery()
+
+
+def discover_apps(force: bool = True) -> tuple[bool, str]:
+    """查找未设置或路径失效的程序
+
+    Returns:
+        result: tuple[bool, str]: (是否所有程序都有有效路径, 结果描述)
+    """
+    try:
+        app_discovery.refresh(force=force)
+    except OSError as e:
+        logger.exception("查找程序失败")
+        return False, f"查找程序失败: {e}"
+    status = app_discovery.check()
+    lines = [
+        f"{app_discovery.targets[key].label}: {path if path else '未找到'}" for key, path in status.items()
+    ]
+    return all(status.values()), "\n".join(lines)
@@ -0,0 +1,103 @@
+import threading
+import time
+from collections.abc import Callable
+
+from loguru import logger
+
+from src.config import cfg
+from src.core.task_executor import Priority, TaskExecutor, task_executor
+
+# 检查时间表是否过期的间隔（秒），实际刷新间隔由配置 Schedule.RefreshMinutes 决定
+SCHEDULE_POLL_INTERVAL = 60.0
+# 调度线程最长的等待时间（秒）：间隔配置修改后最迟在这段时间内生效
+MAX_WAIT = 30.0
+
+
+def _refresh_schedule() -> None:
+    from src.core.schedule_service import schedule_service
+
+    if schedule_service.url:
+        schedule_service.refresh_if_stale()
+
+
+def _crawl_clips() -> None:
+    from src.core.clip_crawler import crawl_latest_clips
+
+    crawl_latest_clips()
+
+
+def _refresh_news() -> None:
+    from src.core.news_aggregator import news_aggregator
+
+    if news_aggregator.sources():
+        news_aggregator.refresh()
+
+
+class _PollJob:
+    __slots__ = ("fn", "interval", "last_run", "name")
+
+    def __init__(self, name: str, fn: Callable[[], None], interval: Callable[[], float]):
+        self.name = name
+        self.fn = fn
+        self.interval = interval  # 每次读取，配置修改后立即生效；<= 0 表示暂停
+        self.last_run: float | None = None  # None 表示启动后立即执行一次
+
+
+class BackgroundPoller:
+    """定期刷新时间表、爬取切片与刷新资讯。
+
+    界面程序与无界面模式（src.daemon）共用：调度线程只负责计时，
+    到期的任务以低优先级交给 task_executor 执行，同一任务上一次还没结束时不会重复提交。
+    结果通过各服务自己的 subscribe() 通知界面
+    """
+
+    def __init__(self, executor: TaskExecutor = task_executor):
+        self.executor = executor
+        self._jobs: list[_PollJob] = []
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def start(self, crawl_minutes: float | None = None, news_minutes: float | None = None) -> None:
+        """开始定期执行；crawl_minutes / news_minutes 为 None 时使用配置（Clips.CrawlMinutes / News.RefreshMinutes）"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        def minutes(override: float | None, item) -> Callable[[], float]:
+            return lambda: (override if override is not None else item.value) * 60
+
+        self._jobs = [
+            _PollJob("schedule", _refresh_schedule, lambda: SCHEDULE_POLL_INTERVAL),
+            _PollJob("clips", _crawl_clips, minutes(crawl_minutes, cfg.clip_crawl_minutes)),
+            _PollJob("news", _refresh_news, minutes(news_minutes, cfg.news_refresh_minutes)),
+        ]
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="background-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            wait = MAX_WAIT
+            for job in self._jobs:
+                interval = job.interval()
+                if interval <= 0:
+                    continue
+                if job.last_run is None or now - job.last_run >= interval:
+                    job.last_run = now
+                    try:
+                        self.executor.submit(job.fn, key=("background-poller", job.name), priority=Priority.LOW)
+                    except RuntimeError:
+                        # 任务执行器已关闭（程序正在退出）
+                        return
+                    logger.debug(f"后台刷新: {job.name}")
+                wait = min(wait, job.last_run + interval - now)
+            self._stop_event.wait(max(wait, 0.0))
+
+
+background_poller = BackgroundPoller()
@@ -0,0 +1,446 @@
+import html
+import json
+import re
+import threading
+from array import array
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+from loguru import logger
+
+from src.config import DATA_DIR, cfg
+from src.utils.atomic_io import atomic_write_json, read_json
+from src.utils.http_client import HttpClient, HttpError, http_client
+from src.utils.rate_limit import TokenBucket
+
+BILIBILI_API = "https://api.bilibili.com"
+CLIPS_PATH = DATA_DIR / "clips.jsonl"
+CLIP_INDEX_PATH = DATA_DIR / "clip_index.json"
+
+# 批量写入的条数
+BATCH_SIZE = 50
+# 单次爬取最多翻页数，防止首次爬取时无限翻页
+MAX_PAGES = 20
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+@dataclass(slots=True)
+class Clip:
+    """一条切片视频"""
+
+    bvid: str
+    title: str
+    author: str = ""
+    pubdate: int = 0  # Unix 时间戳（秒）
+    duration: int = 0  # 秒
+    play: int = 0
+    cover: str = ""
+    description: str = ""
+
+    @property
+    def url(self) -> str:
+        return f"https://www.bilibili.com/video/{self.bvid}"
+
+
+_CLIP_FIELDS = {f.name for f in fields(Clip)}
+
+
+def _clean_text(text) -> str:
+    # 搜索结果的标题带有 <em class="keyword"> 高亮标签
+    return html.unescape(_TAG_RE.sub("", str(text or "")))
+
+
+def _cover_url(url) -> str:
+    url = str(url or "")
+    return "https:" + url if url.startswith("//") else url
+
+
+def _parse_duration(value) -> int:
+    """搜索结果中时长为 "mm:ss" 或 "hh:mm:ss"，详情中为秒数"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    seconds = 0
+    try:
+        for part in str(value).split(":"):
+            seconds = seconds * 60 + int(part)
+    except ValueError:
+        return 0
+    return seconds
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_search_item(item: dict) -> Clip | None:
+    bvid = item.get("bvid")
+    if not bvid:
+        return None
+    return Clip(
+        bvid=bvid,
+        title=_clean_text(item.get("title")),
+        author=str(item.get("author", "")),
+        pubdate=_to_int(item.get("pubdate")),
+        duration=_parse_duration(item.get("duration", 0)),
+        play=_to_int(item.get("play")),
+        cover=_cover_url(item.get("pic")),
+        description=_clean_text(item.get("description")),
+    )
+
+
+def merge_detail(clip: Clip, data: dict) -> Clip:
+    """用视频详情接口的数据补全搜索结果"""
+    return Clip(
+        bvid=clip.bvid,
+        title=_clean_text(data.get("title")) or clip.title,
+        author=(data.get("owner") or {}).get("name") or clip.author,
+        pubdate=_to_int(data.get("pubdate")) or clip.pubdate,
+        duration=_parse_duration(data.get("duration", 0)) or clip.duration,
+        play=_to_int((data.get("stat") or {}).get("view")) or clip.play,
+        cover=_cover_url(data.get("pic")) or clip.cover,
+        description=str(data.get("desc", "")) or clip.description,
+    )
+
+
+class ClipStore:
+    """本地切片存储。
+
+    视频数据以 JSON Lines 追加写入 data/clips.jsonl，去重索引（BV 号 -> 发布时间）
+    单独保存在 data/clip_index.json，启动时只需读取索引即可判断是否已爬取过。
+    add() 先写入缓冲区，满 batch_size 条或调用 flush() 时批量落盘。
+    读取时只在内存中保留按发布时间排序的行偏移，read_range() 按需读取一段数据
+    """
+
+    def __init__(self, path: Path = CLIPS_PATH, index_path: Path = CLIP_INDEX_PATH, batch_size: int = BATCH_SIZE):
+        self.path = path
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._index: dict[str, int] | None = None
+        self._pending: list[Clip] = []
+        # 读取用的行偏移索引，文件只追加，新增部分增量扫描
+        self._offsets: dict[str, int] = {}
+        self._scanned = 0
+        self._order: array | None = None
+        self._listeners: list[Callable[[list[Clip]], None]] = []
+
+    def _ids(self) -> dict[str, int]:
+        if self._index is None:
+            data = read_json(self.index_path, {})
+            self._index = {str(k): _to_int(v) for k, v in data.items()} if isinstance(data, dict) else {}
+        return self._index
+
+    def __contains__(self, bvid: str) -> bool:
+        with self._lock:
+            return bvid in self._ids()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids())
+
+    def add(self, clip: Clip) -> bool:
+        """加入一条视频，已存在时返回 False"""
+        with self._lock:
+            ids = self._ids()
+            if clip.bvid in ids:
+                return False
+            ids[clip.bvid] = clip.pubdate
+            self._pending.append(clip)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            return True
+
+    def flush(self) -> int:
+        """把缓冲区写入磁盘，返回写入条数"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, []
+            lines = "".join(json.dumps(asdict(c), ensure_ascii=False) + "\n" for c in pending)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # 先追加数据再写索引：中途崩溃最多产生重复行，读取时会去重
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+                atomic_write_json(self.index_path, self._ids())
+            except OSError as e:
+                logger.error(f"保存切片数据失败: {e}")
+                self._pending = pending + self._pending
+                return 0
+            logger.debug(f"已写入 {len(pending)} 条切片数据")
+            for listener in list(self._listeners):
+                try:
+                    listener(pending)
+                except Exception:  # noqa: BLE001
+                    logger.exception("切片数据回调出错")
+            return len(pending)
+
+    def subscribe(self, listener: Callable[[list[Clip]], None]) -> Callable[[], None]:
+        """订阅新落盘的视频，回调在写入线程中执行"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _scan(self) -> None:
+        """扫描 clips.jsonl 新追加的行，更新按发布时间倒序排列的行偏移"""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size < self._scanned:
+            # 文件被替换，重新扫描
+            self._offsets.clear()
+            self._scanned = 0
+            self._order = None
+        if size == self._scanned and self._order is not None:
+            return
+
+        ids = self._ids()
+        if size > self._scanned:
+            with open(self.path, "rb") as f:
+                f.seek(self._scanned)
+                offset = self._scanned
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # 未写完的行留到下次扫描
+                        break
+                    try:
+                        data = json.loads(line)
+                        bvid = data["bvid"]
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                    else:
+                        # 同一 BV 号以最后一行为准，索引缺失时以数据为准补全
+                        self._offsets[bvid] = offset
+                        ids.setdefault(bvid, _to_int(data.get("pubdate")))
+                    offset += len(line)
+                self._scanned = offset
+        ordered = sorted(self._offsets, key=lambda bvid: ids.get(bvid, 0), reverse=True)
+        self._order = array("q", (self._offsets[bvid] for bvid in ordered))
+
+    def count(self) -> int:
+        """已落盘的视频数"""
+        with self._lock:
+            self.flush()
+            self._scan()
+            return len(self._order)
+
+    def scanned_count(self) -> int:
+        """上次扫描得到的视频数，不读取文件，可在界面线程中调用（由 count() 更新）"""
+        order = self._order
+        return 0 if order is None else len(order)
+
+    def read_range(self, start: int, count: int) -> list[Clip]:
+        """按发布时间从新到旧读取第 start 条起的 count 条视频"""
+        with self._lock:
+            self.flush()
+            self._scan()
+            offsets = self._order[start:start + count]
+        if not offsets:
+            return []
+        with open(self.path, "rb") as f:
+            return [clip for offset in offsets if (clip := self._read_at(f, offset)) is not None]
+
+    def get(self, bvid: str) -> Clip | None:
+        """按 BV 号读取一条已落盘的视频"""
+        with self._lock:
+            self.flush()
+            self._scan()
+            offset = self._offsets.get(bvid)
+        if offset is None:
+            return None
+        with open(self.path, "rb") as f:
+            return self._read_at(f, offset)
+
+    @staticmethod
+    def _read_at(f, offset: int) -> Clip | None:
+        f.seek(offset)
+        try:
+            data = json.loads(f.readline())
+            return Clip(**{k: v for k, v in data.items() if k in _CLIP_FIELDS})
+        except (ValueError, TypeError):
+            return None
+
+    def clips(self) -> list[Clip]:
+        """读取全部视频（按发布时间从新到旧）"""
+        return self.read_range(0, self.count())
+
+    def latest(self, limit: int = 20) -> list[Clip]:
+        return self.read_range(0, limit)
+
+
+clip_store = ClipStore()
+
+
+@dataclass(slots=True)
+class CrawlResult:
+    new: list[Clip]
+    pages: int = 0
+    requests: int = 0
+    reached_known: bool = False  # 是否因遇到已爬取的视频而提前停止
+    interrupted: bool = False  # 后续页请求失败而未能接上已爬取的视频，本次的新视频没有写入
+
+
+class ClipCrawler:
+    """Bilibili 切片增量爬虫。
+
+    按发布时间倒序搜索关键词，遇到去重索引中已有的 BV 号即停止翻页。
+    只有翻到已知视频、最后一页或翻页上限时才写入新视频：中途失败时若写入，
+    下次爬取会在这些视频处停止，失败页之后的视频就再也不会被爬取
+    第一页单独请求（增量刷新通常只需要这一页），之后按并发上限成批预取后续页；
+    新视频的详情并发获取。所有请求共用连接池，并经过令牌桶限速
+    """
+
+    def __init__(
+            self,
+            keyword: str | None = None,
+            store: ClipStore | None = None,
+            *,
+            client: HttpClient = http_client,
+            api_base: str = BILIBILI_API,
+            concurrency: int | None = None,
+            rate: float | None = None,
+            max_pages: int = MAX_PAGES,
+            fetch_details: bool = True,
+    ):
+        self.keyword = keyword if keyword is not None else cfg.clip_keyword.value
+        self.store = store if store is not None else clip_store
+        self.client = client
+        self.api_base = api_base.rstrip("/")
+        self.concurrency = concurrency if concurrency is not None else cfg.clip_concurrency.value
+        self.bucket = TokenBucket(rate if rate is not None else cfg.clip_requests_per_second.value)
+        self.max_pages = max_pages
+        self.fetch_details = fetch_details
+        self._requests = 0
+        self._count_lock = threading.Lock()
+
+    def _api(self, path: str, params: dict) -> dict:
+        self.bucket.acquire()
+        with self._count_lock:
+            self._requests += 1
+        resp = self.client.get(
+            f"{self.api_base}{path}",
+            params=params,
+            headers={"Referer": "https://www.bilibili.com", "Accept": "application/json"},
+        )
+        try:
+            payload = resp.json()
+        except ValueError as e:
+            raise HttpError(f"Bilibili 接口返回内容无法解析: {e}") from e
+        if not isinstance(payload, dict):
+            raise HttpError(f"Bilibili 接口返回格式错误: {type(payload).__name__}")
+        if payload.get("code", 0) != 0:
+            raise HttpError(f"Bilibili 接口返回错误 {payload.get('code')}: {payload.get('message', '')}")
+        data = payload.get("data") or {}
+        if not isinstance(data, dict):
+            raise HttpError(f"Bilibili 接口返回格式错误: data 为 {type(data).__name__}")
+        return data
+
+    def fetch_page(self, page: int) -> tuple[list[Clip], int]:
+        """获取一页搜索结果，返回 (视频列表, 总页数)"""
+        data = self._api("/x/web-interface/search/type", {
+            "search_type": "video",
+            "keyword": self.keyword,
+            "order": "pubdate",
+            "page": page,
+        })
+        clips = [c for c in map(parse_search_item, data.get("result") or []) if c is not None]
+        return clips, _to_int(data.get("numPages")) or page
+
+    def fetch_detail(self, clip: Clip) -> Clip:
+        """获取视频详情，失败时返回原始搜索结果"""
+        try:
+            return merge_detail(clip, self._api("/x/web-interface/view", {"bvid": clip.bvid}))
+        except HttpError as e:
+            logger.warning(f"获取视频 {clip.bvid} 详情失败: {e}")
+            return clip
+
+    def _take_new(self, clips: Iterable[Clip], seen: set[str]) -> tuple[list[Clip], bool]:
+        """取出已知视频之前的新视频，第二个返回值表示是否遇到了已知视频"""
+        new = []
+        for clip in clips:
+            if clip.bvid in self.store:
+                return new, True
+            if clip.bvid not in seen:
+                seen.add(clip.bvid)
+                new.append(clip)
+        return new, False
+
+    def crawl(self, progress: Callable[[int, int], None] | None = None) -> CrawlResult:
+        """执行一次增量爬取，新视频写入存储。
+
+        Parameters:
+            progress: 回调 (已处理页数, 新视频数)
+
+        Raises:
+            HttpError: 第一页请求失败（后续页失败只会提前结束本次爬取）
+        """
+        self._requests = 0
+        result = CrawlResult(new=[])
+        seen: set[str] = set()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency), thread_name_prefix="clip-crawler") as pool:
+            detail_futures = []
+
+            def handle(clips: list[Clip]) -> bool:
+                new, known = self._take_new(clips, seen)
+                result.reached_known |= known
+                if self.fetch_details:
+                    detail_futures.extend(pool.submit(self.fetch_detail, c) for c in new)
+                else:
+                    result.new.extend(new)
+                result.pages += 1
+                if progress is not None:
+                    progress(result.pages, len(seen))
+                return known
+
+            clips, total = self.fetch_page(1)
+            stop = handle(clips) or not clips
+            page = 2
+            last = min(total, self.max_pages)
+            while not stop and page <= last:
+                batch = range(page, min(last, page + self.concurrency - 1) + 1)
+                futures = [pool.submit(self.fetch_page, p) for p in batch]
+                for future in futures:
+                    if stop:
+                        future.cancel()
+                        continue
+                    try:
+                        clips, _ = future.result()
+                    except HttpError as e:
+                        logger.warning(f"获取切片搜索结果失败，提前结束: {e}")
+                        result.interrupted = True
+                        stop = True
+                        continue
+                    stop = handle(clips) or not clips
+                page = batch.stop
+
+            if result.interrupted:
+                for future in detail_futures:
+                    future.cancel()
+                logger.warning(f"切片爬取未完成，{len(seen)} 条新视频留待下次爬取")
+                result.new = []
+            else:
+                for future in detail_futures:
+                    result.new.append(future.result())
+
+        for clip in result.new:
+            self.store.add(clip)
+        self.store.flush()
+        result.requests = self._requests
+        logger.info(f"切片爬取完成: {result.pages} 页, {len(result.new)} 条新视频, {result.requests} 次请求")
+        return result
+
+
+def crawl_latest_clips() -> tuple[bool, CrawlResult | str]:
+    """按配置执行一次增量爬取"""
+    try:
+        return True, ClipCrawler().crawl()
+    except HttpError as e:
+        logger.error(f"切片爬取失败: {e}")
+        return False, str(e)
@@ -0,0 +1,284 @@
+import heapq
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from pathlib import Path
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
+
+from loguru import logger
+
+from src.config import DATA_DIR, cfg
+from src.utils.atomic_io import atomic_write_json, read_json
+from src.utils.feed_parser import FeedEntry, iter_entries
+from src.utils.http_client import CHUNK_SIZE, HttpClient, HttpError, http_client
+
+NEWS_CACHE_PATH = DATA_DIR / "news_cache.json"
+# 时间线保留的条数
+TIMELINE_LIMIT = 500
+# 首次读取单个源时最多读取的条目数
+MAX_ENTRIES_PER_SOURCE = 100
+# 单个源的超时时间（秒），超时的源本次跳过，不拖慢其他源
+SOURCE_TIMEOUT = 15.0
+WORKERS = 4
+
+
+@dataclass(slots=True, frozen=True)
+class NewsSource:
+    """一个资讯源"""
+
+    name: str
+    url: str  # http(s) 地址、file:// 地址或本地路径
+    kind: str = "auto"  # "rss" / "atom" / "json" / "auto"
+    ordered: bool = True  # 条目按时间从新到旧排列，读到已处理过的条目即可停止
+    max_entries: int = MAX_ENTRIES_PER_SOURCE
+
+
+@dataclass(slots=True, frozen=True)
+class NewsEntry:
+    source: str
+    id: str
+    title: str
+    link: str = ""
+    published: float = 0.0
+    summary: str = ""
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.source, self.id
+
+
+@dataclass(slots=True)
+class HighWaterMark:
+    """某个源已处理到的位置：最新条目的时间，以及该时间上已处理的条目 ID"""
+
+    published: float = 0.0
+    ids: list[str] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        """还没有处理过任何条目"""
+        return not self.published and not self.ids
+
+    def is_new(self, entry: FeedEntry) -> bool:
+        return entry.published > self.published or (
+            entry.published == self.published and entry.id not in self.ids
+        )
+
+    def advance(self, entries: list[FeedEntry]) -> None:
+        for entry in entries:
+            if entry.published > self.published:
+                self.published, self.ids = entry.published, [entry.id]
+            elif entry.published == self.published and entry.id not in self.ids:
+                self.ids.append(entry.id)
+
+
+NewsProvider = Callable[[], Iterable[NewsSource]]
+
+
+def config_sources() -> list[NewsSource]:
+    """配置文件 News/Feeds 中的资讯源，每项为地址字符串或 {"name", "url", "kind"}"""
+    sources = []
+    for item in cfg.news_feeds.value or []:
+        if isinstance(item, str):
+            sources.append(NewsSource(name=item, url=item))
+        elif isinstance(item, dict) and item.get("url"):
+            sources.append(NewsSource(
+                name=str(item.get("name") or item["url"]),
+                url=str(item["url"]),
+                kind=str(item.get("kind", "auto")),
+                ordered=bool(item.get("ordered", True)),
+            ))
+    return sources
+
+
+class NewsAggregator:
+    """多源资讯聚合。
+
+    各个源并发地边下载边解析，每个源记录高水位（已处理到的最新条目），
+    有序的源读到高水位即停止读取剩余内容；各源的新条目与现有时间线
+    按发布时间做 k 路堆归并，得到新的时间线。
+
+    资讯源由 provider 提供，add_provider() 注册新的 provider 即可接入新的工具，
+    每个源单独超时，慢的源不会拖慢其他源
+    """
+
+    def __init__(
+            self,
+            cache_path: Path = NEWS_CACHE_PATH,
+            client: HttpClient = http_client,
+            limit: int = TIMELINE_LIMIT,
+            source_timeout: float = SOURCE_TIMEOUT,
+    ):
+        self.cache_path = cache_path
+        self.client = client
+        self.limit = limit
+        self.source_timeout = source_timeout
+        self._providers: list[NewsProvider] = [config_sources]
+        self._listeners: list[Callable[[list[NewsEntry]], None]] = []
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self._marks: dict[str, HighWaterMark] = {}
+        self._entries: list[NewsEntry] = []
+        self._loaded = False
+
+    # ---- 源 ----
+
+    def add_provider(self, provider: NewsProvider) -> Callable[[], None]:
+        """注册资讯源 provider（每次刷新时调用），返回取消注册的函数"""
+        self._providers.append(provider)
+        return lambda: self._providers.remove(provider)
+
+    def sources(self) -> list[NewsSource]:
+        result: dict[str, NewsSource] = {}
+        for provider in list(self._providers):
+            try:
+                for source in provider():
+                    result.setdefault(source.name, source)
+            except Exception:  # noqa: BLE001
+                logger.exception("获取资讯源列表失败")
+        return list(result.values())
+
+    def _chunks(self, source: NewsSource) -> Iterator[bytes]:
+        parts = urlsplit(source.url)
+        if parts.scheme in ("http", "https"):
+            # 超过单个源的超时后 refresh() 不再等待结果，下载也随之停止，不在后台继续占用线程
+            deadline = time.monotonic() + self.source_timeout
+            with self.client.stream(source.url, timeout=self.source_timeout) as resp:
+                for chunk in resp.iter_chunks():
+                    yield chunk
+                    if time.monotonic() > deadline:
+                        raise HttpError(f"读取 {source.url} 超时")
+            return
+        path = Path(url2pathname(parts.path)) if parts.scheme == "file" else Path(source.url)
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    def _read_source(self, source: NewsSource, mark: HighWaterMark) -> list[FeedEntry]:
+        """读取一个源中比高水位新的条目（按时间从新到旧）。
+
+        只有首次读取（还没有高水位）时才在 max_entries 条处停止：之后读取的条目会推进高水位，
+        若中途停止，高水位会越过没有读到的较旧条目，这些条目以后再也不会出现
+        """
+        entries = []
+        limit = source.max_entries if mark.empty else None
+        reader = iter_entries(self._chunks(source), source.kind)
+        try:
+            for entry in reader:
+                if mark.is_new(entry):
+                    entries.append(entry)
+                    if limit is not None and len(entries) >= limit:
+                        break
+                elif source.ordered:
+                    break
+        finally:
+            # 提前结束时关闭生成器，停止下载剩余内容
+            reader.close()
+        entries.sort(key=lambda e: e.published, reverse=True)
+        return entries
+
+    # ---- 缓存 ----
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        data = read_json(self.cache_path, {})
+        try:
+            self._marks = {k: HighWaterMark(**v) for k, v in data.get("marks", {}).items()}
+            self._entries = [NewsEntry(**e) for e in data.get("entries", [])]
+        except TypeError as e:
+            logger.warning(f"资讯缓存格式错误: {e}")
+            self._marks, self._entries = {}, []
+
+    def _save(self) -> None:
+        try:
+            atomic_write_json(self.cache_path, {
+                "marks": {k: asdict(v) for k, v in self._marks.items()},
+                "entries": [asdict(e) for e in self._entries],
+            })
+        except OSError as e:
+            logger.warning(f"保存资讯缓存失败: {e}")
+
+    # ---- 刷新 ----
+
+    def subscribe(self, listener: Callable[[list[NewsEntry]], None]) -> Callable[[], None]:
+        """订阅新资讯，回调参数为本次新增的条目"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def refresh(self) -> list[NewsEntry]:
+        """刷新所有源，返回新增的条目（按时间从新到旧）。单个源失败只记录日志"""
+        with self._refresh_lock:
+            with self._lock:
+                self._ensure_loaded()
+                marks = {name: HighWaterMark(m.published, list(m.ids)) for name, m in self._marks.items()}
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(WORKERS, thread_name_prefix="news")
+
+            sources = self.sources()
+            futures = {
+                self._pool.submit(self._read_source, source, marks.setdefault(source.name, HighWaterMark())): source
+                for source in sources
+            }
+            done, pending = wait(futures, timeout=self.source_timeout)
+            for future in pending:
+                logger.warning(f"资讯源 {futures[future].name} 超时，本次跳过")
+
+            streams: list[list[NewsEntry]] = []
+            for future in done:
+                source = futures[future]
+                try:
+                    entries = future.result()
+                except (HttpError, OSError, ValueError) as e:
+                    logger.warning(f"读取资讯源 {source.name} 失败: {e}")
+                    continue
+                marks[source.name].advance(entries)
+                streams.append([
+                    NewsEntry(source.name, e.id, e.title, e.link, e.published, e.summary) for e in entries
+                ])
+
+            new = list(heapq.merge(*streams, key=lambda e: e.published, reverse=True))
+            with self._lock:
+                self._marks = marks
+                if new:
+                    self._entries = self._merge(new, self._entries)
+                self._save()
+                listeners = list(self._listeners) if new else []
+
+        if new:
+            logger.info(f"资讯已更新，新增 {len(new)} 条")
+        for listener in listeners:
+            try:
+                listener(new)
+            except Exception:  # noqa: BLE001
+                logger.exception("资讯回调出错")
+        return new
+
+    def _merge(self, new: list[NewsEntry], old: list[NewsEntry]) -> list[NewsEntry]:
+        # 同一条目（例如 Atom 更新了时间）只保留最新的一次
+        seen: set[tuple[str, str]] = set()
+        merged = heapq.merge(new, old, key=lambda e: e.published, reverse=True)
+        unique = (e for e in merged if not (e.key in seen or seen.add(e.key)))
+        return list(islice(unique, self.limit))
+
+    # ---- 查询 ----
+
+    def timeline(self, limit: int | None = None) -> list[NewsEntry]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._entries[:limit] if limit is not None else list(self._entries)
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+news_aggregator = NewsAggregator()
@@ -0,0 +1,309 @@
+import errno
+import heapq
+import itertools
+import os
+import select
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from loguru import logger
+
+from src.config import cfg
+from src.core.schedule_service import ScheduleEvent, ScheduleService, schedule_service
+
+# 截止时间相差不超过该秒数的通知合并为一次发出
+COALESCE_WINDOW = 5.0
+# 错过超过该秒数的通知（例如休眠期间）不再发出
+MISSED_GRACE = 15 * 60.0
+# 直播提醒的 key 前缀
+STREAM_KEY_PREFIX = "stream:"
+# 时钟监视用的 timerfd 定在这个遥远的墙上时间，只用于感知时钟被设置，不会真正到期
+_FAR_FUTURE = 2.0**33  # 约 2242 年
+# linux/timerfd.h 中的标志，os 模块没有导出
+TFD_TIMER_CANCEL_ON_SET = 1 << 1
+
+
+@dataclass(slots=True, frozen=True)
+class Notification:
+    key: str  # 同一 key 的通知重复安排时以最新的为准
+    deadline: float  # Unix 时间戳（秒）
+    title: str
+    message: str = ""
+    url: str = ""
+
+
+NotificationListener = Callable[[list[Notification]], None]
+
+
+class NotificationScheduler:
+    """按截止时间触发的通知调度器。
+
+    待发出的通知放在按截止时间排序的最小堆中，后台线程只等待堆顶的截止时间，
+    两次通知之间没有任何轮询唤醒；只有堆顶发生变化（更早的通知加入、堆顶被取消）
+    时才重新计算等待时间。截止时间相近的通知合并为一次回调。
+
+    截止时间使用墙上时间，每次醒来都重新与 time.time() 比较。系统休眠期间等待
+    计时会暂停，系统时间被修改后等待时长也不再准确，这两种情况都需要调用 wake()：
+    Windows 上由主窗口在收到 WM_POWERBROADCAST / WM_TIMECHANGE 时调用，Linux 上
+    由 _ClockWatcher 在墙上时钟被设置（包括休眠恢复）时调用。错过太久的通知会被
+    丢弃而不是补发
+    """
+
+    def __init__(self, coalesce_window: float = COALESCE_WINDOW, missed_grace: float = MISSED_GRACE):
+        self.coalesce_window = coalesce_window
+        self.missed_grace = missed_grace
+        self.wakeups = 0  # 后台线程醒来的次数，用于诊断
+        self._cond = threading.Condition()
+        self._heap: list[tuple[float, int, str]] = []
+        self._pending: dict[str, tuple[int, Notification]] = {}  # key -> (序号, 通知)
+        # 已发出（或已错过）的 key，replace() 不会再次安排它们
+        self._fired: set[str] = set()
+        self._seq = itertools.count()
+        self._listeners: list[NotificationListener] = []
+        self._thread: threading.Thread | None = None
+        self._clock_watcher: _ClockWatcher | None = None
+        self._stopping = False
+
+    # ---- 安排 ----
+
+    def _head(self) -> float | None:
+        """清理堆顶已失效的条目（已取消或被替换），返回最早的截止时间"""
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            current = self._pending.get(key)
+            if current is not None and current[0] == seq:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def _push(self, notification: Notification) -> None:
+        seq = next(self._seq)
+        self._pending[notification.key] = (seq, notification)
+        heapq.heappush(self._heap, (notification.deadline, seq, notification.key))
+
+    def schedule(self, notification: Notification) -> None:
+        """安排通知，已有同一 key 的通知时替换"""
+        with self._cond:
+            before = self._head()
+            self._fired.discard(notification.key)
+            self._push(notification)
+            self._rearm(before)
+
+    def cancel(self, key: str) -> bool:
+        with self._cond:
+            before = self._head()
+            removed = self._pending.pop(key, None) is not None
+            if removed:
+                self._rearm(before)
+            return removed
+
+    def replace(self, notifications: Iterable[Notification], prefix: str = "") -> None:
+        """用新的一组通知替换 key 以 prefix 开头的全部通知。
+
+        内容未变的保持不动，已经发出过的不再重复安排
+        """
+        with self._cond:
+            before = self._head()
+            incoming = {n.key: n for n in notifications}
+            # 已从列表中消失的 key 不需要再记录是否发出过
+            self._fired = {k for k in self._fired if not k.startswith(prefix) or k in incoming}
+            new = {k: n for k, n in incoming.items() if k not in self._fired}
+            for key in [k for k in self._pending if k.startswith(prefix) and k not in new]:
+                del self._pending[key]
+            for key, notification in new.items():
+                current = self._pending.get(key)
+                if current is None or current[1] != notification:
+                    self._push(notification)
+            self._rearm(before)
+
+    def _rearm(self, before: float | None) -> None:
+        # 只有最早的截止时间变化时才唤醒后台线程重新计算等待时间
+        if self._head() != before:
+            self._cond.notify()
+
+    def wake(self) -> None:
+        """立即重新检查（系统从休眠恢复、系统时间被修改后调用）"""
+        with self._cond:
+            self._cond.notify()
+
+    @property
+    def next_deadline(self) -> float | None:
+        with self._cond:
+            return self._head()
+
+    def pending(self) -> list[Notification]:
+        with self._cond:
+            return sorted((n for _, n in self._pending.values()), key=lambda n: n.deadline)
+
+    # ---- 触发 ----
+
+    def subscribe(self, listener: NotificationListener) -> Callable[[], None]:
+        """订阅到期的通知，回调在后台线程中执行"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _take_due(self, now: float) -> list[Notification]:
+        due = []
+        while (deadline := self._head()) is not None and deadline <= now + self.coalesce_window:
+            _, _, key = heapq.heappop(self._heap)
+            _, notification = self._pending.pop(key)
+            self._fired.add(key)
+            if deadline < now - self.missed_grace:
+                logger.info(f"通知已错过 {now - deadline:.0f} 秒，不再发出: {notification.title}")
+                continue
+            due.append(notification)
+        return due
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    now = time.time()
+                    deadline = self._head()
+                    if deadline is not None and deadline <= now:
+                        break
+                    # 没有待发通知时无限等待，否则只等到最早的截止时间
+                    self._cond.wait(None if deadline is None else deadline - now)
+                    self.wakeups += 1
+                due = self._take_due(now)
+
+            if not due:
+                continue
+            logger.info(f"发出 {len(due)} 条通知")
+            for listener in list(self._listeners):
+                try:
+                    listener(due)
+                except Exception:  # noqa: BLE001
+                    logger.exception("通知回调出错")
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="notification-scheduler", daemon=True)
+        self._thread.start()
+        if _ClockWatcher.supported():
+            self._clock_watcher = _ClockWatcher(self.wake)
+            self._clock_watcher.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._clock_watcher:
+            self._clock_watcher.stop()
+            self._clock_watcher = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+class _ClockWatcher:
+    """Linux 上感知墙上时钟被设置（手动修改时间、NTP 跳变、休眠恢复）并回调。
+
+    使用 CLOCK_REALTIME 的 timerfd 配合 TFD_TIMER_CANCEL_ON_SET：定时器定在遥远的
+    未来，从不到期；时钟被设置时内核让 read() 以 ECANCELED 失败，线程随即回调。
+    平时线程阻塞在 select() 上，不产生任何唤醒
+    """
+
+    def __init__(self, callback: Callable[[], None]):
+        self._callback = callback
+        self._thread: threading.Thread | None = None
+        self._timer_fd = -1
+        self._stop_r = self._stop_w = -1
+
+    @staticmethod
+    def supported() -> bool:
+        return sys.platform.startswith("linux") and hasattr(os, "timerfd_create")
+
+    def start(self) -> None:
+        try:
+            self._timer_fd = os.timerfd_create(time.CLOCK_REALTIME, flags=os.TFD_CLOEXEC)
+            os.timerfd_settime(
+                self._timer_fd,
+                flags=os.TFD_TIMER_ABSTIME | TFD_TIMER_CANCEL_ON_SET,
+                initial=_FAR_FUTURE,
+            )
+        except OSError as e:
+            logger.warning(f"无法监视系统时钟变化: {e}")
+            self._close()
+            return
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="clock-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            ready, _, _ = select.select([self._timer_fd, self._stop_r], [], [])
+            if self._stop_r in ready:
+                return
+            try:
+                os.read(self._timer_fd, 8)
+            except OSError as e:
+                if e.errno != errno.ECANCELED:
+                    logger.warning(f"系统时钟监视出错: {e}")
+                    return
+                logger.debug("系统时钟已变化，重新检查通知")
+                self._callback()
+
+    def stop(self) -> None:
+        if self._thread:
+            os.write(self._stop_w, b"\0")
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._close()
+
+    def _close(self) -> None:
+        for fd in (self._timer_fd, self._stop_r, self._stop_w):
+            if fd >= 0:
+                os.close(fd)
+        self._timer_fd = self._stop_r = self._stop_w = -1
+
+
+def stream_notifications(events: Iterable[ScheduleEvent], lead: float) -> list[Notification]:
+    """为直播生成开播提醒，lead 为提前的秒数"""
+    result = []
+    for event in events:
+        title = event.title or "直播"
+        if lead > 0:
+            message = f"{title} 将在 {lead / 60:.0f} 分钟后开始"
+        else:
+            message = f"{title} 开始了"
+        result.append(Notification(
+            key=f"{STREAM_KEY_PREFIX}{event.start}:{event.title}",
+            deadline=event.start - lead,
+            title="直播提醒",
+            message=message,
+            url=event.url,
+        ))
+    return result
+
+
+notification_scheduler = NotificationScheduler()
+_watching = False
+
+
+def watch_stream_schedule(service: ScheduleService = schedule_service) -> None:
+    """根据直播时间表安排开播提醒，时间表或配置变化时重新安排；并启动调度线程"""
+    global _watching
+
+    def reschedule(*_) -> None:
+        if not cfg.notify_enabled.value:
+            notification_scheduler.replace([], prefix=STREAM_KEY_PREFIX)
+            return
+        lead = cfg.notify_lead_minutes.value * 60
+        events = service.upcoming()
+        notification_scheduler.replace(stream_notifications(events, lead), prefix=STREAM_KEY_PREFIX)
+
+    reschedule()
+    notification_scheduler.start()
+    if not _watching:
+        _watching = True
+        service.subscribe(reschedule)
+        cfg.subscribe(cfg.notify_enabled, reschedule)
+        cfg.subscribe(cfg.notify_lead_minutes, reschedule)
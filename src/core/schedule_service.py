@@ -0,0 +1,259 @@
+import bisect
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from loguru import logger
+
+from src.config import DATA_DIR, cfg
+from src.utils.atomic_io import atomic_write_json, read_json
+from src.utils.http_client import HttpClient, HttpError, http_client
+
+SCHEDULE_CACHE_PATH = DATA_DIR / "schedule_cache.json"
+
+
+@dataclass(slots=True, frozen=True)
+class ScheduleEvent:
+    """一场直播"""
+
+    title: str
+    start: float  # Unix 时间戳（秒）
+    end: float | None = None
+    url: str = ""
+
+    @property
+    def start_time(self) -> datetime:
+        return datetime.fromtimestamp(self.start).astimezone()
+
+
+def _parse_time(value) -> float | None:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        # 兼容毫秒时间戳
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+    return dt.timestamp()
+
+
+def parse_schedule(payload) -> list[ScheduleEvent]:
+    """解析时间表 JSON。
+
+    接受事件列表，或包含 "events" / "schedule" / "data" 列表的对象；
+    每个事件至少需要开始时间（start / start_time / time，ISO 8601 或时间戳）
+    """
+    if isinstance(payload, dict):
+        for key in ("events", "schedule", "data"):
+            if isinstance(payload.get(key), list):
+                payload = payload[key]
+                break
+    if not isinstance(payload, list):
+        raise TypeError("无法识别的时间表格式")
+
+    events = []
+    for item in payload:
+        if not isinstance(item, dict):
+            continue
+        start = _parse_time(item.get("start", item.get("start_time", item.get("time"))))
+        if start is None:
+            continue
+        events.append(ScheduleEvent(
+            title=str(item.get("title", item.get("name", ""))),
+            start=start,
+            end=_parse_time(item.get("end", item.get("end_time"))),
+            url=str(item.get("url", item.get("link", ""))),
+        ))
+    return events
+
+
+class ScheduleService:
+    """直播时间表服务。
+
+    上一次的结果持久化在 data/schedule_cache.json，刷新时使用 ETag / If-Modified-Since
+    条件请求，未变化时服务器返回 304，不再下载和解析。
+    事件按开始时间排序建立索引，“下一场直播”“本周直播”都通过二分查找直接得到
+    """
+
+    def __init__(self, url: str | None = None, cache_path: Path = SCHEDULE_CACHE_PATH, client: HttpClient = http_client):
+        self._url = url
+        self.cache_path = cache_path
+        self.client = client
+        # _lock 只保护内存中的数据，网络请求期间不持有，查询不会被刷新阻塞；
+        # _refresh_lock 让同时发起的刷新排队，避免较早的响应覆盖较新的结果
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._listeners: list[Callable[[list[ScheduleEvent]], None]] = []
+
+        # 缓存数据对应的地址，地址变化后条件请求头失效
+        self._source: str | None = None
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        self._fetched_at = 0.0
+        self._events: list[ScheduleEvent] = []
+        self._starts: list[float] = []
+        self._loaded = False
+
+    @property
+    def url(self) -> str:
+        return self._url if self._url is not None else cfg.schedule_url.value
+
+    # ---- 缓存 ----
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        data = read_json(self.cache_path, {})
+        try:
+            events = [ScheduleEvent(**e) for e in data.get("events", [])]
+        except TypeError as e:
+            logger.warning(f"时间表缓存格式错误: {e}")
+            return
+        self._source = data.get("url")
+        self._etag = data.get("etag")
+        self._last_modified = data.get("last_modified")
+        self._fetched_at = data.get("fetched_at", 0.0)
+        self._set_events(events)
+
+    def _save(self) -> None:
+        try:
+            atomic_write_json(self.cache_path, {
+                "url": self._source,
+                "etag": self._etag,
+                "last_modified": self._last_modified,
+                "fetched_at": self._fetched_at,
+                "events": [asdict(e) for e in self._events],
+            })
+        except OSError as e:
+            logger.warning(f"保存时间表缓存失败: {e}")
+
+    def _set_events(self, events: list[ScheduleEvent]) -> None:
+        self._events = sorted(events, key=lambda e: e.start)
+        self._starts = [e.start for e in self._events]
+
+    # ---- 刷新 ----
+
+    def subscribe(self, listener: Callable[[list[ScheduleEvent]], None]) -> Callable[[], None]:
+        """订阅时间表变化（只在内容真正改变时回调）"""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def refresh(self, force: bool = False) -> bool:
+        """从服务器刷新时间表。
+
+        Parameters:
+            force: bool = False  # 不发送条件请求头，强制重新下载
+
+        Returns:
+            bool: 时间表内容是否发生变化
+
+        Raises:
+            HttpError / ValueError / TypeError: 网络错误或内容无法解析，此时保留原有数据
+        """
+        url = self.url
+        if not url:
+            raise ValueError("未设置时间表地址")
+
+        with self._refresh_lock:
+            with self._lock:
+                self._ensure_loaded()
+                headers = {}
+                if not force and self._source == url:
+                    if self._etag:
+                        headers["If-None-Match"] = self._etag
+                    if self._last_modified:
+                        headers["If-Modified-Since"] = self._last_modified
+
+            resp = self.client.get(url, headers=headers)
+            events = None if resp.not_modified else parse_schedule(resp.json())
+
+            with self._lock:
+                self._fetched_at = time.time()
+                if events is None:
+                    logger.debug("时间表未变化 (304)")
+                    self._save()
+                    return False
+
+                self._source = url
+                self._etag = resp.header("etag")
+                self._last_modified = resp.header("last-modified")
+                changed = events != self._events
+                self._set_events(events)
+                self._save()
+                listeners = list(self._listeners) if changed else []
+                snapshot = list(self._events)
+
+        logger.info(f"时间表已更新，共 {len(snapshot)} 场直播")
+        for listener in listeners:
+            try:
+                listener(snapshot)
+            except Exception:  # noqa: BLE001
+                logger.exception("时间表回调出错")
+        return changed
+
+    def refresh_if_stale(self, max_age: float | None = None) -> bool:
+        """距离上次刷新超过 max_age 秒（默认读取配置）时才刷新，失败只记录日志"""
+        max_age = max_age if max_age is not None else cfg.schedule_refresh_minutes.value * 60
+        with self._lock:
+            self._ensure_loaded()
+            fresh = self._source == self.url and time.time() - self._fetched_at < max_age
+        if fresh:
+            return False
+        try:
+            return self.refresh()
+        except (HttpError, ValueError, TypeError) as e:
+            logger.warning(f"刷新时间表失败: {e}")
+            return False
+
+    # ---- 查询 ----
+
+    @property
+    def events(self) -> list[ScheduleEvent]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._events)
+
+    def upcoming(self, now: float | None = None, limit: int | None = None) -> list[ScheduleEvent]:
+        """尚未开始（或正在进行）的直播"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._ensure_loaded()
+            i = bisect.bisect_left(self._starts, now)
+            # 已开始但尚未结束的直播也算
+            while i > 0 and (self._events[i - 1].end or 0) > now:
+                i -= 1
+            end = len(self._events) if limit is None else i + limit
+            return self._events[i:end]
+
+    def next_stream(self, now: float | None = None) -> ScheduleEvent | None:
+        """下一场开始的直播"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._ensure_loaded()
+            i = bisect.bisect_left(self._starts, now)
+            return self._events[i] if i < len(self._events) else None
+
+    def between(self, start: float, end: float) -> list[ScheduleEvent]:
+        """开始时间在 [start, end) 内的直播"""
+        with self._lock:
+            self._ensure_loaded()
+            lo = bisect.bisect_left(self._starts, start)
+            hi = bisect.bisect_left(self._starts, end)
+            return self._events[lo:hi]
+
+    def streams_this_week(self, now: float | None = None) -> list[ScheduleEvent]:
+        """本周（本地时间周一 0 点起 7 天）内的直播"""
+        today = datetime.fromtimestamp(time.time() if now is None else now).astimezone()
+        monday = (today - timedelta(days=today.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.between(monday.timestamp(), (monday + timedelta(days=7)).timestamp())
+
+
+schedule_service = ScheduleService()
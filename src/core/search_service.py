@@ -0,0 +1,203 @@
+import atexit
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+from loguru import logger
+
+from src.config import DATA_DIR
+from src.core.clip_crawler import Clip, ClipStore, clip_store
+from src.core.news_aggregator import NewsAggregator, NewsEntry, news_aggregator
+from src.utils.text_index import TextIndex
+
+SEARCH_INDEX_PATH = DATA_DIR / "search_index.bin"
+# 索引变化后延迟写盘的秒数，连续的增量更新合并为一次写入
+INDEX_SAVE_DELAY = 5.0
+# 补建索引时每次从切片存储读取的条数
+BACKFILL_BATCH = 1000
+
+CLIP_PREFIX = "clip:"
+NEWS_PREFIX = "news:"
+
+SearchResult = Clip | NewsEntry
+
+
+def _clip_doc(clip: Clip) -> tuple[str, str, str]:
+    return f"{CLIP_PREFIX}{clip.bvid}", clip.title, f"{clip.author} {clip.description}"
+
+
+def _news_key(entry: NewsEntry) -> str:
+    return f"{NEWS_PREFIX}{entry.source}:{entry.id}"
+
+
+class SearchService:
+    """切片与资讯的本地全文搜索。
+
+    倒排索引保存在 data/search_index.bin，启动时直接读取；索引缺失或落后于
+    切片存储、资讯时间线时补建缺少的部分。之后订阅 ClipStore 与 NewsAggregator，
+    新数据入库时增量更新索引，并延迟合并写盘
+    """
+
+    def __init__(
+            self,
+            index_path: Path = SEARCH_INDEX_PATH,
+            store: ClipStore = clip_store,
+            aggregator: NewsAggregator = news_aggregator,
+    ):
+        self.index_path = index_path
+        self.store = store
+        self.aggregator = aggregator
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._index: TextIndex | None = None
+        # 索引就绪前收到的新切片，补建完成后再加入
+        self._backlog: list[Clip] = []
+        self._news: dict[str, NewsEntry] = {}
+        self._save_timer: threading.Timer | None = None
+        self._unsubscribers = []
+        self._ready_listeners: list[Callable[[], None]] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._index is not None
+
+    def load(self) -> TextIndex:
+        """读取索引并补建缺少的部分（首次调用可能较慢，可在后台线程中提前调用）"""
+        if (index := self._index) is not None:
+            return index
+        with self._load_lock:
+            if self._index is not None:
+                return self._index
+            try:
+                index = TextIndex.load(self.index_path)
+            except FileNotFoundError:
+                index = TextIndex()
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取搜索索引失败，将重新建立: {e}")
+                index = TextIndex()
+
+            # 先订阅再补建，补建期间入库的数据不会遗漏
+            self._unsubscribers = [
+                self.store.subscribe(self._on_clips),
+                self.aggregator.subscribe(self._on_news),
+            ]
+            self._backfill_clips(index)
+            with self._lock:
+                for clip in self._backlog:
+                    index.add(*_clip_doc(clip))
+                self._backlog.clear()
+                self._index = index
+            self._sync_news()
+            if index.dirty:
+                self._schedule_save()
+            logger.info(f"搜索索引已就绪，共 {len(index)} 条")
+        for listener in list(self._ready_listeners):
+            try:
+                listener()
+            except Exception:  # noqa: BLE001
+                logger.exception("搜索索引就绪回调出错")
+        return index
+
+    def subscribe_ready(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """订阅索引就绪（load() 完成时在其所在线程中回调一次）"""
+        self._ready_listeners.append(listener)
+        return lambda: self._ready_listeners.remove(listener)
+
+    def _backfill_clips(self, index: TextIndex) -> None:
+        total = self.store.count()
+        indexed = len(index.keys(CLIP_PREFIX))
+        if indexed >= total:
+            return
+        logger.info(f"补建切片搜索索引: 已有 {indexed} 条，共 {total} 条")
+        # 从旧到新加入，同分时较新的视频排在前面
+        for end in range(total, 0, -BACKFILL_BATCH):
+            start = max(end - BACKFILL_BATCH, 0)
+            for clip in reversed(self.store.read_range(start, end - start)):
+                key, title, body = _clip_doc(clip)
+                if key not in index:
+                    index.add(key, title, body)
+
+    def _sync_news(self) -> None:
+        """让索引中的资讯与时间线一致：加入新条目，移除已滚出时间线的条目"""
+        with self._lock:
+            index = self._index
+        if index is None:
+            # 索引就绪后 load() 会再同步一次
+            return
+        news = {_news_key(e): e for e in self.aggregator.timeline()}
+        for key in index.keys(NEWS_PREFIX):
+            if key not in news:
+                index.remove(key)
+        for key, entry in news.items():
+            if key not in index:
+                index.add(key, entry.title, entry.summary)
+        self._news = news
+        if index.dirty:
+            self._schedule_save()
+
+    def _on_clips(self, clips: list[Clip]) -> None:
+        with self._lock:
+            index = self._index
+            if index is None:
+                self._backlog.extend(clips)
+                return
+        for clip in clips:
+            index.add(*_clip_doc(clip))
+        self._schedule_save()
+
+    def _on_news(self, _entries: list[NewsEntry]) -> None:
+        self._sync_news()
+
+    # ---- 查询 ----
+
+    def search(self, query: str, limit: int = 20) -> list[SearchResult]:
+        """搜索切片与资讯，按相关度排序；最后一个词按前缀匹配，适合边输入边搜索。
+
+        不会阻塞：索引尚未就绪（load() 未完成）时返回空列表，可通过 ready 与 subscribe_ready() 区分
+        """
+        index = self._index
+        if index is None:
+            return []
+        hits = index.search(query, limit)
+        results: list[SearchResult] = []
+        for hit in hits:
+            if hit.key.startswith(CLIP_PREFIX):
+                item = self.store.get(hit.key.removeprefix(CLIP_PREFIX))
+            else:
+                item = self._news.get(hit.key)
+            if item is not None:
+                results.append(item)
+        return results
+
+    # ---- 持久化 ----
+
+    def _schedule_save(self) -> None:
+        with self._lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(INDEX_SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self) -> None:
+        """立即写入索引（没有变化时不写）"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            index = self._index
+        if index is None or not index.dirty:
+            return
+        try:
+            index.save(self.index_path)
+        except OSError as e:
+            logger.warning(f"保存搜索索引失败: {e}")
+
+    def close(self) -> None:
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers = []
+        self.flush()
+
+
+search_service = SearchService()
+atexit.register(search_service.flush)
@@ -0,0 +1,397 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections.abc import Callable, Hashable
+from contextvars import ContextVar
+from enum import IntEnum
+
+from loguru import logger
+
+# 默认工作线程数：任务多为磁盘扫描、子进程与进程遍历，线程数不宜过多
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+# 结果缓存最多保留的条数
+CACHE_LIMIT = 256
+
+
+class Priority(IntEnum):
+    HIGH = 0  # 用户正在等待的操作
+    NORMAL = 1
+    LOW = 2  # 预热、后台刷新
+
+
+class TaskCancelled(Exception):
+    """任务已被取消"""
+
+
+class CancelToken:
+    """协作式取消标记：长时间运行的任务应定期检查 cancelled 或调用 raise_if_cancelled()"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def event(self) -> threading.Event:
+        """底层的 Event，可传给接受 threading.Event 的函数"""
+        return self._event
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise TaskCancelled()
+
+
+_current_token: ContextVar[CancelToken | None] = ContextVar("current_token", default=None)
+
+
+def current_token() -> CancelToken | None:
+    """当前线程正在执行的任务的取消标记，不在任务中时返回 None"""
+    return _current_token.get()
+
+
+def raise_if_cancelled() -> None:
+    """在任务函数内部调用：所属任务已取消时抛出 TaskCancelled"""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+class _Task:
+    """一次实际执行，可能被多个 TaskHandle 共享（相同 key 的并发调用）"""
+
+    __slots__ = (
+        "args",
+        "callbacks",
+        "done_event",
+        "error",
+        "fn",
+        "handles",
+        "key",
+        "kwargs",
+        "priority",
+        "result",
+        "state",
+        "token",
+        "ttl",
+    )
+
+    QUEUED, RUNNING, DONE = range(3)
+
+    def __init__(self, key, fn, args, kwargs, priority: Priority, ttl: float):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.ttl = ttl
+        self.token = CancelToken()
+        self.state = _Task.QUEUED
+        self.result = None
+        self.error: BaseException | None = None
+        self.handles = 0  # 尚未取消的调用方数量
+        self.callbacks: list[tuple[TaskHandle, Callable[[], None]]] = []
+        self.done_event = threading.Event()
+
+
+class TaskHandle:
+    """一次提交的句柄。
+
+    相同 key 的调用共享同一次执行，但各自持有句柄：某个调用方 cancel() 只影响自己，
+    所有调用方都取消后才真正取消执行
+    """
+
+    def __init__(self, executor: "TaskExecutor", task: _Task):
+        self._executor = executor
+        self._task = task
+        self._cancelled = False
+
+    @property
+    def key(self) -> Hashable:
+        return self._task.key
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled or isinstance(self._task.error, TaskCancelled)
+
+    def done(self) -> bool:
+        return self._cancelled or self._task.done_event.is_set()
+
+    def cancel(self) -> bool:
+        """取消本次调用，已完成时返回 False"""
+        return self._executor._cancel(self)
+
+    def result(self, timeout: float | None = None):
+        """等待并返回结果，任务出错时抛出对应异常
+
+        Raises:
+            TaskCancelled: 本次调用或任务已被取消
+            TimeoutError: 超时
+        """
+        if self._cancelled:
+            raise TaskCancelled()
+        if not self._task.done_event.wait(timeout):
+            raise TimeoutError()
+        if self._cancelled:
+            raise TaskCancelled()
+        if self._task.error is not None:
+            raise self._task.error
+        return self._task.result
+
+    def add_done_callback(self, callback: Callable[["TaskHandle"], None]) -> None:
+        """任务结束（完成、出错或取消）后调用，回调在工作线程中执行；已结束时立即调用"""
+        self._executor._add_callback(self, lambda: callback(self))
+
+
+class TaskExecutor:
+    """后台任务执行器。
+
+    - 固定数量的工作线程，从按优先级排序的队列中取任务，同优先级先进先出
+    - 相同 key 的任务在执行期间只运行一次，后来的调用直接共享结果（singleflight），
+      key 默认由函数与参数生成
+    - ttl > 0 时成功的结果缓存 ttl 秒，期间相同 key 的调用直接返回
+    - 取消是协作式的：排队中的任务直接移出，运行中的任务通过 CancelToken 通知，
+      任务函数可用 raise_if_cancelled() 提前结束
+
+    结果通过 TaskHandle.add_done_callback 在工作线程中回调，界面使用
+    src.ui.task_signals 转换为 Qt 信号
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, cache_limit: int = CACHE_LIMIT):
+        self.workers = max(1, workers)
+        self.cache_limit = cache_limit
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, int, _Task]] = []
+        self._seq = itertools.count()
+        self._inflight: dict[Hashable, _Task] = {}
+        self._cache: dict[Hashable, tuple[float, object]] = {}  # key -> (过期时间, 结果)
+        self._threads: list[threading.Thread] = []
+        self._stopping = False
+
+    # ---- 提交 ----
+
+    @staticmethod
+    def make_key(fn: Callable, args: tuple, kwargs: dict) -> Hashable | None:
+        """由函数与参数生成 key，参数不可哈希时返回 None（不合并）"""
+        key = (fn, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def submit(
+            self,
+            fn: Callable,
+            *args,
+            key: Hashable | None = None,
+            priority: Priority = Priority.NORMAL,
+            ttl: float = 0.0,
+            **kwargs,
+    ) -> TaskHandle:
+        """提交任务
+
+        Parameters:
+            fn / args / kwargs: 要执行的函数与参数
+            key: Hashable | None = None  # 合并与缓存用的 key，默认由函数与参数生成
+            priority: Priority = Priority.NORMAL
+            ttl: float = 0.0  # 成功结果的缓存秒数，0 表示不缓存
+
+        Returns:
+            TaskHandle: 任务句柄
+        """
+        if key is None:
+            key = self.make_key(fn, args, kwargs)
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("任务执行器已关闭")
+            if key is not None:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] > time.monotonic():
+                    return self._completed(key, cached[1])
+                task = self._inflight.get(key)
+                if task is not None:
+                    task.handles += 1
+                    task.ttl = max(task.ttl, ttl)
+                    if task.state == _Task.QUEUED and priority < task.priority:
+                        # 更高优先级的调用加入时提前排队，旧的队列项出队时跳过
+                        task.priority = priority
+                        heapq.heappush(self._queue, (priority, next(self._seq), task))
+                        self._cond.notify()
+                    return TaskHandle(self, task)
+
+            task = _Task(key, fn, args, kwargs, priority, ttl)
+            task.handles = 1
+            if key is not None:
+                self._inflight[key] = task
+            heapq.heappush(self._queue, (priority, next(self._seq), task))
+            self._ensure_workers()
+            self._cond.notify()
+            return TaskHandle(self, task)
+
+    def _completed(self, key: Hashable, result) -> TaskHandle:
+        task = _Task(key, None, (), {}, Priority.NORMAL, 0.0)
+        task.state = _Task.DONE
+        task.result = result
+        task.handles = 1
+        task.done_event.set()
+        return TaskHandle(self, task)
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """清除缓存的结果，key 为 None 时全部清除"""
+        with self._cond:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+    # ---- 取消与回调 ----
+
+    def _cancel(self, handle: TaskHandle) -> bool:
+        with self._cond:
+            task = handle._task
+            if handle._cancelled or task.state == _Task.DONE:
+                return False
+            handle._cancelled = True
+            task.handles -= 1
+            if task.handles > 0:
+                # 其他调用方仍在等待，只结束本次调用
+                callbacks = self._take_callbacks(task, handle)
+            else:
+                # 没有调用方需要结果了：排队中的任务直接结束，运行中的任务通知其尽快停止
+                task.token.cancel()
+                if task.key is not None and self._inflight.get(task.key) is task:
+                    # 之后相同 key 的调用重新执行，不再加入这次已取消的执行
+                    del self._inflight[task.key]
+                callbacks = self._take_callbacks(task, handle)
+                if task.state == _Task.QUEUED:
+                    self._finish(task, None, TaskCancelled())
+                    callbacks += self._take_callbacks(task)
+        self._run_callbacks(callbacks)
+        return True
+
+    def _add_callback(self, handle: TaskHandle, callback: Callable[[], None]) -> None:
+        with self._cond:
+            task = handle._task
+            if task.state != _Task.DONE and not handle._cancelled:
+                task.callbacks.append((handle, callback))
+                return
+        self._run_callbacks([callback])
+
+    @staticmethod
+    def _take_callbacks(task: _Task, handle: TaskHandle | None = None) -> list[Callable[[], None]]:
+        """取出任务的回调，指定 handle 时只取出该调用方的"""
+        if handle is None:
+            callbacks, task.callbacks = task.callbacks, []
+        else:
+            callbacks = [c for c in task.callbacks if c[0] is handle]
+            task.callbacks = [c for c in task.callbacks if c[0] is not handle]
+        return [callback for _, callback in callbacks]
+
+    @staticmethod
+    def _run_callbacks(callbacks: list[Callable[[], None]]) -> None:
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:  # noqa: BLE001
+                logger.exception("任务回调出错")
+
+    # ---- 执行 ----
+
+    def _finish(self, task: _Task, result, error: BaseException | None) -> None:
+        task.state = _Task.DONE
+        task.result = result
+        task.error = error
+        if task.key is not None and self._inflight.get(task.key) is task:
+            del self._inflight[task.key]
+            if error is None and task.ttl > 0:
+                self._store(task.key, result, task.ttl)
+        task.done_event.set()
+
+    def _store(self, key: Hashable, result, ttl: float) -> None:
+        now = time.monotonic()
+        if len(self._cache) >= self.cache_limit:
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            while len(self._cache) >= self.cache_limit:
+                # dict 按插入顺序，先淘汰最早写入的
+                del self._cache[next(iter(self._cache))]
+        self._cache[key] = (now + ttl, result)
+
+    def _ensure_workers(self) -> None:
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._run, name=f"task-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _next(self) -> _Task | None:
+        with self._cond:
+            while True:
+                while self._queue:
+                    _, _, task = heapq.heappop(self._queue)
+                    # 已取消或已因提高优先级重新排队的任务跳过
+                    if task.state == _Task.QUEUED:
+                        task.state = _Task.RUNNING
+                        return task
+                if self._stopping:
+                    return None
+                self._cond.wait()
+
+    def _run(self) -> None:
+        while (task := self._next()) is not None:
+            reset = _current_token.set(task.token)
+            result, error = None, None
+            try:
+                task.token.raise_if_cancelled()
+                result = task.fn(*task.args, **task.kwargs)
+                task.token.raise_if_cancelled()
+            except TaskCancelled as e:
+                error = e
+            except Exception as e:  # noqa: BLE001
+                error = e
+                logger.exception(f"后台任务出错: {getattr(task.fn, '__name__', task.fn)}")
+            finally:
+                _current_token.reset(reset)
+            with self._cond:
+                self._finish(task, result, error)
+                callbacks = self._take_callbacks(task)
+            self._run_callbacks(callbacks)
+
+    def pending(self) -> int:
+        """排队中的任务数"""
+        with self._cond:
+            return sum(1 for _, _, task in self._queue if task.state == _Task.QUEUED)
+
+    def shutdown(self, cancel: bool = True, timeout: float | None = 5.0) -> None:
+        """停止工作线程；cancel=True 时取消排队中的任务并通知运行中的任务停止，
+        否则等排队中的任务执行完。
+
+        timeout 是等待全部工作线程结束的总时长，0 表示不等待、None 表示一直等待。
+        工作线程是守护线程，不检查取消的任务不会阻止进程退出"""
+        with self._cond:
+            callbacks = []
+            if cancel:
+                for _, _, task in self._queue:
+                    if task.state == _Task.QUEUED:
+                        task.token.cancel()
+                        self._finish(task, None, TaskCancelled())
+                        callbacks += self._take_callbacks(task)
+                for task in self._inflight.values():
+                    task.token.cancel()
+                self._queue.clear()
+            self._stopping = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        self._run_callbacks(callbacks)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in threads:
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+
+
+task_executor = TaskExecutor()
@@ -0,0 +1,163 @@
+import atexit
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from src.config import DATA_DIR
+from src.utils.atomic_io import atomic_write_json, read_json
+from src.utils.http_client import HttpClient, http_client
+
+THUMBNAIL_DIR = DATA_DIR / "thumbnails"
+# 磁盘缓存的总字节上限，超出后按最近使用时间淘汰到 90%
+DISK_BUDGET = 256 * 1024 * 1024
+# 磁盘索引的延迟写入时间（秒）
+INDEX_SAVE_DELAY = 1.0
+
+
+class ThumbnailDiskCache:
+    """内容寻址的磁盘缓存。
+
+    图片原始字节按 SHA-256 存为 <dir>/<前两位>/<摘要>，相同内容只保存一份；
+    index.json 记录 URL -> 摘要 以及每个文件的大小和最近使用时间，延迟合并写入
+    """
+
+    def __init__(self, directory: Path = THUMBNAIL_DIR, budget: int = DISK_BUDGET):
+        self.directory = directory
+        self.index_path = directory / "index.json"
+        self.budget = budget
+        self._lock = threading.Lock()
+        self._urls: dict[str, str] | None = None
+        self._blobs: dict[str, list] = {}  # 摘要 -> [大小, 最近使用时间]
+        self._save_timer: threading.Timer | None = None
+
+    def _ensure_loaded(self) -> None:
+        if self._urls is not None:
+            return
+        data = read_json(self.index_path, {})
+        self._urls = dict(data.get("urls", {}))
+        self._blobs = {k: list(v) for k, v in data.get("blobs", {}).items()}
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / digest
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return sum(size for size, _ in self._blobs.values())
+
+    def get(self, url: str) -> bytes | None:
+        with self._lock:
+            self._ensure_loaded()
+            digest = self._urls.get(url)
+            if digest is None or digest not in self._blobs:
+                return None
+            self._blobs[digest][1] = time.time()
+            self._schedule_save()
+        try:
+            return self._blob_path(digest).read_bytes()
+        except OSError:
+            with self._lock:
+                self._blobs.pop(digest, None)
+                self._urls.pop(url, None)
+            return None
+
+    def put(self, url: str, data: bytes) -> str:
+        """保存图片，返回内容摘要"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        with self._lock:
+            self._ensure_loaded()
+            exists = digest in self._blobs
+        if not exists:
+            # 缓存文件损坏只会导致重新下载，不需要 fsync
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        with self._lock:
+            self._urls[url] = digest
+            self._blobs[digest] = [len(data), time.time()]
+            self._evict()
+            self._schedule_save()
+        return digest
+
+    def _evict(self) -> None:
+        total = sum(size for size, _ in self._blobs.values())
+        if total <= self.budget:
+            return
+        target = self.budget * 0.9
+        removed = set()
+        for digest, (size, _) in sorted(self._blobs.items(), key=lambda item: item[1][1]):
+            if total <= target:
+                break
+            try:
+                self._blob_path(digest).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"删除缩略图缓存失败: {e}")
+                continue
+            removed.add(digest)
+            total -= size
+        for digest in removed:
+            del self._blobs[digest]
+        self._urls = {url: d for url, d in self._urls.items() if d not in removed}
+        logger.debug(f"缩略图磁盘缓存淘汰 {len(removed)} 个文件")
+
+    def _schedule_save(self) -> None:
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(INDEX_SAVE_DELAY, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self) -> None:
+        """立即写入索引"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if self._urls is None:
+                return
+            data = {"urls": dict(self._urls), "blobs": dict(self._blobs)}
+        try:
+            atomic_write_json(self.index_path, data)
+        except OSError as e:
+            logger.warning(f"保存缩略图索引失败: {e}")
+
+
+class ThumbnailSource:
+    """缩略图原始数据的获取：先查磁盘缓存，未命中时下载，不涉及解码。
+
+    可在任意线程调用；解码与内存缓存在界面层（src.ui.thumbnail_cache）完成
+    """
+
+    def __init__(self, disk: ThumbnailDiskCache | None = None, client: HttpClient = http_client):
+        self.disk = disk if disk is not None else ThumbnailDiskCache()
+        self.client = client
+
+    def fetch(self, url: str) -> tuple[bytes, bool]:
+        """返回 (图片字节, 是否从网络下载)，失败时抛出 HttpError / OSError。
+
+        下载的内容不会自动写入磁盘缓存，确认可以解码后再调用 store()
+        """
+        data = self.disk.get(url)
+        if data is not None:
+            return data, False
+        return self.client.get(url).body, True
+
+    def store(self, url: str, data: bytes) -> None:
+        self.disk.put(url, data)
+
+    def flush(self) -> None:
+        self.disk.flush()
+
+
+thumbnail_source = ThumbnailSource()
+atexit.register(thumbnail_source.flush)
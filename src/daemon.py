@@ -0,0 +1,405 @@
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from collections.abc import Callable
+
+from src.utils.single_instance import instance_running, server_address
+
+# 无界面模式：python -m src.daemon [run|status|crawl|stop]
+# 只使用核心模块，不导入 Qt 与 qfluentwidgets，常驻时的内存只有界面程序的一小部分。
+# 日志、配置与核心模块在解析完命令行之后才导入
+
+# 在日志中汇总托管应用资源占用的间隔（秒）
+REPORT_INTERVAL = 600.0
+
+APP_KEYS = ("nsp", "evz", "neurolings")
+# 等待后台服务退出的时间（秒）
+STOP_TIMEOUT = 10.0
+
+# Windows API 常量
+EVENT_MODIFY_STATE = 0x0002
+WAIT_OBJECT_0 = 0
+
+
+def _state_path():
+    from src.config import DATA_DIR
+
+    return DATA_DIR / "daemon.json"
+
+
+def daemon_pid() -> int | None:
+    """正在运行的后台服务的进程号，没有时返回 None"""
+    import psutil
+
+    from src.utils.atomic_io import read_json
+
+    state = read_json(_state_path(), {})
+    pid = state.get("pid") if isinstance(state, dict) else None
+    if not isinstance(pid, int) or pid == os.getpid():
+        return None
+    try:
+        proc = psutil.Process(pid)
+        # 进程号可能已被其他进程复用
+        if abs(proc.create_time() - state.get("started", 0)) > 1:
+            return None
+    except psutil.Error:
+        return None
+    return pid
+
+
+def _stop_event_name() -> str:
+    return f"Local\\{server_address()}-daemon-stop"
+
+
+class StopEvent:
+    """Windows 上请求后台服务退出的命名事件。
+
+    Windows 没有 SIGTERM，psutil 的 terminate() 是 TerminateProcess，进程被直接结束，
+    Daemon.stop() 不会执行。后台服务运行期间持有该事件，request_daemon_stop() 设置它让服务自行退出
+    """
+
+    def __init__(self):
+        import ctypes
+
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        # 手动重置、初始未设置
+        self._handle = self._kernel32.CreateEventW(None, True, False, _stop_event_name())
+
+    def is_set(self) -> bool:
+        return bool(self._handle) and self._kernel32.WaitForSingleObject(self._handle, 0) == WAIT_OBJECT_0
+
+    def close(self) -> None:
+        if self._handle:
+            self._kernel32.CloseHandle(self._handle)
+            self._handle = None
+
+    @staticmethod
+    def signal() -> bool:
+        """设置运行中的后台服务的事件，没有找到（未运行或旧版本）时返回 False"""
+        import ctypes
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenEventW(EVENT_MODIFY_STATE, False, _stop_event_name())
+        if not handle:
+            return False
+        try:
+            return bool(kernel32.SetEvent(handle))
+        finally:
+            kernel32.CloseHandle(handle)
+
+
+class PeriodicJob:
+    """在独立线程中按固定间隔执行的任务，首次立即执行"""
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], object], stop: threading.Event):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._stop = stop
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"daemon-{self.name}", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        from loguru import logger
+
+        while not self._stop.is_set():
+            try:
+                self.fn()
+            except Exception:  # noqa: BLE001
+                logger.exception(f"后台任务 {self.name} 出错")
+            self._stop.wait(self.interval)
+
+
+class Daemon:
+    """无界面后台服务。
+
+    监视托管应用的进程与资源占用、按时间表安排开播提醒（输出到日志），
+    并与界面程序一样通过 background_poller 定期刷新时间表、爬取切片与刷新资讯，
+    数据与界面程序共用同一份缓存。与界面程序互斥：界面程序运行时拒绝启动，界面程序启动时停止后台服务
+    """
+
+    def __init__(self, crawl_minutes: float | None = None, news_minutes: float | None = None):
+        # 为 None 时使用配置中的间隔
+        self.crawl_minutes = crawl_minutes
+        self.news_minutes = news_minutes
+        self._stop = threading.Event()
+        self.jobs = [PeriodicJob("report", REPORT_INTERVAL, self._report, self._stop)]
+        self._unsubscribe: Callable[[], None] | None = None
+
+    @staticmethod
+    def _report() -> None:
+        from loguru import logger
+
+        from src.utils.file_system_utils import format_size
+        from src.utils.process_registry import process_registry
+        from src.utils.resource_monitor import Metric, resource_monitor
+
+        for path, pids in process_registry.refresh().items():
+            if not pids:
+                continue
+            rss = resource_monitor.stats(path, Metric.RSS, REPORT_INTERVAL)
+            cpu = resource_monitor.stats(path, Metric.CPU, REPORT_INTERVAL)
+            if rss is None or cpu is None:
+                continue
+            logger.info(
+                f"{os.path.basename(path)}: 内存 平均 {format_size(rss.average)} / 峰值 {format_size(rss.maximum)}, "
+                f"CPU 平均 {cpu.average:.1f}% / 峰值 {cpu.maximum:.1f}%"
+            )
+
+    @staticmethod
+    def _on_notifications(notifications) -> None:
+        from loguru import logger
+
+        for notification in notifications:
+            logger.info(f"[{notification.title}] {notification.message} {notification.url}".rstrip())
+
+    def start(self) -> None:
+        import psutil
+
+        from src.core.background_poller import background_poller
+        from src.core.notification_scheduler import (
+            notification_scheduler,
+            watch_stream_schedule,
+        )
+        from src.utils.atomic_io import atomic_write_json
+        from src.utils.metrics import watch_textfile_config
+        from src.utils.process_registry import watch_configured_apps
+        from src.utils.resource_monitor import resource_monitor
+
+        atomic_write_json(_state_path(), {"pid": os.getpid(), "started": psutil.Process().create_time()})
+        watch_configured_apps()
+        watch_textfile_config()
+        resource_monitor.start()
+        self._unsubscribe = notification_scheduler.subscribe(self._on_notifications)
+        watch_stream_schedule()
+        background_poller.start(self.crawl_minutes, self.news_minutes)
+        for job in self.jobs:
+            job.start()
+
+    def stop(self) -> None:
+        from src.core.background_poller import background_poller
+        from src.core.news_aggregator import news_aggregator
+        from src.core.notification_scheduler import notification_scheduler
+        from src.core.task_executor import task_executor
+        from src.utils.metrics import textfile_exporter
+        from src.utils.resource_monitor import resource_monitor
+
+        self._stop.set()
+        background_poller.stop()
+        task_executor.shutdown()
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        notification_scheduler.stop()
+        resource_monitor.stop()
+        textfile_exporter.stop()
+        news_aggregator.close()
+        for job in self.jobs:
+            job.join(timeout=5)
+        try:
+            _state_path().unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._stop.wait(timeout)
+
+    def request_stop(self, *_) -> None:
+        self._stop.set()
+
+
+def run(args: argparse.Namespace) -> int:
+    from loguru import logger
+
+    if instance_running():
+        print("界面程序正在运行，无法同时启动后台服务", file=sys.stderr)
+        return 1
+    pid = daemon_pid()
+    if pid is not None:
+        print(f"后台服务已在运行 (pid {pid})", file=sys.stderr)
+        return 1
+
+    daemon = Daemon(args.crawl_minutes, args.news_minutes)
+    signal.signal(signal.SIGINT, daemon.request_stop)
+    signal.signal(signal.SIGTERM, daemon.request_stop)
+    if hasattr(signal, "SIGBREAK"):
+        signal.signal(signal.SIGBREAK, daemon.request_stop)
+
+    stop_event = StopEvent() if os.name == "nt" else None
+    daemon.start()
+    logger.info(f"后台服务已启动 (pid {os.getpid()})")
+    # 定期醒来，让 Windows 上的 Ctrl+C 与停止请求能及时处理
+    while not daemon.wait(1.0):
+        if stop_event is not None and stop_event.is_set():
+            daemon.request_stop()
+    logger.info("后台服务正在退出")
+    daemon.stop()
+    if stop_event is not None:
+        stop_event.close()
+    return 0
+
+
+def status(_: argparse.Namespace) -> int:
+    import psutil
+
+    from src.config import cfg
+    from src.core.clip_crawler import clip_store
+    from src.core.schedule_service import schedule_service
+    from src.utils.file_system_utils import format_size
+    from src.utils.process_registry import process_registry
+
+    pid = daemon_pid()
+    if instance_running():
+        print("界面程序: 运行中")
+    print(f"后台服务: {f'运行中 (pid {pid})' if pid else '未运行'}")
+
+    items = {"nsp": cfg.nsp_path, "evz": cfg.evz_path, "neurolings": cfg.neurolings_path}
+    paths = {key: item.value for key, item in items.items() if item.value}
+    process_registry.set_targets(paths.values())
+    process_registry.refresh()
+    for key in APP_KEYS:
+        path = paths.get(key)
+        if not path:
+            print(f"{key}: 未设置路径")
+            continue
+        rss = 0
+        procs = process_registry.processes(path)
+        for proc in procs:
+            try:
+                rss += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        state = f"运行中, {len(procs)} 个进程, 内存 {format_size(rss)}" if procs else "未运行"
+        print(f"{key}: {state}")
+
+    stream = schedule_service.next_stream()
+    if stream is not None:
+        print(f"下一场直播: {stream.start_time:%Y-%m-%d %H:%M} {stream.title}")
+    print(f"已收录切片: {clip_store.count()}")
+    return 0
+
+
+def crawl(_: argparse.Namespace) -> int:
+    from src.core.clip_crawler import crawl_latest_clips
+
+    ok, result = crawl_latest_clips()
+    if not ok:
+        print(f"爬取失败: {result}", file=sys.stderr)
+        return 1
+    print(f"{result.pages} 页, {len(result.new)} 条新视频, {result.requests} 次请求")
+    return 0
+
+
+def request_daemon_stop() -> int | None:
+    """请求正在运行的后台服务退出，不等待（界面程序启动时调用，由界面接管定期刷新）。
+
+    POSIX 上发送 SIGTERM，Windows 上设置 StopEvent；两种方式都由后台服务自己执行
+    Daemon.stop()，写完共用的缓存并删除 daemon.json
+
+    Returns:
+        pid: int | None: 后台服务的进程号，没有运行时为 None
+    """
+    import psutil
+
+    pid = daemon_pid()
+    if pid is None:
+        return None
+    try:
+        if os.name != "nt":
+            os.kill(pid, signal.SIGTERM)
+        elif not StopEvent.signal():
+            # 不支持停止请求的旧版本，只能直接结束
+            psutil.Process(pid).terminate()
+    except (OSError, psutil.Error):
+        pass
+    return pid
+
+
+def wait_daemon_stopped(pid: int, timeout: float = STOP_TIMEOUT) -> tuple[bool, str]:
+    """等待后台服务退出（会阻塞，界面中请在后台线程调用）
+
+    Returns:
+        result: tuple[bool, str]: (是否已退出, 信息)
+    """
+    import psutil
+
+    try:
+        proc = psutil.Process(pid)
+        deadline = time.monotonic() + timeout
+        # 已退出但尚未被父进程回收的进程（僵尸进程）也算已停止
+        while proc.status() != psutil.STATUS_ZOMBIE:
+            if time.monotonic() >= deadline:
+                return False, f"后台服务 (pid {pid}) 未在 {timeout:.0f} 秒内退出"
+            time.sleep(0.05)
+    except psutil.NoSuchProcess:
+        pass
+    except psutil.Error as e:
+        return False, f"停止后台服务失败: {e}"
+    return True, f"后台服务 (pid {pid}) 已停止"
+
+
+def stop_daemon(timeout: float = STOP_TIMEOUT) -> tuple[bool, str]:
+    """停止正在运行的后台服务并等待其退出
+
+    Returns:
+        result: tuple[bool, str]: (是否已停止或本来就没有运行, 信息)
+    """
+    pid = request_daemon_stop()
+    if pid is None:
+        return True, "后台服务未运行"
+    return wait_daemon_stopped(pid, timeout)
+
+
+def stop(_: argparse.Namespace) -> int:
+    ok, message = stop_daemon()
+    print(message, file=sys.stdout if ok else sys.stderr)
+    return 0 if ok else 1
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m src.daemon", description="swarmToolbox 无界面模式")
+    parser.add_argument("-q", "--quiet", action="store_true", help="控制台只输出警告与错误")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="前台运行后台服务（默认）")
+    run_parser.add_argument("--crawl-minutes", type=float,
+                            help="切片爬取间隔（分钟），0 表示不爬取，默认使用配置 Clips.CrawlMinutes")
+    run_parser.add_argument("--news-minutes", type=float,
+                            help="资讯刷新间隔（分钟），0 表示不刷新，默认使用配置 News.RefreshMinutes")
+    run_parser.set_defaults(handler=run)
+
+    commands.add_parser("status", help="显示托管应用与后台服务的状态").set_defaults(handler=status)
+    commands.add_parser("crawl", help="执行一次切片爬取").set_defaults(handler=crawl)
+    commands.add_parser("stop", help="停止正在运行的后台服务").set_defaults(handler=stop)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args([*argv, "run"])
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
+    from src.config import load_config
+    from src.utils.log_utils import setup_logger
+
+    setup_logger(name="swarmToolbox-daemon", level="WARNING" if args.quiet else "INFO")
+    load_config()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+from pathlib import PurePosixPath
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QRect, QSize, Qt
+from PyQt6.QtGui import QIcon, QIconEngine, QImage, QImageReader, QPainter, QPixmap
+from PyQt6.QtSvg import QSvgRenderer
+from qfluentwidgets import isDarkTheme
+
+from src.utils.asset_bundle import AssetBundle, asset_bundle
+from src.utils.lru_cache import ByteLRU
+
+# 已缩放的位图缓存上限（字节）
+PIXMAP_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def _theme_name() -> str:
+    return "dark" if isDarkTheme() else "light"
+
+
+class IconCache:
+    """从资源包解码图标，按尺寸、缩放比例与主题缓存。
+
+    主题变体按文件名约定查找：main.ico 在深色主题下优先使用 main.dark.ico。
+    每个资源（及其主题变体）只解码一次，ICO 的所有尺寸一并保留；
+    切换主题或移动到缩放比例不同的显示器时，只需从已解码的图像缩放出新尺寸，
+    已经生成过的尺寸直接命中缓存。只在界面线程中使用
+    """
+
+    def __init__(self, bundle: AssetBundle = asset_bundle, max_bytes: int = PIXMAP_CACHE_BYTES):
+        self.bundle = bundle
+        self.decodes = 0  # 解码次数，用于验证缓存
+        # 资源名 -> 已解码的图像（按尺寸从小到大）；SVG 为渲染器
+        self._sources: dict[str, list[QImage] | QSvgRenderer | None] = {}
+        self._pixmaps = ByteLRU(max_bytes)
+
+    def _variant(self, name: str, theme: str) -> str | None:
+        """返回实际使用的资源名：存在主题变体时使用变体"""
+        path = PurePosixPath(name)
+        themed = str(path.with_name(f"{path.stem}.{theme}{path.suffix}"))
+        if themed in self.bundle:
+            return themed
+        return name if name in self.bundle else None
+
+    def _source(self, name: str) -> list[QImage] | QSvgRenderer | None:
+        if name in self._sources:
+            return self._sources[name]
+        data = QByteArray(self.bundle.read(name))
+        self.decodes += 1
+        source: list[QImage] | QSvgRenderer | None
+        if name.lower().endswith(".svg"):
+            renderer = QSvgRenderer(data)
+            source = renderer if renderer.isValid() else None
+        else:
+            buffer = QBuffer(data)
+            buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+            reader = QImageReader(buffer)
+            images = []
+            # ICO 等格式包含多个尺寸，全部读出
+            for _ in range(max(1, reader.imageCount())):
+                image = reader.read()
+                if image.isNull():
+                    break
+                images.append(image)
+                if not reader.jumpToNextImage():
+                    break
+            images.sort(key=lambda img: img.width() * img.height())
+            source = images or None
+        self._sources[name] = source
+        return source
+
+    def pixmap(self, name: str, size: QSize | int, scale: float = 1.0, theme: str | None = None) -> QPixmap | None:
+        """返回逻辑尺寸为 size、设备像素比为 scale 的图标，资源不存在或无法解码时返回 None"""
+        if isinstance(size, int):
+            size = QSize(size, size)
+        name = self._variant(name, theme or _theme_name())
+        if name is None or size.isEmpty():
+            return None
+        key = (name, size.width(), size.height(), round(scale * 100))
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        source = self._source(name)
+        if source is None:
+            return None
+        target = QSize(round(size.width() * scale), round(size.height() * scale))
+        if isinstance(source, QSvgRenderer):
+            image = QImage(target, QImage.Format.Format_ARGB32_Premultiplied)
+            image.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(image)
+            source.render(painter)
+            painter.end()
+        else:
+            # 取不小于目标尺寸的最小图像缩小，都比目标小时取最大的放大
+            image = next(
+                (img for img in source if img.width() >= target.width() and img.height() >= target.height()),
+                source[-1],
+            )
+            if image.size() != target:
+                image = image.scaled(
+                    target, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+                )
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(scale)
+        self._pixmaps.put(key, pixmap, image.sizeInBytes())
+        return pixmap
+
+    def icon(self, name: str) -> QIcon | None:
+        """返回按需生成各尺寸的 QIcon，绘制时跟随当前主题与显示器缩放；资源不存在时返回 None"""
+        if self._variant(name, "light") is None and self._variant(name, "dark") is None:
+            return None
+        return QIcon(_BundleIconEngine(self, name))
+
+    def clear(self) -> None:
+        self._sources.clear()
+        self._pixmaps.clear()
+
+
+class _BundleIconEngine(QIconEngine):
+    def __init__(self, cache: IconCache, name: str):
+        super().__init__()
+        self.cache = cache
+        self.name = name
+
+    def _pixmap(self, size: QSize, scale: float) -> QPixmap:
+        pixmap = self.cache.pixmap(self.name, size, scale)
+        return pixmap if pixmap is not None else QPixmap()
+
+    def pixmap(self, size: QSize, mode: QIcon.Mode, state: QIcon.State) -> QPixmap:
+        return self._pixmap(size, 1.0)
+
+    def scaledPixmap(self, size: QSize, mode: QIcon.Mode, state: QIcon.State, scale: float) -> QPixmap:
+        return self._pixmap(size, scale)
+
+    def paint(self, painter: QPainter, rect: QRect, mode: QIcon.Mode, state: QIcon.State) -> None:
+        pixmap = self._pixmap(rect.size(), painter.device().devicePixelRatioF())
+        if not pixmap.isNull():
+            painter.drawPixmap(rect, pixmap)
+
+    def availableSizes(self, mode: QIcon.Mode = QIcon.Mode.Normal, state: QIcon.State = QIcon.State.Off) -> list[QSize]:
+        name = self.cache._variant(self.name, _theme_name())
+        source = self.cache._source(name) if name is not None else None
+        if isinstance(source, list):
+            return [img.size() for img in source]
+        return [QSize(16, 16), QSize(32, 32), QSize(64, 64), QSize(256, 256)]
+
+    def actualSize(self, size: QSize, mode: QIcon.Mode, state: QIcon.State) -> QSize:
+        return size
+
+    def clone(self) -> "QIconEngine":
+        return _BundleIconEngine(self.cache, self.name)
+
+    def key(self) -> str:
+        return "swarmToolboxBundle"
+
+
+icon_cache = IconCache()
@@ -0,0 +1,101 @@
+from collections.abc import Callable
+
+from loguru import logger
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+from src.utils.single_instance import (
+    MAX_MESSAGE,
+    InstanceLock,
+    decode_message,
+    encode_message,
+    instance_running,
+    server_address,
+)
+
+CommandHandler = Callable[[str, list[str]], tuple[bool, str]]
+
+
+class InstanceServer(QObject):
+    """单实例服务端：在本地套接字（Windows 为命名管道）上接收后续启动转发来的命令。
+
+    命令在界面线程中由 handler 处理并立即回复，处理函数不应阻塞（耗时操作交给后台任务）。
+    内置命令 "ping" 用于检测实例是否存活
+    """
+
+    def __init__(self, handler: CommandHandler | None = None, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.address = server_address()
+        self._lock = InstanceLock(self.address)
+        self._server = QLocalServer(self)
+        # 只允许当前用户连接
+        self._server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._buffers: dict[QLocalSocket, bytes] = {}
+
+    def listen(self) -> bool:
+        """开始监听，已有其他实例在运行（或正在启动）时返回 False"""
+        # 设置了访问权限时 Qt 会直接替换已存在的套接字文件，检查与删除必须在互斥锁内进行，
+        # 否则两个同时启动的实例可能都认为没有实例在运行，后监听的一方删掉先监听一方的套接字
+        if not self._lock.acquire():
+            return False
+        if instance_running():
+            # 不使用互斥锁的旧版本正在运行
+            self._lock.release()
+            return False
+        # 上次异常退出残留的套接字文件
+        QLocalServer.removeServer(self.address)
+        if not self._server.listen(self.address):
+            # 无法监听时仍然正常运行，只是不能接收转发的命令
+            logger.warning(f"单实例服务启动失败: {self._server.errorString()}")
+        return True
+
+    def close(self) -> None:
+        self._server.close()
+        self._lock.release()
+
+    def _on_new_connection(self) -> None:
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._on_disconnected(s))
+
+    def _on_disconnected(self, socket: QLocalSocket) -> None:
+        self._buffers.pop(socket, None)
+        socket.deleteLater()
+
+    def _on_ready_read(self, socket: QLocalSocket) -> None:
+        data = self._buffers.get(socket, b"") + bytes(socket.readAll())
+        if not data.endswith(b"\n"):
+            if len(data) > MAX_MESSAGE:
+                socket.abort()
+            else:
+                self._buffers[socket] = data
+            return
+        self._buffers[socket] = b""
+
+        ok, message = self._dispatch(data)
+        socket.write(encode_message({"ok": ok, "message": message}))
+        socket.flush()
+        socket.disconnectFromServer()
+
+    def _dispatch(self, data: bytes) -> tuple[bool, str]:
+        try:
+            request = decode_message(data)
+            command = str(request.get("command", ""))
+            args = [str(arg) for arg in request.get("args", [])]
+        except (ValueError, TypeError) as e:
+            return False, f"无效的请求: {e}"
+
+        if command == "ping":
+            return True, "pong"
+        if self.handler is None:
+            return False, "程序正在启动"
+        logger.info(f"收到转发的命令: {command} {' '.join(args)}")
+        try:
+            return self.handler(command, args)
+        except Exception as e:  # noqa: BLE001
+            logger.exception("处理转发的命令失败")
+            return False, str(e)
@@ -0,0 +1,124 @@
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QApplication,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+from qfluentwidgets import CaptionLabel, PushButton, TableWidget
+
+from src.config import cfg
+from src.utils.file_system_utils import format_size
+from src.utils.metrics import MetricsRegistry, Sample, metrics
+
+# 页面可见时的刷新间隔（毫秒）
+REFRESH_INTERVAL_MS = 1000
+
+_HEADERS = ("指标", "标签", "次数 / 值", "平均", "p50", "p95", "总计")
+
+
+def _format(name: str, value: float | None) -> str:
+    if value is None:
+        return "-"
+    if name.endswith("_seconds") and not name.endswith("_time_seconds"):
+        return f"{value * 1000:.2f} ms"
+    if name.endswith("_bytes"):
+        return format_size(value)
+    return f"{value:g}"
+
+
+def _row(sample: Sample) -> tuple[str, ...]:
+    labels = ", ".join(f"{k}={v}" for k, v in sample.labels)
+    if sample.kind != "histogram":
+        return sample.name, labels, _format(sample.name, sample.value), "", "", "", ""
+    return (
+        sample.name,
+        labels,
+        str(sample.count),
+        _format(sample.name, sample.average),
+        _format(sample.name, sample.quantile(0.5)),
+        _format(sample.name, sample.quantile(0.95)),
+        _format(sample.name, sample.value),
+    )
+
+
+class DiagnosticsInterface(QWidget):
+    """诊断页面：显示进程内指标（各操作的次数与耗时分布、内存等）。
+
+    只在页面可见时定时读取注册表，不可见时不产生任何开销
+    """
+
+    def __init__(self, parent=None, registry: MetricsRegistry = metrics):
+        super().__init__(parent)
+        self.setObjectName("diagnosticsInterface")
+        self.registry = registry
+
+        layout = QVBoxLayout(self)
+        label = QLabel("诊断", self)
+        label.setStyleSheet("font-size: 18px; font-weight: bold; padding: 20px;")
+        layout.addWidget(label)
+
+        buttons = QHBoxLayout()
+        self.refreshButton = PushButton("刷新", self)
+        self.refreshButton.clicked.connect(self.refresh)
+        self.resetButton = PushButton("清零", self)
+        self.resetButton.clicked.connect(self._reset)
+        self.copyButton = PushButton("复制 Prometheus 文本", self)
+        self.copyButton.clicked.connect(self._copy)
+        for button in (self.refreshButton, self.resetButton, self.copyButton):
+            buttons.addWidget(button)
+        buttons.addStretch(1)
+        layout.addLayout(buttons)
+
+        self.exportLabel = CaptionLabel(self)
+        layout.addWidget(self.exportLabel)
+
+        self.table = TableWidget(self)
+        self.table.setColumnCount(len(_HEADERS))
+        self.table.setHorizontalHeaderLabels(_HEADERS)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table, 1)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def refresh(self) -> None:
+        path = cfg.metrics_textfile.value
+        self.exportLabel.setText(
+            f"指标文件: {path}（每 {cfg.metrics_textfile_interval.value} 秒写出）" if path
+            else "未启用指标文件导出（配置 Metrics.TextfilePath）"
+        )
+
+        # 还没有任何观测的直方图不显示
+        rows = [_row(s) for s in self.registry.collect() if s.kind != "histogram" or s.count]
+        self.table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, text in enumerate(row):
+                item = self.table.item(r, c)
+                if item is None:
+                    self.table.setItem(r, c, QTableWidgetItem(text))
+                elif item.text() != text:
+                    item.setText(text)
+
+    def _reset(self) -> None:
+        self.registry.reset()
+        self.refresh()
+
+    def _copy(self) -> None:
+        QApplication.clipboard().setText(self.registry.to_prometheus())
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self._timer.stop()
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Protocol
+
+from loguru import logger
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+# 每页条数，与每次 fetchMore 增加的行数相同
+PAGE_SIZE = 50
+# 内存中最多保留的页数，超出后丢弃最久未访问的页，需要时重新读取
+MAX_CACHED_PAGES = 8
+
+
+@dataclass(slots=True, frozen=True)
+class FeedItem:
+    """信息流中的一条内容"""
+
+    key: str
+    title: str
+    subtitle: str = ""
+    timestamp: float = 0.0
+    thumbnail: str = ""  # 封面图 URL
+    url: str = ""
+
+
+class FeedSource(Protocol):
+    """信息流数据源，按从新到旧的顺序提供数据"""
+
+    def count(self) -> int:
+        """当前总条数"""
+        ...
+
+    def fetch(self, offset: int, limit: int) -> list[FeedItem]:
+        """读取第 offset 条起的 limit 条"""
+        ...
+
+
+class ListFeedSource:
+    """基于内存列表的数据源，适合条数不多的内容（例如直播时间表）"""
+
+    def __init__(self, items: list[FeedItem] | None = None):
+        self.items = list(items or [])
+
+    def count(self) -> int:
+        return len(self.items)
+
+    def fetch(self, offset: int, limit: int) -> list[FeedItem]:
+        return self.items[offset:offset + limit]
+
+
+class FeedRole(IntEnum):
+    ITEM = Qt.ItemDataRole.UserRole + 1
+    SUBTITLE = Qt.ItemDataRole.UserRole + 2
+    THUMBNAIL = Qt.ItemDataRole.UserRole + 3
+    URL = Qt.ItemDataRole.UserRole + 4
+
+
+class PagedFeedModel(QAbstractListModel):
+    """分页、按需加载的信息流模型。
+
+    行数随滚动通过 canFetchMore/fetchMore 每次增加一页；数据按页从数据源读取，
+    只在内存中保留最近访问的 max_cached_pages 页，历史再长内存占用也保持不变
+    """
+
+    def __init__(
+            self,
+            source: FeedSource,
+            page_size: int = PAGE_SIZE,
+            max_cached_pages: int = MAX_CACHED_PAGES,
+            parent=None,
+    ):
+        super().__init__(parent)
+        self.source = source
+        self.page_size = page_size
+        self.max_cached_pages = max_cached_pages
+        self._total = source.count()
+        self._rows = 0
+        self._pages: OrderedDict[int, list[FeedItem]] = OrderedDict()
+        self.page_loads = 0
+
+    # ---- 分页 ----
+
+    def _page(self, number: int) -> list[FeedItem]:
+        page = self._pages.get(number)
+        if page is not None:
+            self._pages.move_to_end(number)
+            return page
+        try:
+            page = self.source.fetch(number * self.page_size, self.page_size)
+        except OSError:
+            logger.exception("读取信息流数据失败")
+            page = []
+        self.page_loads += 1
+        self._pages[number] = page
+        while len(self._pages) > self.max_cached_pages:
+            self._pages.popitem(last=False)
+        return page
+
+    def item(self, row: int) -> FeedItem | None:
+        if not 0 <= row < self._rows:
+            return None
+        page = self._page(row // self.page_size)
+        offset = row % self.page_size
+        return page[offset] if offset < len(page) else None
+
+    @property
+    def cached_pages(self) -> int:
+        return len(self._pages)
+
+    def refresh(self) -> None:
+        """数据源内容变化后调用：保留已展开的行数，重新读取数据"""
+        self.beginResetModel()
+        self._pages.clear()
+        self._total = self.source.count()
+        self._rows = min(max(self._rows, self.page_size), self._total)
+        self.endResetModel()
+
+    # ---- QAbstractListModel ----
+
+    def rowCount(self, parent: QModelIndex | None = None) -> int:
+        return 0 if parent is not None and parent.isValid() else self._rows
+
+    def canFetchMore(self, parent: QModelIndex | None = None) -> bool:
+        return (parent is None or not parent.isValid()) and self._rows < self._total
+
+    def fetchMore(self, parent: QModelIndex | None = None) -> None:
+        if parent is not None and parent.isValid():
+            return
+        count = min(self.page_size, self._total - self._rows)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._rows, self._rows + count - 1)
+        self._rows += count
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.item(index.row())
+        if item is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return item.title
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return item.url or item.title
+        if role == FeedRole.ITEM:
+            return item
+        if role == FeedRole.SUBTITLE:
+            return item.subtitle
+        if role == FeedRole.THUMBNAIL:
+            return item.thumbnail
+        if role == FeedRole.URL:
+            return item.url
+        return None
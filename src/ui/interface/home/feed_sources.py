@@ -0,0 +1,81 @@
+from src.core.clip_crawler import Clip, ClipStore
+from src.core.news_aggregator import NewsAggregator, NewsEntry
+from src.core.schedule_service import ScheduleEvent, ScheduleService
+from src.core.search_service import SearchResult
+from src.ui.interface.home.feed_model import FeedItem, ListFeedSource
+
+
+def clip_to_item(clip: Clip) -> FeedItem:
+    minutes, seconds = divmod(clip.duration, 60)
+    subtitle = f"{clip.author} · {minutes}:{seconds:02d}" if clip.author else f"{minutes}:{seconds:02d}"
+    return FeedItem(
+        key=clip.bvid,
+        title=clip.title,
+        subtitle=subtitle,
+        timestamp=clip.pubdate,
+        thumbnail=clip.cover,
+        url=clip.url,
+    )
+
+
+def event_to_item(event: ScheduleEvent) -> FeedItem:
+    return FeedItem(
+        key=f"{event.start}:{event.title}",
+        title=event.title or "直播",
+        timestamp=event.start,
+        url=event.url,
+    )
+
+
+def news_to_item(entry: NewsEntry) -> FeedItem:
+    return FeedItem(
+        key=f"{entry.source}:{entry.id}",
+        title=entry.title,
+        subtitle=entry.source,
+        timestamp=entry.published,
+        url=entry.link,
+    )
+
+
+def search_result_to_item(result: SearchResult) -> FeedItem:
+    return clip_to_item(result) if isinstance(result, Clip) else news_to_item(result)
+
+
+class ClipFeedSource:
+    """切片信息流：直接从 ClipStore 按页读取，不把全部数据载入内存。
+
+    条数取自上次扫描的结果，统计需要扫描文件，应在后台线程中调用 store.count() 更新
+    """
+
+    def __init__(self, store: ClipStore):
+        self.store = store
+
+    def count(self) -> int:
+        return self.store.scanned_count()
+
+    def fetch(self, offset: int, limit: int) -> list[FeedItem]:
+        return [clip_to_item(c) for c in self.store.read_range(offset, limit)]
+
+
+class ScheduleFeedSource(ListFeedSource):
+    """直播时间表信息流：只包含尚未开始或正在进行的直播"""
+
+    def __init__(self, service: ScheduleService):
+        super().__init__()
+        self.service = service
+        self.reload()
+
+    def reload(self) -> None:
+        self.items = [event_to_item(e) for e in self.service.upcoming()]
+
+
+class NewsFeedSource(ListFeedSource):
+    """资讯信息流：聚合后的时间线（条数有上限）"""
+
+    def __init__(self, aggregator: NewsAggregator):
+        super().__init__()
+        self.aggregator = aggregator
+        self.reload()
+
+    def reload(self) -> None:
+        self.items = [news_to_item(e) for e in self.aggregator.timeline()]
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from PyQt6.QtCore import QModelIndex, QRect, QSize, Qt, QUrl
+from PyQt6.QtGui import QColor, QDesktopServices, QFont, QPainter, QPixmap, QPixmapCache
+from PyQt6.QtWidgets import QAbstractItemView, QStyleOptionViewItem
+from qfluentwidgets import ListItemDelegate, ListView, isDarkTheme
+
+from src.ui.interface.home.feed_model import FeedItem, FeedRole
+from src.ui.thumbnail_signals import ThumbnailSignals
+
+ROW_HEIGHT = 76
+THUMBNAIL_SIZE = QSize(112, 63)
+PADDING = 8
+
+
+class FeedItemDelegate(ListItemDelegate):
+    """信息流条目的绘制代理。
+
+    所有行高度相同，视图可以不逐行测量；封面图通过缩略图服务异步加载，
+    转换后的 QPixmap 放入 QPixmapCache，滚动时不会重复转换
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thumbnails = ThumbnailSignals(parent=self)
+        self.thumbnails.thumbnailReady.connect(self._on_thumbnail_ready)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def _on_thumbnail_ready(self, url: str, image) -> None:
+        QPixmapCache.insert(self._pixmap_key(url), QPixmap.fromImage(image))
+        view = self.parent()
+        if isinstance(view, QAbstractItemView):
+            view.viewport().update()
+
+    @staticmethod
+    def _pixmap_key(url: str) -> str:
+        return f"feed-thumbnail:{url}"
+
+    def _thumbnail(self, url: str) -> QPixmap | None:
+        pixmap = QPixmapCache.find(self._pixmap_key(url))
+        if pixmap is not None:
+            return pixmap
+        image = self.thumbnails.load(url, THUMBNAIL_SIZE)
+        if image is None:
+            return None
+        pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(self._pixmap_key(url), pixmap)
+        return pixmap
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        item: FeedItem | None = index.data(FeedRole.ITEM)
+        if item is None:
+            return
+        dark = isDarkTheme()
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        rect = option.rect.adjusted(PADDING // 2, 2, -PADDING // 2, -2)
+        if index.row() == self.hoverRow:
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(QColor(255, 255, 255, 15) if dark else QColor(0, 0, 0, 10))
+            painter.drawRoundedRect(rect, 6, 6)
+
+        left = rect.left() + PADDING
+        if item.thumbnail:
+            thumb_rect = QRect(left, rect.top() + (rect.height() - THUMBNAIL_SIZE.height()) // 2, THUMBNAIL_SIZE.width(), THUMBNAIL_SIZE.height())
+            pixmap = self._thumbnail(item.thumbnail)
+            if pixmap is None:
+                painter.fillRect(thumb_rect, QColor(255, 255, 255, 20) if dark else QColor(0, 0, 0, 15))
+            else:
+                target = pixmap.size().scaled(thumb_rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+                painter.drawPixmap(QRect(thumb_rect.topLeft(), target), pixmap)
+            left = thumb_rect.right() + PADDING * 2
+
+        text_width = rect.right() - PADDING - left
+        title_font = QFont(option.font)
+        title_font.setPixelSize(14)
+        title_font.setBold(True)
+        painter.setFont(title_font)
+        painter.setPen(QColor(255, 255, 255) if dark else QColor(0, 0, 0))
+        title = painter.fontMetrics().elidedText(item.title, Qt.TextElideMode.ElideRight, text_width)
+        painter.drawText(QRect(left, rect.top() + PADDING, text_width, 22), Qt.AlignmentFlag.AlignVCenter, title)
+
+        subtitle = item.subtitle
+        if item.timestamp:
+            stamp = datetime.fromtimestamp(item.timestamp).strftime("%Y-%m-%d %H:%M")
+            subtitle = f"{subtitle} · {stamp}" if subtitle else stamp
+        sub_font = QFont(option.font)
+        sub_font.setPixelSize(12)
+        painter.setFont(sub_font)
+        painter.setPen(QColor(255, 255, 255, 160) if dark else QColor(0, 0, 0, 140))
+        subtitle = painter.fontMetrics().elidedText(subtitle, Qt.TextElideMode.ElideRight, text_width)
+        painter.drawText(QRect(left, rect.top() + PADDING + 26, text_width, 20), Qt.AlignmentFlag.AlignVCenter, subtitle)
+        painter.restore()
+
+
+class FeedView(ListView):
+    """信息流列表。
+
+    只为可见行调用绘制代理，行高统一（setUniformItemSizes），滚动到底部时
+    由模型的 fetchMore 追加下一页；单击条目用浏览器打开其链接
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setItemDelegate(FeedItemDelegate(self))
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setMouseTracking(True)
+        self.clicked.connect(self._open)
+
+    def _open(self, index: QModelIndex) -> None:
+        url = index.data(FeedRole.URL)
+        if url:
+            QDesktopServices.openUrl(QUrl(url))
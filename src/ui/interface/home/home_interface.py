@@ -1,7 +1,34 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QStackedWidget
+from qfluentwidgets import SearchLineEdit, SegmentedWidget
+
+from src.core.clip_crawler import clip_store
+from src.core.news_aggregator import news_aggregator
+from src.core.schedule_service import schedule_service
+from src.core.search_service import search_service
+from src.core.task_executor import Priority
+from src.ui.interface.home.feed_model import FeedItem, ListFeedSource, PagedFeedModel
+from src.ui.interface.home.feed_sources import (
+    ClipFeedSource,
+    NewsFeedSource,
+    ScheduleFeedSource,
+    search_result_to_item,
+)
+from src.ui.interface.home.feed_view import FeedView
+from src.ui.task_signals import run_task
+
+# 搜索结果最多显示的条数
+SEARCH_LIMIT = 100
 
 
 class HomeInterface(QWidget):
+    # 切片、时间表、资讯在后台线程更新，通过信号切换到界面线程刷新
+    clipsChanged = pyqtSignal()
+    scheduleChanged = pyqtSignal()
+    newsChanged = pyqtSignal()
+    # 搜索索引在后台线程读取，就绪后重新执行当前的搜索
+    searchReady = pyqtSignal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("homeInterface")
@@ -11,3 +38,86 @@ class HomeInterface(QWidget):
         label = QLabel("欢迎使用 SwarmToolbox", self)
         label.setStyleSheet("font-size: 18px; font-weight: bold; padding: 20px;")
         layout.addWidget(label)
+
+        # 搜索：边输入边查询本地索引，有输入时用结果列表替换信息流
+        self.searchEdit = SearchLineEdit(self)
+        self.searchEdit.setPlaceholderText("搜索切片和资讯")
+        self.searchEdit.textChanged.connect(self._search)
+        self.searchEdit.searchSignal.connect(self._search)
+        self.searchEdit.clearSignal.connect(lambda: self._search(""))
+        layout.addWidget(self.searchEdit)
+
+        # 信息流：分段切换，每个列表只绘制可见行并按页加载
+        self.segmented = SegmentedWidget(self)
+        self.stack = QStackedWidget(self)
+        layout.addWidget(self.segmented)
+        layout.addWidget(self.stack, 1)
+
+        self.clipModel = self.addFeed("clips", "最新切片", PagedFeedModel(ClipFeedSource(clip_store), parent=self))
+        self.scheduleSource = ScheduleFeedSource(schedule_service)
+        self.scheduleModel = self.addFeed("schedule", "直播时间表", PagedFeedModel(self.scheduleSource, parent=self))
+        self.newsSource = NewsFeedSource(news_aggregator)
+        self.newsModel = self.addFeed("news", "资讯", PagedFeedModel(self.newsSource, parent=self))
+        self.segmented.setCurrentItem("clips")
+
+        self.searchSource = ListFeedSource()
+        self.searchModel = PagedFeedModel(self.searchSource, parent=self)
+        self.searchView = FeedView(self.stack)
+        self.searchView.setObjectName("searchFeed")
+        self.searchView.setModel(self.searchModel)
+        self.stack.addWidget(self.searchView)
+        self._feedView = self.stack.currentWidget()
+
+        # 切片可能在界面线程读取数据时落盘，排队刷新，避免在绘制过程中重置模型
+        self.clipsChanged.connect(self.clipModel.refresh, Qt.ConnectionType.QueuedConnection)
+        self.scheduleChanged.connect(self._reload_schedule)
+        self.newsChanged.connect(self._reload_news)
+        self.searchReady.connect(lambda: self._search(self.searchEdit.text()))
+        unsubscribers = [
+            clip_store.subscribe(self._on_clips),
+            schedule_service.subscribe(lambda _: self.scheduleChanged.emit()),
+            news_aggregator.subscribe(lambda _: self.newsChanged.emit()),
+            search_service.subscribe_ready(self.searchReady.emit),
+        ]
+        self.destroyed.connect(lambda: [unsubscribe() for unsubscribe in unsubscribers])
+        # 首次统计切片条数需要扫描整个 clips.jsonl，放到后台线程
+        run_task(clip_store.count, on_result=lambda _: self.clipsChanged.emit(), parent=self, priority=Priority.LOW)
+
+    def addFeed(self, key: str, text: str, model: PagedFeedModel) -> PagedFeedModel:
+        view = FeedView(self.stack)
+        view.setObjectName(f"{key}Feed")
+        view.setModel(model)
+        self.stack.addWidget(view)
+        self.segmented.addItem(key, text, lambda: self.stack.setCurrentWidget(view))
+        return model
+
+    def _search(self, text: str) -> None:
+        query = text.strip()
+        if not query:
+            self.segmented.setVisible(True)
+            if self.stack.currentWidget() is self.searchView:
+                self.stack.setCurrentWidget(self._feedView)
+            return
+        if self.stack.currentWidget() is not self.searchView:
+            self._feedView = self.stack.currentWidget()
+            self.segmented.setVisible(False)
+            self.stack.setCurrentWidget(self.searchView)
+        if search_service.ready:
+            self.searchSource.items = [search_result_to_item(r) for r in search_service.search(query, SEARCH_LIMIT)]
+        else:
+            # 不在界面线程中等待索引读取，就绪后由 searchReady 重新搜索
+            self.searchSource.items = [FeedItem(key="indexing", title="正在建立搜索索引…")]
+        self.searchModel.refresh()
+
+    def _on_clips(self, _clips) -> None:
+        # 在写入线程中更新条数，界面线程只读取统计结果
+        clip_store.count()
+        self.clipsChanged.emit()
+
+    def _reload_schedule(self) -> None:
+        self.scheduleSource.reload()
+        self.scheduleModel.refresh()
+
+    def _reload_news(self) -> None:
+        self.newsSource.reload()
+        self.newsModel.refresh()
@@ -0,0 +1,26 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from src.utils.launcher import LaunchHandle, LaunchResult
+
+
+class LaunchSignals(QObject):
+    """把 LaunchHandle 的后台回调转换为 Qt 信号。
+
+    信号跨线程发射时会自动排队到接收者所在线程，槽函数可以直接更新界面。
+    订阅推迟到下一次事件循环，构造后连接的槽也能收到补发的早期输出
+    """
+
+    outputReceived = pyqtSignal(str, str)  # (流名称, 行内容)
+    finished = pyqtSignal(object)  # LaunchResult
+
+    def __init__(self, handle: LaunchHandle, parent=None):
+        super().__init__(parent)
+        self.handle = handle
+        QTimer.singleShot(0, self._attach)
+
+    def _attach(self) -> None:
+        self.handle.subscribe(self.outputReceived.emit)
+        self.handle.add_done_callback(self._on_done)
+
+    def _on_done(self, result: LaunchResult) -> None:
+        self.finished.emit(result)
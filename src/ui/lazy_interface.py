@@ -0,0 +1,58 @@
+import importlib
+import time
+from collections.abc import Callable
+
+from loguru import logger
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QVBoxLayout, QWidget
+
+# 页面工厂: "模块路径:类名" 字符串（首次使用时才导入模块），或接收 parent 的可调用对象
+InterfaceFactory = str | Callable[[QWidget], QWidget]
+
+
+def _resolve(factory: InterfaceFactory) -> Callable[[QWidget], QWidget]:
+    if callable(factory):
+        return factory
+    module_name, _, attr = factory.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class LazyInterface(QWidget):
+    """子页面占位控件。
+
+    注册到导航栏时只创建这个轻量的空控件，首次显示（或空闲预热）时
+    才导入页面模块并创建真正的页面，启动耗时不随页面数量增长
+    """
+
+    created = pyqtSignal(QWidget)
+
+    def __init__(self, factory: InterfaceFactory, object_name: str, parent=None):
+        super().__init__(parent)
+        self.setObjectName(object_name)
+        self._factory = factory
+        self._widget: QWidget | None = None
+
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    @property
+    def is_created(self) -> bool:
+        return self._widget is not None
+
+    def widget(self) -> QWidget | None:
+        """真正的页面，尚未创建时为 None"""
+        return self._widget
+
+    def ensure_created(self) -> QWidget:
+        """创建真正的页面（只执行一次）"""
+        if self._widget is None:
+            start = time.perf_counter()
+            self._widget = _resolve(self._factory)(self)
+            self._layout.addWidget(self._widget)
+            logger.debug(f"页面 {self.objectName()} 已创建，用时 {(time.perf_counter() - start) * 1000:.1f} ms")
+            self.created.emit(self._widget)
+        return self._widget
+
+    def showEvent(self, event):  # pyright: ignore[reportIncompatibleMethodOverride]
+        self.ensure_created()
+        super().showEvent(event)
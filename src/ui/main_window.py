@@ -1,5 +1,4 @@
-from PyQt6 import QtGui
-from PyQt6.QtCore import QSize
+from PyQt6.QtCore import QSize, QTimer
 from PyQt6.QtWidgets import QApplication
 from qfluentwidgets import (
     FluentWindow,
@@ -12,24 +11,36 @@ from qfluentwidgets import (
 )
 from loguru import logger
 
-from src.config import ASSETS_DIR, cfg
-from src.ui.interface.home.home_interface import HomeInterface
-from src.ui.interface.setting.setting_interface import SettingInterface
+from src.config import cfg
+from src.ui.icon_cache import icon_cache
+from src.ui.lazy_interface import InterfaceFactory, LazyInterface
+
+# 首帧绘制后，每隔多少毫秒在空闲时预热一个尚未创建的页面
+PREWARM_INTERVAL_MS = 200
+# 退出时最多等待后台任务结束的秒数（工作线程是守护线程，超时后直接退出）
+SHUTDOWN_WAIT = 0.5
+
+# Windows 消息：系统时间被修改、电源状态变化（休眠恢复）
+WM_TIMECHANGE = 0x001E
+WM_POWERBROADCAST = 0x0218
+PBT_APMRESUMESUSPEND = 0x0007
+PBT_APMRESUMEAUTOMATIC = 0x0012
 
 
 class MainWindow(FluentWindow):
     def __init__(self):
         super().__init__()
 
+        # 等待空闲时预热的页面
+        self._prewarm_queue: list[LazyInterface] = []
+
         # 系统主题监听器
         self.themeListener = SystemThemeListener(self)
 
         self.setObjectName("demoWindow")
-        # 使用默认图标，如果main.ico不存在的话
-        icon_path = ASSETS_DIR / "main.ico"
-        if icon_path.exists():
-            icon = QtGui.QIcon(str(icon_path))
-        else:
+        # 图标从资源包读取并按尺寸缓存，main.ico 不存在时使用默认图标
+        icon = icon_cache.icon("main.ico")
+        if icon is None:
             # 使用默认应用图标
             icon = self.style().standardIcon(self.style().StandardPixmap.SP_ComputerIcon)
 
@@ -54,15 +65,25 @@ class MainWindow(FluentWindow):
 
         self.show()
 
-        # 添加子界面
-        self.addSubInterface(
-            interface=HomeInterface(self),
+        # 添加子界面（页面在首次显示时才创建）
+        self.addLazySubInterface(
+            "src.ui.interface.home.home_interface:HomeInterface",
+            object_name="homeInterface",
             icon=FIF.HOME,
             text="主页",
             position=NavigationItemPosition.TOP,
         )
-        self.addSubInterface(
-            interface=SettingInterface(self),
+        self.addLazySubInterface(
+            "src.ui.interface.diagnostics.diagnostics_interface:DiagnosticsInterface",
+            object_name="diagnosticsInterface",
+            icon=FIF.SPEED_HIGH,
+            text="诊断",
+            position=NavigationItemPosition.BOTTOM,
+            prewarm=False,
+        )
+        self.addLazySubInterface(
+            "src.ui.interface.setting.setting_interface:SettingInterface",
+            object_name="settingInterface",
             icon=FIF.SETTING,
             text="设置",
             position=NavigationItemPosition.BOTTOM,
@@ -73,6 +94,142 @@ class MainWindow(FluentWindow):
         # 隐藏启动页面
         self.splashScreen.finish()
 
+        # 首帧之后再做的初始化
+        QTimer.singleShot(0, self._after_first_paint)
+
+    def addLazySubInterface(
+            self,
+            factory: InterfaceFactory,
+            object_name: str,
+            icon,
+            text: str,
+            position=NavigationItemPosition.TOP,
+            prewarm: bool = True,
+    ) -> LazyInterface:
+        """注册延迟创建的子页面。
+
+        Parameters:
+            factory: "模块路径:类名" 或接收 parent 的可调用对象
+            object_name: str  # 页面路由名
+            icon / text / position: 同 addSubInterface
+            prewarm: bool = True  # 是否在空闲时提前创建
+
+        Returns:
+            LazyInterface: 页面占位控件
+        """
+        interface = LazyInterface(factory, object_name, self)
+        self.addSubInterface(interface=interface, icon=icon, text=text, position=position)
+        if prewarm:
+            self._prewarm_queue.append(interface)
+        return interface
+
+    def _after_first_paint(self) -> None:
+        # 注册需要监视的应用进程，各处的运行状态查询共享同一份进程快照
+        from src.utils.process_registry import watch_configured_apps
+
+        watch_configured_apps()
+
+        # 按配置把指标写成 Prometheus 文本文件
+        from src.utils.metrics import watch_textfile_config
+
+        watch_textfile_config()
+
+        # 开播提醒：按时间表安排，到期时在界面线程显示
+        from src.core.notification_scheduler import (
+            notification_scheduler,
+            watch_stream_schedule,
+        )
+        from src.ui.notifier import DesktopNotifier
+
+        self.notifier = DesktopNotifier(self, notification_scheduler)
+        watch_stream_schedule()
+
+        # 定期刷新时间表、爬取切片与刷新资讯（与无界面模式相同），结果通过各服务的订阅通知页面
+        from src.core.task_executor import Priority, task_executor
+
+        task_executor.submit(self._start_polling, priority=Priority.HIGH)
+
+        # 搜索索引：后台读取并补建，首次搜索时无需等待
+        from src.core.search_service import search_service
+        from src.ui.task_signals import run_task
+
+        run_task(search_service.load, priority=Priority.LOW, parent=self)
+
+        # 程序路径未设置或已失效时，在后台自动查找
+        from src.core.app_discovery import app_discovery
+
+        task_executor.submit(app_discovery.refresh, priority=Priority.LOW)
+        QTimer.singleShot(PREWARM_INTERVAL_MS, self._prewarm_next)
+
+    @staticmethod
+    def _start_polling() -> None:
+        """在后台线程中执行：启动时已请求后台服务退出，等它写完共用的缓存后再开始定期刷新"""
+        from src.core.background_poller import background_poller
+        from src.daemon import daemon_pid, wait_daemon_stopped
+
+        pid = daemon_pid()
+        if pid is not None:
+            ok, message = wait_daemon_stopped(pid)
+            logger.log("INFO" if ok else "WARNING", message)
+        background_poller.start()
+
+    def _prewarm_next(self) -> None:
+        """每次空闲只创建一个页面，避免长时间占用界面线程"""
+        while self._prewarm_queue:
+            interface = self._prewarm_queue.pop(0)
+            if not interface.is_created:
+                interface.ensure_created()
+                break
+        if self._prewarm_queue:
+            QTimer.singleShot(PREWARM_INTERVAL_MS, self._prewarm_next)
+
+    def activate(self) -> None:
+        """显示并激活窗口（最小化时恢复）"""
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def handle_instance_command(self, command: str, args: list[str]) -> tuple[bool, str]:
+        """处理再次启动时转发来的命令（在界面线程中执行，不能阻塞）
+
+        Returns:
+            result: tuple[bool, str]: (是否成功, 回复信息)
+        """
+        if command == "activate":
+            self.activate()
+            return True, "已激活窗口"
+        if command == "launch":
+            from src.core.app_discovery import app_discovery
+            from src.core.task_executor import Priority, task_executor
+            from src.utils.file_system_utils import start_exe
+
+            key = args[0].lower() if args else ""
+            if key not in app_discovery.targets:
+                return False, f"未知程序: {key}，可选: {', '.join(app_discovery.targets)}"
+            target = app_discovery.targets[key]
+            path = app_discovery.locate(key)
+            if path is None:
+                return False, f"{target.label} 路径未设置"
+            task_executor.submit(start_exe, str(path), priority=Priority.HIGH)
+            return True, f"正在启动 {target.label}"
+        return False, f"未知命令: {command}"
+
+    def nativeEvent(self, eventType, message):
+        if eventType == b"windows_generic_MSG":
+            import ctypes.wintypes
+
+            msg = ctypes.wintypes.MSG.from_address(int(message))
+            if msg.message == WM_TIMECHANGE or (
+                    msg.message == WM_POWERBROADCAST and msg.wParam in (PBT_APMRESUMESUSPEND, PBT_APMRESUMEAUTOMATIC)
+            ):
+                # 休眠期间等待计时暂停、系统时间被修改，都需要让通知调度器重新计算
+                from src.core.notification_scheduler import notification_scheduler
+
+                notification_scheduler.wake()
+        return super().nativeEvent(eventType, message)
+
     def closeEvent(self, event):  # pyright: ignore[reportIncompatibleMethodOverride]
         try:
             logger.info("正在弹出退出确认对话框...")
@@ -83,6 +240,20 @@ class MainWindow(FluentWindow):
             if w.exec():
                 logger.info("用户确认退出，程序即将关闭。")
                 event.accept()
+                cfg.flush()
+                from src.core.notification_scheduler import notification_scheduler
+
+                notification_scheduler.stop()
+                from src.core.background_poller import background_poller
+
+                background_poller.stop()
+                from src.utils.metrics import textfile_exporter
+
+                textfile_exporter.stop()
+                from src.core.task_executor import task_executor
+
+                # 爬取、刷新等长任务不一定检查取消，不在界面线程中等它们结束
+                task_executor.shutdown(timeout=SHUTDOWN_WAIT)
                 self.themeListener.terminate()
                 self.themeListener.deleteLater()
                 QApplication.quit()
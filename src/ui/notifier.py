@@ -0,0 +1,57 @@
+from PyQt6.QtCore import QObject, QUrl, pyqtSignal
+from PyQt6.QtGui import QDesktopServices
+from PyQt6.QtWidgets import QApplication, QSystemTrayIcon, QWidget
+from qfluentwidgets import InfoBar, InfoBarPosition
+
+from src.core.notification_scheduler import Notification, NotificationScheduler
+
+# 通知显示时长（毫秒）
+NOTIFY_DURATION_MS = 10000
+
+
+class DesktopNotifier(QObject):
+    """在界面线程中显示调度器发出的通知。
+
+    优先使用系统托盘气泡，托盘不可用时在主窗口右上角显示 InfoBar；
+    同时到期的多条通知合并为一条显示
+    """
+
+    notificationsDue = pyqtSignal(list)  # list[Notification]
+
+    def __init__(self, window: QWidget, scheduler: NotificationScheduler):
+        super().__init__(window)
+        self.window = window
+        self._tray: QSystemTrayIcon | None = None
+        self._url = ""
+        self.notificationsDue.connect(self._show)
+        # 调度器在后台线程回调，信号会排队到界面线程
+        unsubscribe = scheduler.subscribe(self.notificationsDue.emit)
+        self.destroyed.connect(lambda: unsubscribe())
+
+    def _show(self, notifications: list[Notification]) -> None:
+        if len(notifications) == 1:
+            title = notifications[0].title
+        else:
+            title = f"{len(notifications)} 条提醒"
+        message = "\n".join(n.message for n in notifications)
+        self._url = next((n.url for n in notifications if n.url), "")
+
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            if self._tray is None:
+                self._tray = QSystemTrayIcon(self.window.windowIcon(), self)
+                self._tray.messageClicked.connect(self._open)
+                self._tray.show()
+            self._tray.showMessage(title, message, QSystemTrayIcon.MessageIcon.Information, NOTIFY_DURATION_MS)
+        else:
+            InfoBar.info(
+                title,
+                message,
+                duration=NOTIFY_DURATION_MS,
+                position=InfoBarPosition.TOP_RIGHT,
+                parent=self.window,
+            )
+        QApplication.alert(self.window)
+
+    def _open(self) -> None:
+        if self._url:
+            QDesktopServices.openUrl(QUrl(self._url))
@@ -0,0 +1,90 @@
+import threading
+from collections.abc import Callable
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.core.task_executor import (
+    Priority,
+    TaskCancelled,
+    TaskExecutor,
+    TaskHandle,
+    task_executor,
+)
+
+
+class TaskSignals(QObject):
+    """把 TaskExecutor 的后台结果转换为 Qt 信号。
+
+    每次 run() 对应一个 TaskSignals 对象，信号跨线程发射时自动排队到界面线程。
+    parent 被销毁时自动取消任务，结果不会再发送给已经关闭的页面
+    """
+
+    finished = pyqtSignal(object)  # 任务返回值
+    failed = pyqtSignal(object)  # 异常
+    cancelled = pyqtSignal()
+
+    def __init__(self, handle: TaskHandle, parent=None):
+        super().__init__(parent)
+        self.handle = handle
+        # 取消会同步执行完成回调，此时对象正在销毁，不能再发射信号。
+        # 连接绑定方法而不是 lambda：Python 包装对象被回收后 lambda 也随之释放，销毁时调用会崩溃
+        abandoned = self._abandoned = threading.Event()
+        self.destroyed.connect(abandoned.set)
+        self.destroyed.connect(handle.cancel)
+
+    def _on_done(self, handle: TaskHandle) -> None:
+        if self._abandoned.is_set():
+            return
+        try:
+            if handle.cancelled:
+                self.cancelled.emit()
+                return
+            try:
+                result = handle.result()
+            except TaskCancelled:
+                self.cancelled.emit()
+            except Exception as e:  # noqa: BLE001
+                self.failed.emit(e)
+            else:
+                self.finished.emit(result)
+        except RuntimeError:
+            # 任务完成前对象已被销毁（例如页面已关闭）
+            pass
+
+
+def run_task(
+        fn: Callable,
+        *args,
+        on_result: Callable[[object], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+        parent: QObject | None = None,
+        key=None,
+        priority: Priority = Priority.HIGH,
+        ttl: float = 0.0,
+        executor: TaskExecutor = task_executor,
+        **kwargs,
+) -> TaskSignals:
+    """在后台执行 fn，结果在界面线程中回调。
+
+    界面发起的操作默认使用高优先级；相同函数与参数的并发调用只执行一次
+
+    Parameters:
+        fn / args / kwargs: 要执行的函数与参数
+        on_result / on_error: 界面线程中的回调
+        parent: QObject | None = None  # 通常传入发起调用的控件，控件销毁时取消任务
+        key / priority / ttl: 同 TaskExecutor.submit
+
+    Returns:
+        TaskSignals: 可继续连接信号，或通过 .handle 取消
+    """
+    handle = executor.submit(fn, *args, key=key, priority=priority, ttl=ttl, **kwargs)
+    signals = TaskSignals(handle, parent)
+    if on_result is not None:
+        signals.finished.connect(on_result)
+    if on_error is not None:
+        signals.failed.connect(on_error)
+    # 结束后释放信号对象（没有 parent 时由 Qt 的 deleteLater 回收）
+    for signal in (signals.finished, signals.failed, signals.cancelled):
+        signal.connect(signals.deleteLater)
+    handle.add_done_callback(signals._on_done)
+    return signals
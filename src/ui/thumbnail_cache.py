@@ -0,0 +1,171 @@
+import atexit
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from loguru import logger
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QSize, Qt
+from PyQt6.QtGui import QImage, QImageReader
+
+from src.core.thumbnail_cache import ThumbnailSource, thumbnail_source
+from src.utils.http_client import HttpError
+from src.utils.lru_cache import ByteLRU
+
+# 内存中解码后图片的总字节上限
+MEMORY_BUDGET = 64 * 1024 * 1024
+WORKERS = 4
+
+ThumbnailCallback = Callable[[QImage | None], None]
+
+
+@dataclass(slots=True)
+class ThumbnailStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    downloads: int = 0
+    coalesced: int = 0  # 合并到进行中请求的次数
+    failures: int = 0
+    memory_evictions: int = 0
+    memory_bytes: int = 0
+    disk_bytes: int = 0
+
+    @property
+    def requests(self) -> int:
+        return self.memory_hits + self.disk_hits + self.downloads + self.coalesced
+
+    @property
+    def hit_rate(self) -> float:
+        """内存或磁盘命中（不需要下载）的比例"""
+        total = self.memory_hits + self.disk_hits + self.downloads
+        return (self.memory_hits + self.disk_hits) / total if total else 0.0
+
+
+def decode_image(data: bytes, size: QSize | None = None) -> QImage | None:
+    """解码并缩放图片，可在任意线程调用。
+
+    size 为显示区域，保持比例缩放到不超过该区域；JPEG 等格式会在解码时直接缩放，
+    不会先解出全尺寸图片
+    """
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer)
+    reader.setAutoTransform(True)
+    if size is not None and size.isValid():
+        original = reader.size()
+        if original.isValid() and (original.width() > size.width() or original.height() > size.height()):
+            reader.setScaledSize(original.scaled(size, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    # 预乘格式转换为 QPixmap 时不需要再转换，把这部分开销留在工作线程
+    return image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+
+
+class ThumbnailCache:
+    """缩略图服务：内存 LRU + 后台解码，原始数据来自 ThumbnailSource（磁盘缓存 + 网络）。
+
+    request() 先查找内存（解码后的 QImage，按字节数限制），未命中时在工作线程池中
+    读取磁盘或下载并解码；相同 URL 和尺寸的并发请求合并为一次。
+    回调在工作线程中执行，界面中请使用 src.ui.thumbnail_signals.ThumbnailSignals
+    """
+
+    def __init__(
+            self,
+            source: ThumbnailSource = thumbnail_source,
+            memory_budget: int = MEMORY_BUDGET,
+            workers: int = WORKERS,
+    ):
+        self.source = source
+        self.memory = ByteLRU(memory_budget)
+        self._workers = workers
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple, Future] = {}
+        self._stats = ThumbnailStats()
+
+    @staticmethod
+    def _key(url: str, size: QSize | None) -> tuple:
+        return (url, size.width(), size.height()) if size is not None else (url, 0, 0)
+
+    def get(self, url: str, size: QSize | None = None) -> QImage | None:
+        """只查找内存缓存，不发起加载"""
+        image = self.memory.get(self._key(url, size))
+        if image is not None:
+            with self._lock:
+                self._stats.memory_hits += 1
+        return image
+
+    def request(self, url: str, size: QSize | None = None, callback: ThumbnailCallback | None = None) -> Future:
+        """加载缩略图，返回结果为 QImage（失败时为 None）的 Future。
+
+        callback 在加载完成后以结果调用；内存命中时立即在当前线程调用，
+        close() 时被取消的加载不会回调
+        """
+        key = self._key(url, size)
+        image = self.get(url, size)
+        if image is not None:
+            future = Future()
+            future.set_result(image)
+        else:
+            with self._lock:
+                future = self._inflight.get(key)
+                if future is not None:
+                    self._stats.coalesced += 1
+                else:
+                    if self._pool is None:
+                        self._pool = ThreadPoolExecutor(self._workers, thread_name_prefix="thumbnail")
+                    future = self._pool.submit(self._load, url, size, key)
+                    self._inflight[key] = future
+        if callback is not None:
+            future.add_done_callback(lambda f: None if f.cancelled() else callback(f.result()))
+        return future
+
+    def _load(self, url: str, size: QSize | None, key: tuple) -> QImage | None:
+        try:
+            data, downloaded = self.source.fetch(url)
+            image = decode_image(data, size)
+            # 无法解码的内容不写入磁盘缓存
+            if downloaded and image is not None:
+                self.source.store(url, data)
+            counter = "downloads" if downloaded else "disk_hits"
+            with self._lock:
+                setattr(self._stats, counter, getattr(self._stats, counter) + 1)
+                if image is None:
+                    self._stats.failures += 1
+            if image is None:
+                logger.warning(f"无法解码缩略图: {url}")
+                return None
+            self.memory.put(key, image, image.sizeInBytes())
+            return image
+        except (HttpError, OSError) as e:
+            with self._lock:
+                self._stats.failures += 1
+            logger.warning(f"加载缩略图失败: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> ThumbnailStats:
+        with self._lock:
+            stats = ThumbnailStats(**{
+                name: getattr(self._stats, name) for name in ThumbnailStats.__slots__
+            })
+        stats.memory_evictions = self.memory.evictions
+        stats.memory_bytes = self.memory.total_bytes
+        stats.disk_bytes = self.source.disk.total_bytes
+        return stats
+
+    def close(self) -> None:
+        """等待进行中的加载完成并写入磁盘索引"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        self.source.flush()
+
+
+thumbnail_cache = ThumbnailCache()
+atexit.register(thumbnail_cache.close)
@@ -0,0 +1,36 @@
+from PyQt6.QtCore import QObject, QSize, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from src.ui.thumbnail_cache import ThumbnailCache, thumbnail_cache
+
+
+class ThumbnailSignals(QObject):
+    """把 ThumbnailCache 的后台加载结果转换为 Qt 信号。
+
+    load() 内存命中时直接返回图片；否则返回 None，加载完成后发射 thumbnailReady，
+    槽函数在界面线程中执行，可以直接 QPixmap.fromImage 后显示
+    """
+
+    thumbnailReady = pyqtSignal(str, QImage)  # (URL, 图片)
+    thumbnailFailed = pyqtSignal(str)  # URL
+
+    def __init__(self, cache: ThumbnailCache = thumbnail_cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+
+    def load(self, url: str, size: QSize | None = None) -> QImage | None:
+        image = self.cache.get(url, size)
+        if image is not None:
+            return image
+        self.cache.request(url, size, lambda result: self._on_loaded(url, result))
+        return None
+
+    def _on_loaded(self, url: str, image: QImage | None) -> None:
+        try:
+            if image is None:
+                self.thumbnailFailed.emit(url)
+            else:
+                self.thumbnailReady.emit(url, image)
+        except RuntimeError:
+            # 加载完成前对象已被销毁（例如页面已关闭）
+            pass
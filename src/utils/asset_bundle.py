@@ -0,0 +1,208 @@
+import mmap
+import os
+import struct
+import sys
+import threading
+from pathlib import Path
+
+from loguru import logger
+
+from src.config import ASSETS_BUNDLE, ASSETS_DIR
+from src.utils.atomic_io import atomic_write_bytes
+
+# 文件头: 魔数, 格式版本, 资源数量, 索引字节数, 生成时资源目录树中各目录最新的 mtime_ns
+_HEADER = struct.Struct("<4sIIIq")
+_MAGIC = b"SWAB"
+_FORMAT_VERSION = 1
+# 索引项: 数据偏移, 数据长度, 名称字节数（其后紧跟 UTF-8 名称）
+_ENTRY = struct.Struct("<QQH")
+# 每个资源的数据按该字节数对齐
+_ALIGN = 8
+# 不打包的文件
+_SKIP_NAMES = frozenset({"README.md", ".gitkeep", "Thumbs.db", ".DS_Store"})
+
+
+class BundleFormatError(ValueError):
+    """资源包损坏或版本不符"""
+
+
+def _source_mtime(source: Path) -> int:
+    """资源目录树中所有目录（包括子目录）的最新 mtime_ns。
+
+    目录的 mtime 只在增删、重命名其直接包含的条目时变化，只看顶层目录会漏掉子目录中新增的图标。
+    只对目录 stat，不逐个 stat 文件，检查的开销与目录数成正比
+    """
+    latest = 0
+    for root, dirs, _ in os.walk(source):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        try:
+            latest = max(latest, os.stat(root).st_mtime_ns)
+        except OSError:
+            continue
+    return latest
+
+
+def _collect(source: Path) -> list[tuple[str, Path]]:
+    files = []
+    for root, dirs, names in os.walk(source):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in names:
+            if name in _SKIP_NAMES or name.startswith("."):
+                continue
+            path = Path(root) / name
+            files.append((path.relative_to(source).as_posix(), path))
+    files.sort()
+    return files
+
+
+def pack_assets(source: Path) -> bytes:
+    """把资源目录中的所有文件打包为一个资源包，名称为相对路径（/ 分隔）"""
+    files = [(name.encode("utf-8"), path) for name, path in _collect(source)]
+    offset = _HEADER.size + sum(_ENTRY.size + len(name) for name, _ in files)
+    offset += -offset % _ALIGN
+
+    entries = []
+    blobs = []
+    for name, path in files:
+        data = path.read_bytes()
+        entries.append(_ENTRY.pack(offset, len(data), len(name)) + name)
+        padding = -len(data) % _ALIGN
+        blobs.append(data + b"\0" * padding)
+        offset += len(data) + padding
+
+    index = b"".join(entries)
+    header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, len(files), len(index), _source_mtime(source))
+    head = header + index
+    return head + b"\0" * (-len(head) % _ALIGN) + b"".join(blobs)
+
+
+def build_bundle(source: Path = ASSETS_DIR, dest: Path = ASSETS_BUNDLE) -> int:
+    """生成资源包文件，返回打包的资源数量"""
+    data = pack_assets(source)
+    atomic_write_bytes(dest, data)
+    count = _HEADER.unpack_from(data)[2]
+    logger.info(f"已生成资源包 {dest}: {count} 个资源, {len(data)} 字节")
+    return count
+
+
+class AssetBundle:
+    """内存映射的只读资源包。
+
+    所有资源打包在一个文件中，启动时只打开并映射这一个文件、解析一次索引，
+    资源数量增加时启动 I/O 不变；读取资源时直接返回映射内存的切片，由系统按页载入。
+
+    资源包不存在或资源目录树中任一目录比资源包新（开发时在任意子目录中添加、删除了文件）时，
+    从 assets/ 重新生成；发布时可用 python -m src.utils.asset_bundle 预先生成。
+    已有文件被原地修改时所在目录的 mtime 不变，需要手动重新生成
+    """
+
+    def __init__(self, path: Path = ASSETS_BUNDLE, source: Path | None = ASSETS_DIR):
+        self.path = path
+        self.source = source
+        self._lock = threading.Lock()
+        self._buffer: mmap.mmap | bytes | None = None
+        self._index: dict[str, tuple[int, int]] | None = None
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AssetBundle":
+        bundle = cls(Path(), None)
+        bundle._attach(data)
+        return bundle
+
+    def _attach(self, buffer: mmap.mmap | bytes) -> None:
+        if len(buffer) < _HEADER.size:
+            raise BundleFormatError("资源包过短")
+        magic, version, count, index_size, _ = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise BundleFormatError("不是资源包或格式版本不符")
+        index: dict[str, tuple[int, int]] = {}
+        position = _HEADER.size
+        end = position + index_size
+        for _ in range(count):
+            offset, length, name_size = _ENTRY.unpack_from(buffer, position)
+            position += _ENTRY.size
+            name = bytes(buffer[position:position + name_size]).decode("utf-8")
+            position += name_size
+            if position > end or offset + length > len(buffer):
+                raise BundleFormatError("资源包索引损坏")
+            index[name] = (offset, length)
+        self._buffer = buffer
+        self._index = index
+
+    def _is_stale(self) -> bool:
+        if self.source is None or getattr(sys, "frozen", False):
+            # 打包后的程序使用随程序发布的资源包
+            return False
+        try:
+            with self.path.open("rb") as f:
+                header = f.read(_HEADER.size)
+            magic, version, _, _, source_mtime = _HEADER.unpack(header)
+        except (OSError, struct.error):
+            return True
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            return True
+        return self.source.is_dir() and _source_mtime(self.source) > source_mtime
+
+    def _ensure_open(self) -> dict[str, tuple[int, int]]:
+        if self._index is not None:
+            return self._index
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            if self._is_stale() and self.source is not None and self.source.is_dir():
+                try:
+                    build_bundle(self.source, self.path)
+                except OSError as e:
+                    # 资源包正被其他实例映射（Windows 上无法替换）等情况：本次在内存中打包
+                    logger.warning(f"生成资源包失败，使用内存中的资源包: {e}")
+                    self._attach(pack_assets(self.source))
+                    return self._index
+            try:
+                with self.path.open("rb") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+                self._attach(buffer)
+            except FileNotFoundError:
+                self._buffer, self._index = b"", {}
+            except (OSError, BundleFormatError) as e:
+                logger.warning(f"读取资源包失败: {e}")
+                self._buffer, self._index = b"", {}
+            return self._index
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ensure_open()
+
+    def __len__(self) -> int:
+        return len(self._ensure_open())
+
+    def names(self, prefix: str = "") -> list[str]:
+        return sorted(name for name in self._ensure_open() if name.startswith(prefix))
+
+    def view(self, name: str) -> memoryview | None:
+        """资源内容（映射内存的只读切片，不复制），不存在时返回 None"""
+        entry = self._ensure_open().get(name)
+        if entry is None:
+            return None
+        offset, length = entry
+        return memoryview(self._buffer)[offset:offset + length]
+
+    def read(self, name: str) -> bytes | None:
+        view = self.view(name)
+        return None if view is None else bytes(view)
+
+    def close(self) -> None:
+        with self._lock:
+            if isinstance(self._buffer, mmap.mmap):
+                try:
+                    self._buffer.close()
+                except BufferError:
+                    # 仍有切片在使用，交给垃圾回收
+                    pass
+            self._buffer, self._index = None, None
+
+
+asset_bundle = AssetBundle()
+
+
+if __name__ == "__main__":
+    build_bundle()
@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """原子写入文件。
+
+    先写入同目录下的临时文件并 fsync，再用 os.replace 替换目标文件，
+    中途崩溃或断电时目标文件要么是旧内容，要么是新内容。
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: Path, data: Any, *, indent: int | None = None) -> None:
+    """原子写入 JSON 文件，默认紧凑格式"""
+    separators = None if indent else (",", ":")
+    text = json.dumps(data, ensure_ascii=False, indent=indent, separators=separators)
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """读取 JSON 文件，文件不存在或损坏时返回 default"""
+    try:
+        with Path(path).open(encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, ValueError) as e:
+        logger.warning(f"读取 {path} 失败，将使用默认值: {e}")
+        return default
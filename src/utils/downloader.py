@@ -0,0 +1,390 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from src.utils.atomic_io import atomic_write_json
+from src.utils.http_client import CHUNK_SIZE, HttpClient, HttpError, http_client
+
+# 默认并行分段数
+SEGMENTS = 4
+# 每段的最小字节数，小文件不分段
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+# 分段表写盘的最小间隔（秒）
+SAVE_INTERVAL = 1.0
+# 单个分段连续失败的重试次数
+RETRIES = 3
+RETRY_DELAY = 1.0
+
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(Exception):
+    """下载失败"""
+
+
+class DownloadCancelled(DownloadError):
+    """下载被取消，已下载的部分保留，下次可继续"""
+
+
+class ChecksumMismatch(DownloadError):
+    """下载完成但校验值不符，已下载的文件会被删除"""
+
+
+@dataclass(slots=True)
+class Segment:
+    start: int
+    end: int  # 不含
+    done: int = 0  # 已写入的字节数
+
+    @property
+    def position(self) -> int:
+        return self.start + self.done
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= self.end
+
+
+@dataclass(slots=True)
+class DownloadProgress:
+    downloaded: int  # 包括续传前已下载的部分
+    total: int
+    elapsed: float  # 本次下载的用时
+    resumed: int = 0  # 续传前已下载的字节数
+
+    @property
+    def speed(self) -> float:
+        """本次下载的平均速度（字节/秒），不计续传前已有的部分"""
+        return (self.downloaded - self.resumed) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+ProgressCallback = Callable[[DownloadProgress], None]
+
+
+class _IncrementalHash:
+    """按文件顺序增量计算校验值。
+
+    并行下载时数据乱序到达：覆盖当前哈希位置的分段直接把收到的数据送入哈希；
+    哈希位置推进到其他分段时，只需从文件（通常仍在系统缓存中）补读该分段已经下载的部分
+    """
+
+    def __init__(self, algorithm: str, path: Path):
+        self.hasher = hashlib.new(algorithm)
+        self.path = path
+        self.offset = 0  # 已经计入哈希的字节数
+        self.reread = 0  # 为计算哈希从文件补读的字节数
+        self._lock = threading.Lock()
+
+    def advance(self, segment: Segment, data: bytes) -> None:
+        """分段写入了 data 后调用：更新分段进度，数据紧接着哈希位置时直接计入哈希"""
+        with self._lock:
+            if segment.position == self.offset:
+                self.hasher.update(data)
+                self.offset += len(data)
+            segment.done += len(data)
+
+    def catch_up(self, segments: list[Segment]) -> None:
+        """哈希位置之后已经写入文件的连续数据从文件补读"""
+        with self._lock:
+            for segment in segments:
+                if segment.end <= self.offset:
+                    continue
+                if segment.start > self.offset or segment.position <= self.offset:
+                    break
+                with open(self.path, "rb") as f:
+                    f.seek(self.offset)
+                    remaining = segment.position - self.offset
+                    while remaining > 0:
+                        chunk = f.read(min(CHUNK_SIZE * 16, remaining))
+                        if not chunk:
+                            break
+                        self.hasher.update(chunk)
+                        self.offset += len(chunk)
+                        self.reread += len(chunk)
+                        remaining -= len(chunk)
+                if not segment.finished:
+                    break
+
+
+class SegmentedDownloader:
+    """分段并行、可断点续传的下载器。
+
+    先用 Range: bytes=0-0 探测文件大小与是否支持分段，然后把文件预分配为 <目标>.part，
+    多个分段并行下载并直接写入各自的位置。分段进度（分段表）定期保存到 <目标>.part.json，
+    中断后再次下载时从记录的位置继续；服务器上的文件变化（ETag / Last-Modified 不同）时重新下载。
+    校验值在下载过程中按文件顺序增量计算：按顺序到达的数据直接计入，
+    其余分段在哈希位置推进到它们时从系统缓存补读，完成时无需再从磁盘完整读一遍文件。
+
+    服务器不支持 Range 时退化为单连接下载（无法续传）
+    """
+
+    def __init__(
+            self,
+            url: str,
+            dest: Path,
+            *,
+            checksum: str | None = None,
+            algorithm: str = "sha256",
+            segments: int = SEGMENTS,
+            min_segment_size: int = MIN_SEGMENT_SIZE,
+            client: HttpClient = http_client,
+            progress: ProgressCallback | None = None,
+            cancel: threading.Event | None = None,
+    ):
+        self.url = url
+        self.dest = Path(dest)
+        self.part_path = self.dest.with_name(self.dest.name + ".part")
+        self.map_path = self.dest.with_name(self.dest.name + ".part.json")
+        self.checksum = checksum.lower() if checksum else None
+        self.algorithm = algorithm
+        self.segments = max(1, segments)
+        self.min_segment_size = min_segment_size
+        self.client = client
+        self.progress = progress
+        self.cancel = cancel or threading.Event()
+        self.digest: str | None = None
+        self.reread = 0  # 为计算校验值从文件补读的字节数（续传时包括之前下载的部分）
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()  # 某个分段失败时通知其他分段停止
+        self._parts: list[Segment] = []
+        self._last_save = 0.0
+        self._last_progress = 0.0
+        self._start = 0.0
+        self._resumed = 0
+
+    # ---- 分段表 ----
+
+    def _load_map(self, size: int, validator: str) -> list[Segment] | None:
+        try:
+            data = json.loads(self.map_path.read_text(encoding="utf-8"))
+            if data["url"] != self.url or data["size"] != size or data["validator"] != validator:
+                return None
+            if not self.part_path.exists() or self.part_path.stat().st_size != size:
+                return None
+            return [Segment(**s) for s in data["segments"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_map(self, size: int, validator: str, force: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_save < SAVE_INTERVAL:
+                return
+            self._last_save = now
+            data = {
+                "url": self.url,
+                "size": size,
+                "validator": validator,
+                "segments": [asdict(s) for s in self._parts],
+            }
+        try:
+            atomic_write_json(self.map_path, data)
+        except OSError as e:
+            logger.warning(f"保存下载进度失败: {e}")
+
+    def _discard(self) -> None:
+        for path in (self.part_path, self.map_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ---- 下载 ----
+
+    def _stopped(self) -> bool:
+        return self.cancel.is_set() or self._stop.is_set()
+
+    def _probe(self) -> tuple[int | None, str, str]:
+        """返回 (文件大小（不支持分段时为 None）, 最终地址, 校验标识)"""
+        headers = {"Range": "bytes=0-0", "Accept-Encoding": "identity"}
+        try:
+            with self.client.stream(self.url, headers=headers) as resp:
+                validator = resp.header("etag") or resp.header("last-modified") or ""
+                match = _CONTENT_RANGE_RE.match(resp.header("content-range", ""))
+                if resp.status == 206 and match and match.group(3) != "*":
+                    for _ in resp.iter_chunks():
+                        pass
+                    return int(match.group(3)), resp.url, validator
+                # 不支持分段时返回的是完整内容，不读取，直接关闭连接
+                return None, resp.url, validator
+        except HttpError as e:
+            if e.status == 416:
+                # 空文件没有可请求的范围
+                return None, self.url, ""
+            raise
+
+    def _split(self, size: int) -> list[Segment]:
+        if size == 0:
+            return []
+        count = max(1, min(self.segments, size // self.min_segment_size))
+        step = -(-size // count)
+        return [Segment(start, min(start + step, size)) for start in range(0, size, step)]
+
+    def _report(self, total: int, force: bool = False) -> None:
+        if self.progress is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_progress < 0.1:
+            return
+        self._last_progress = now
+        downloaded = sum(s.done for s in self._parts)
+        self.progress(DownloadProgress(downloaded, total, now - self._start, self._resumed))
+
+    def _fetch_segment(self, url: str, segment: Segment, size: int, validator: str, hasher: _IncrementalHash) -> None:
+        attempt = 0
+        while not segment.finished:
+            if self._stopped():
+                raise DownloadCancelled("下载已取消")
+            headers = {"Range": f"bytes={segment.position}-{segment.end - 1}", "Accept-Encoding": "identity"}
+            if validator:
+                # 文件已变化时服务器返回 200 完整内容，而不是错误的分段
+                headers["If-Range"] = validator
+            try:
+                with self.client.stream(url, headers=headers) as resp:
+                    if resp.status != 206:
+                        raise DownloadError(f"服务器上的文件已变化或不再支持分段下载（状态码 {resp.status}）")
+                    # 不使用写缓冲：数据写入后其他线程补读哈希时立即可见，分段表中的进度也一定已经写入文件
+                    with open(self.part_path, "r+b", buffering=0) as f:
+                        f.seek(segment.position)
+                        for chunk in resp.iter_chunks():
+                            view = memoryview(chunk)[:segment.end - segment.position]
+                            written = 0
+                            while written < len(view):
+                                written += f.write(view[written:])
+                            hasher.advance(segment, view)
+                            if segment.finished:
+                                break
+                            if self._stopped():
+                                raise DownloadCancelled("下载已取消")
+                            self._save_map(size, validator)
+                            self._report(size)
+                attempt = 0
+            except HttpError as e:
+                attempt += 1
+                if attempt > RETRIES:
+                    raise DownloadError(f"下载分段 {segment.start}-{segment.end} 失败: {e}") from e
+                logger.debug(f"下载分段 {segment.start}-{segment.end} 中断，从 {segment.position} 重试: {e}")
+                time.sleep(RETRY_DELAY * attempt)
+            finally:
+                hasher.catch_up(self._parts)
+
+    def _download_single(self, url: str) -> None:
+        """服务器不支持 Range 时单连接下载"""
+        hasher = hashlib.new(self.algorithm)
+        total = 0
+        with self.client.stream(url, headers={"Accept-Encoding": "identity"}) as resp:
+            size = int(resp.header("content-length", "0") or 0)
+            self._parts = [Segment(0, size)]
+            with open(self.part_path, "wb") as f:
+                for chunk in resp.iter_chunks():
+                    if self._stopped():
+                        raise DownloadCancelled("下载已取消")
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    total += len(chunk)
+                    self._parts[0].done = total
+                    self._report(size)
+        self.digest = hasher.hexdigest()
+
+    def download(self) -> Path:
+        """下载到 dest，返回 dest
+
+        Raises:
+            DownloadCancelled: 被取消（可再次调用继续下载）
+            ChecksumMismatch: 校验值不符
+            DownloadError / HttpError: 网络或服务器错误
+        """
+        self._start = time.monotonic()
+        self._resumed = 0
+        self.dest.parent.mkdir(parents=True, exist_ok=True)
+        size, url, validator = self._probe()
+
+        if size is None:
+            logger.info(f"服务器不支持分段下载，使用单连接: {self.url}")
+            self._discard()
+            self._download_single(url)
+        else:
+            self._download_segments(url, size, validator)
+
+        if self.checksum and self.digest != self.checksum:
+            self._discard()
+            raise ChecksumMismatch(f"校验值不符: 期望 {self.checksum}，实际 {self.digest}")
+        os.replace(self.part_path, self.dest)
+        self._discard()
+        logger.info(
+            f"下载完成: {self.dest.name}, {size or self.dest.stat().st_size} 字节, "
+            f"续传 {self._resumed} 字节, 用时 {time.monotonic() - self._start:.2f}s"
+        )
+        return self.dest
+
+    def _download_segments(self, url: str, size: int, validator: str) -> None:
+        parts = self._load_map(size, validator)
+        if parts is None:
+            self._discard()
+            with open(self.part_path, "wb") as f:
+                # 预分配完整大小，各分段直接写入自己的位置
+                f.truncate(size)
+            parts = self._split(size)
+        else:
+            self._resumed = sum(s.done for s in parts)
+            logger.info(f"继续下载 {self.dest.name}: 已完成 {self._resumed}/{size} 字节")
+        self._parts = parts
+        self._save_map(size, validator, force=True)
+
+        hasher = _IncrementalHash(self.algorithm, self.part_path)
+        # 续传时之前下载的连续部分需要从文件读入哈希
+        hasher.catch_up(parts)
+        remaining = [s for s in parts if not s.finished]
+        try:
+            if remaining:
+                with ThreadPoolExecutor(max_workers=len(remaining), thread_name_prefix="download") as pool:
+                    futures = [pool.submit(self._fetch_segment, url, s, size, validator, hasher) for s in remaining]
+                    done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                    error = next((f.exception() for f in done if f.exception() is not None), None)
+                    if error is not None:
+                        # 通知其他分段停止，保留进度以便续传
+                        self._stop.set()
+                        wait(futures)
+                        raise error
+        finally:
+            self._save_map(size, validator, force=True)
+            self._report(size, force=True)
+
+        hasher.catch_up(parts)
+        if hasher.offset != size:
+            raise DownloadError(f"下载不完整: {hasher.offset}/{size}")
+        self.digest = hasher.hasher.hexdigest()
+        self.reread = hasher.reread
+
+
+def download_file(
+        url: str,
+        dest: Path,
+        *,
+        checksum: str | None = None,
+        progress: ProgressCallback | None = None,
+        cancel: threading.Event | None = None,
+) -> tuple[bool, Path | str]:
+    """下载文件（分段并行、可续传、边下载边校验 SHA-256）
+
+    Returns:
+        result: tuple[bool, Path | str]: (是否成功, 文件路径或错误信息)
+    """
+    try:
+        downloader = SegmentedDownloader(url, dest, checksum=checksum, progress=progress, cancel=cancel)
+        return True, downloader.download()
+    except DownloadCancelled:
+        return False, "下载已取消"
+    except (DownloadError, HttpError, OSError) as e:
+        logger.error(f"下载 {url} 失败: {e}")
+        return False, f"下载失败: {e}"
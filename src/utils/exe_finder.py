@@ -0,0 +1,165 @@
+import os
+import stat
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from loguru import logger
+
+# 不进入的目录（小写）：系统目录、回收站、包管理器与版本控制的缓存等，里面不会有要找的程序
+PRUNE_DIRS = frozenset({
+    "windows", "$recycle.bin", "system volume information", "recovery", "perflogs",
+    "msocache", "config.msi", "$windows.~bt", "$windows.~ws", "$sysreset", "windowsapps",
+    "winsxs", "node_modules", "__pycache__", "site-packages", "snap", "lost+found",
+})
+# 只在文件系统根目录下不进入的目录：Linux 的虚拟文件系统，其他位置的同名目录可能是普通的用户目录
+ROOT_PRUNE_DIRS = frozenset({"proc", "sys", "dev", "run"})
+# Windows 上带有这些属性的目录不进入
+_HIDDEN_ATTRS = getattr(stat, "FILE_ATTRIBUTE_HIDDEN", 2) | getattr(stat, "FILE_ATTRIBUTE_SYSTEM", 4)
+# 默认最大搜索深度（相对于每个起点）
+MAX_DEPTH = 6
+
+
+@dataclass(slots=True)
+class FindResult:
+    found: dict[str, Path] = field(default_factory=dict)  # 文件名（小写） -> 第一个找到的路径
+    dirs_scanned: int = 0
+    complete: bool = False  # 全部目标都已找到（满足 until 条件）
+    interrupted: bool = False  # 因取消或超时提前结束，结果可能不完整
+    elapsed: float = 0.0
+
+
+def _should_prune(entry: os.DirEntry, at_root: bool = False) -> bool:
+    name = entry.name
+    if name[0] in ".$" or name.lower() in PRUNE_DIRS:
+        return True
+    if at_root and name.lower() in ROOT_PRUNE_DIRS:
+        return True
+    try:
+        # 不跟随符号链接与目录联接，避免重复遍历与循环
+        if entry.is_symlink() or entry.is_junction():
+            return True
+        attrs = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+    except OSError:
+        return True
+    return bool(attrs & _HIDDEN_ATTRS)
+
+
+def _scan_dir(path: str, names: frozenset[str]) -> tuple[list[tuple[str, str]], list[str]]:
+    """扫描单个目录，返回 (命中的 (文件名小写, 路径), 需要继续的子目录)"""
+    hits, subdirs = [], []
+    at_root = os.path.dirname(path) == path
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not _should_prune(entry, at_root):
+                            subdirs.append(entry.path)
+                    elif (lower := entry.name.lower()) in names:
+                        hits.append((lower, entry.path))
+                except OSError:
+                    continue
+    except OSError:
+        # 无权限、目录在扫描期间被删除等
+        pass
+    return hits, subdirs
+
+
+def find_files(
+        roots: Iterable[str | Path],
+        names: Iterable[str],
+        *,
+        max_depth: int = MAX_DEPTH,
+        workers: int | None = None,
+        timeout: float | None = None,
+        cancel: threading.Event | None = None,
+        on_found: Callable[[str, Path], None] | None = None,
+        until: Callable[[dict[str, Path]], bool] | None = None,
+) -> FindResult:
+    """在多个起点下并行查找指定文件名（不区分大小写）。
+
+    起点按给出的顺序优先扫描（应把最可能的位置放在前面），各起点共享已访问集合，
+    重叠的起点不会重复扫描。系统目录、隐藏目录、符号链接不进入；
+    所有文件名都找到后立即停止，不再扫描剩余目录
+
+    Parameters:
+        roots: 起点目录，不存在的会被跳过
+        names: 要查找的文件名
+        max_depth: int = MAX_DEPTH  # 相对于起点的最大深度
+        workers: int | None = None  # 并行线程数，默认按 CPU 数量
+        timeout: float | None = None  # 超过该秒数后返回已找到的结果
+        cancel: threading.Event | None = None  # 置位后尽快返回
+        on_found: 每找到一个文件名时回调（在调用线程中执行）
+        until: 以已找到的结果调用，返回 True 时提前结束；默认所有文件名都找到后结束
+
+    Returns:
+        FindResult: 查找结果
+    """
+    start = time.perf_counter()
+    wanted = frozenset(n.lower() for n in names)
+    result = FindResult()
+    if not wanted:
+        result.complete = True
+        return result
+
+    if until is None:
+        def until(found: dict[str, Path]) -> bool:
+            return len(found) == len(wanted)
+
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    deadline = None if timeout is None else start + timeout
+    visited: set[str] = set()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="exe-finder")
+    pending: dict[Future, tuple[str, int]] = {}
+
+    def submit(path: str, depth: int) -> None:
+        key = os.path.normcase(os.path.abspath(path))
+        if key in visited:
+            return
+        visited.add(key)
+        pending[pool.submit(_scan_dir, path, wanted)] = (path, depth)
+
+    try:
+        for root in roots:
+            if os.path.isdir(root):
+                submit(str(root), 0)
+
+        while pending:
+            if cancel is not None and cancel.is_set():
+                result.interrupted = True
+                break
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                logger.debug(f"查找超时，已扫描 {result.dirs_scanned} 个目录")
+                result.interrupted = True
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                _, depth = pending.pop(fut)
+                hits, subdirs = fut.result()
+                result.dirs_scanned += 1
+                new = False
+                for lower, path in hits:
+                    if lower not in result.found:
+                        result.found[lower] = Path(path)
+                        new = True
+                        if on_found is not None:
+                            on_found(lower, Path(path))
+                if new and until(result.found):
+                    result.complete = True
+                    break
+                if depth < max_depth:
+                    for sub in subdirs:
+                        submit(sub, depth + 1)
+            if result.complete:
+                break
+    finally:
+        # 提前结束时丢弃尚未开始的目录
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    result.elapsed = time.perf_counter() - start
+    return result
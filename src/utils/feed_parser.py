@@ -0,0 +1,225 @@
+import codecs
+import json
+import re
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+_ITEMS_RE = re.compile(r'"items"\s*:\s*\[')
+
+
+@dataclass(slots=True, frozen=True)
+class FeedEntry:
+    id: str
+    title: str
+    link: str = ""
+    published: float = 0.0  # Unix 时间戳（秒），未知时为 0
+    summary: str = ""
+
+
+def parse_date(value) -> float:
+    """解析 RFC 822（RSS）、ISO 8601（Atom / JSON Feed）日期或时间戳，失败返回 0"""
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    text = str(value).strip()
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return 0.0
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+    return dt.timestamp()
+
+
+def _local(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+class XmlFeedParser:
+    """RSS 2.0 / Atom 增量解析器。
+
+    数据分块喂入，每解析完一个 item / entry 就返回，并从树中移除已处理的元素，
+    内存占用与文档长度无关
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack: list[ET.Element] = []
+
+    def feed(self, data: bytes) -> list[FeedEntry]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> list[FeedEntry]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> list[FeedEntry]:
+        entries = []
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._stack.append(elem)
+                continue
+            self._stack.pop()
+            if _local(elem.tag) in ("item", "entry"):
+                entry = self._entry(elem)
+                if entry is not None:
+                    entries.append(entry)
+                if self._stack:
+                    self._stack[-1].remove(elem)
+        return entries
+
+    @staticmethod
+    def _entry(elem: ET.Element) -> FeedEntry | None:
+        fields: dict[str, str] = {}
+        link = ""
+        for child in elem:
+            name = _local(child.tag)
+            if name == "link":
+                # Atom 的链接在 href 属性中，优先取 rel="alternate"
+                href = child.get("href")
+                if href is None:
+                    link = link or (child.text or "").strip()
+                elif child.get("rel", "alternate") == "alternate" or not link:
+                    link = href
+            elif name not in fields:
+                fields[name] = (child.text or "").strip()
+
+        published = 0.0
+        for key in ("published", "pubDate", "updated", "date"):
+            published = parse_date(fields.get(key))
+            if published:
+                break
+        title = fields.get("title", "")
+        entry_id = fields.get("id") or fields.get("guid") or link or title
+        if not entry_id:
+            return None
+        return FeedEntry(
+            id=entry_id,
+            title=title,
+            link=link,
+            published=published,
+            summary=fields.get("summary") or fields.get("description", ""),
+        )
+
+
+class JsonFeedParser:
+    """JSON Feed 增量解析器。
+
+    接受顶层为数组的文档，或带 "items" 数组的对象（JSON Feed 1.x）；
+    找到数组后逐个解码其中的对象，已解码的部分立即从缓冲区丢弃
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._in_array = False
+        self._done = False
+
+    def feed(self, data: bytes) -> list[FeedEntry]:
+        if self._done:
+            return []
+        self._buf += self._text.decode(data)
+        return self._drain()
+
+    def close(self) -> list[FeedEntry]:
+        self._buf += self._text.decode(b"", final=True)
+        entries = self._drain()
+        if not self._done and self._buf.strip():
+            raise ValueError("JSON 源内容不完整或格式错误")
+        return entries
+
+    def _drain(self) -> list[FeedEntry]:
+        if not self._in_array:
+            stripped = self._buf.lstrip()
+            if stripped.startswith("["):
+                start = len(self._buf) - len(stripped) + 1
+            else:
+                match = _ITEMS_RE.search(self._buf)
+                if match is None:
+                    return []
+                start = match.end()
+            self._buf = self._buf[start:]
+            self._in_array = True
+
+        entries = []
+        buf, pos, size = self._buf, 0, len(self._buf)
+        while True:
+            while pos < size and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= size:
+                break
+            if buf[pos] == "]":
+                self._done = True
+                pos = size
+                break
+            try:
+                obj, pos_end = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # 对象还没有接收完整
+                break
+            pos = pos_end
+            if isinstance(obj, dict):
+                entry = self._entry(obj)
+                if entry is not None:
+                    entries.append(entry)
+        self._buf = buf[pos:]
+        return entries
+
+    @staticmethod
+    def _entry(obj: dict) -> FeedEntry | None:
+        link = str(obj.get("url") or obj.get("link") or "")
+        title = str(obj.get("title") or "")
+        entry_id = str(obj.get("id") or link or title)
+        if not entry_id:
+            return None
+        published = 0.0
+        for key in ("date_published", "published", "date_modified", "time", "date"):
+            published = parse_date(obj.get(key))
+            if published:
+                break
+        return FeedEntry(
+            id=entry_id,
+            title=title,
+            link=link,
+            published=published,
+            summary=str(obj.get("summary") or obj.get("content_text") or ""),
+        )
+
+
+def make_parser(kind: str, head: bytes) -> XmlFeedParser | JsonFeedParser:
+    """根据类型（"rss" / "atom" / "json" / "auto"）创建解析器，auto 时按首个非空字符判断"""
+    if kind in ("rss", "atom", "xml"):
+        return XmlFeedParser()
+    if kind == "json":
+        return JsonFeedParser()
+    first = head.lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+    return JsonFeedParser() if first in (b"{", b"[") else XmlFeedParser()
+
+
+def iter_entries(chunks: Iterable[bytes], kind: str = "auto") -> Iterator[FeedEntry]:
+    """边读取边解析，逐条产出条目。调用方停止迭代时不会再读取剩余数据
+
+    Raises:
+        ValueError: 内容格式错误（XML 解析错误也以 ValueError 抛出）
+    """
+    parser = None
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if parser is None:
+                parser = make_parser(kind, chunk)
+            yield from parser.feed(chunk)
+        if parser is not None:
+            yield from parser.close()
+    except ET.ParseError as e:
+        raise ValueError(f"XML 解析失败: {e}") from e
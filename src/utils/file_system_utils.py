@@ -1,25 +1,35 @@
 from loguru import logger
 from pathlib import Path
+import math
 import os
 import subprocess
+import time
 import psutil
 
-# 导入win32api用于直接调用Windows系统命令
-if os.name == 'nt':
-    try:
-        import win32api
-        import win32con
-        import win32process
-    except ImportError:
-        logger.warning("警告: win32api模块未安装，将使用备选启动方式")
-        logger.warning("请安装pywin32: pip install pywin32")
+from src.config import cfg
+from src.utils.folder_analyzer import FolderReport, analyze_folder
+from src.utils.folder_scanner import FolderStats, ProgressCallback, scan_folder
+from src.utils.launch_telemetry import launch_telemetry
+from src.utils.launcher import LaunchHandle, LaunchState, launch
+from src.utils.log_utils import log_throttled
+from src.utils.metrics import instrument, metrics
+from src.utils.pe_version import NoVersionResource, PEFormatError, read_pe_version, version_cache
+from src.utils.process_registry import process_registry
+from src.utils.resource_monitor import prime_cpu_percent
+
+# 各函数的耗时与失败次数，在诊断页面中查看
+_duration = metrics.histogram("swarm_fs_call_duration_seconds", "file_system_utils 函数耗时", ("function",))
+_failures = metrics.counter("swarm_fs_call_failures_total", "file_system_utils 函数失败次数（异常或返回失败）", ("function",))
+_version_lookups = metrics.counter("swarm_version_lookups_total", "版本号查询次数，result 为 cached / probed", ("result",))
 
 
+@instrument(_duration, _failures)
 def start_exe(path) -> bool:
     """启动exe。
     
     启动指定路径的exe程序
-    支持多系统处理，Windows使用win32api启动，其他系统使用nohup
+    直接创建独立进程（不经过 shell），程序输出写入 logs/apps/<程序名>.log
+    启用启动测量时在后台记录启动耗时与峰值内存（见 get_launch_summary）
     
     Parameters:
         path: str
@@ -44,58 +54,13 @@ def start_exe(path) -> bool:
         return False
 
     try:
-        # 使用win32api.ShellExecute启动，确保完全独立
         logger.info(f"正在启动程序: {path}")
-
-        if os.name == 'nt':
-            try:
-                creation_flags = (
-                        win32con.CREATE_NEW_PROCESS_GROUP |
-                        win32con.DETACHED_PROCESS |
-                        0x01000000  # CREATE_BREAKAWAY_FROM_JOB
-                )
-
-                # 准备启动信息
-                startup_info = win32process.STARTUPINFO()
-                startup_info.dwFlags = win32con.STARTF_USESHOWWINDOW
-                startup_info.wShowWindow = win32con.SW_NORMAL
-
-                # 创建进程
-                process_info = win32process.CreateProcess(
-                    None,  # 应用程序名（None表示从命令行获取）
-                    f'"{str(file)}"',  # 命令行（程序路径）
-                    None,  # 进程安全属性
-                    None,  # 线程安全属性
-                    False,  # 不继承句柄
-                    creation_flags,  # 创建标志
-                    None,  # 环境变量（None表示继承）
-                    str(file.parent),  # 工作目录
-                    startup_info  # 启动信息
-                )
-
-                # 立即关闭进程和线程句柄，完全断开关系
-                win32api.CloseHandle(process_info[0])  # 进程句柄
-                win32api.CloseHandle(process_info[1])  # 线程句柄
-
-                logger.info(f"程序已通过CreateProcess独立启动，PID: {process_info[2]}")
-
-            # Handle general exceptions during process creation with CreateProcess.
-            except Exception as e:
-                logger.error(f"CreateProcess启动失败: {e}")
-                return False
-        else:
-            # 非Windows系统使用nohup
-            nohup_path = os.path.join(file.parent, "nohup.out")
-            process = subprocess.Popen(
-                f"nohup {str(file)} > {nohup_path} 2>&1 &",
-                cwd=str(file.parent),
-                shell=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                stdin=subprocess.DEVNULL,
+        started = time.perf_counter()
+        handle = launch(file, detached=True)
+        if cfg.launch_telemetry_enabled.value:
+            launch_telemetry.watch(
+                file.stem, handle.pid, started, time.perf_counter() - started, lambda: _version_tag(file)
             )
-            logger.info(f"程序已通过nohup启动, PROCESS: {process}")
-
         return True
 
     except FileNotFoundError:
@@ -109,16 +74,49 @@ def start_exe(path) -> bool:
         return False
 
 
-def start_exe_blocking(path) -> tuple[bool, str]:
-    """启动exe并等待执行完成。
+def _version_tag(file: Path) -> str:
+    success, version = get_exe_version(file)
+    return version if success else ""
+
+
+@instrument(_duration, _failures)
+def get_launch_summary(path) -> tuple[bool, str]:
+    """按版本汇总程序的启动耗时。
     
-    启动指定的exe程序并等待执行完成；五分钟超时
+    Parameters:
+        path: str
+    
+    Returns:
+        result: tuple[bool, str]: (是否有记录, 汇总信息)
+    """
+    if not path:
+        return False, "路径未设置"
+
+    app = Path(path).stem
+    summary = launch_telemetry.format_summary(app)
+    if not summary:
+        return False, f"{app} 还没有启动记录"
+    compared = launch_telemetry.compare_latest(app)
+    if compared is not None:
+        previous, latest, ratio = compared
+        summary += f"\n{latest.version} 相比 {previous.version}: 启动耗时 {ratio:.2f} 倍"
+    return True, summary
+
+
+@instrument(_duration, _failures)
+def start_exe_async(path, args=(), timeout: float | None = None) -> tuple[bool, LaunchHandle | str]:
+    """启动exe并立即返回句柄。
+    
+    输出逐行分发给句柄的订阅者并写入有大小上限的日志文件，
+    支持 cancel() 取消和超时，可在 asyncio 中 await handle.wait_async()
     
     Parameters:
         path: str
+        args: Sequence[str] = ()  # 命令行参数
+        timeout: float | None = None  # 超时（秒）
     
     Returns:
-        result: tuple[bool, str]: (是否成功, 输出信息)
+        result: tuple[bool, LaunchHandle | str]: (是否成功, 句柄或错误信息)
     """
     if not path:
         return False, "exe路径未设置"
@@ -130,39 +128,66 @@ def start_exe_blocking(path) -> tuple[bool, str]:
 
     try:
         logger.info(f"正在启动程序: {path}")
-        result = subprocess.run(
-            [str(file)],
-            cwd=str(file.parent),
-            capture_output=True,
-            text=True,
-            timeout=300  # 5分钟超时
-        )
-
-        if result.returncode == 0:
-            logger.info("程序执行成功")
-            return True, result.stdout
-        else:
-            logger.error(f"程序执行失败，返回码: {result.returncode}")
-            return False, result.stderr
-
-    except subprocess.TimeoutExpired:
-        logger.error("程序执行超时")
-        return False, "程序执行超时"
+        return True, launch(file, args, timeout=timeout)
     except Exception as e:
         logger.error(f"启动程序失败: {e}")
         return False, str(e)
 
 
-def get_folder_size(path) -> tuple[bool, str]:
-    """获取当前应用路径下文件夹空间占用情况。
+@instrument(_duration, _failures)
+def start_exe_blocking(path) -> tuple[bool, str]:
+    """启动exe并等待执行完成。
     
-    支持获取指定应用路径下的文件夹大小，自带单位转换
+    启动指定的exe程序并等待执行完成；五分钟超时
+    内存中只保留最近的输出，完整输出见 logs/apps/<程序名>.log
     
     Parameters:
         path: str
     
     Returns:
-        result: tuple[bool, str]: (是否成功, 大小信息)
+        result: tuple[bool, str]: (是否成功, 输出信息)
+    """
+    success, handle = start_exe_async(path, timeout=300)  # 5分钟超时
+    if not success:
+        return False, handle
+
+    result = handle.wait()
+    if result.state is LaunchState.TIMED_OUT:
+        logger.error("程序执行超时")
+        return False, "程序执行超时"
+
+    if result.returncode == 0:
+        logger.info("程序执行成功")
+        return True, result.stdout_tail
+    else:
+        logger.error(f"程序执行失败，返回码: {result.returncode}")
+        return False, result.stderr_tail
+
+
+def format_size(size_bytes) -> str:
+    """将字节数转换为可读格式"""
+    if size_bytes <= 0:
+        return "0 B"
+    size_names = ["B", "KB", "MB", "GB", "TB"]
+    i = min(int(math.floor(math.log(size_bytes, 1024))), len(size_names) - 1)
+    p = math.pow(1024, i)
+    s = round(size_bytes / p, 2)
+    return f"{s} {size_names[i]}"
+
+
+@instrument(_duration, _failures)
+def get_folder_stats(path, progress: ProgressCallback | None = None, force=False) -> tuple[bool, FolderStats | str]:
+    """获取当前应用路径下文件夹的结构化统计信息。
+
+    使用增量索引扫描，只重新遍历发生变化的目录
+
+    Parameters:
+        path: str
+        progress: ProgressCallback | None = None  # 进度回调
+        force: bool = False  # 忽略索引，完整扫描
+
+    Returns:
+        result: tuple[bool, FolderStats | str]: (是否成功, 统计信息或错误信息)
     """
     if not path:
         return False, "路径未设置"
@@ -172,43 +197,73 @@ def get_folder_size(path) -> tuple[bool, str]:
         return False, f"文件不存在: {path}"
 
     try:
-        folder = file.parent
-        total_size = 0
-        file_count = 0
+        return True, scan_folder(file.parent, progress=progress, force=force)
+    except Exception as e:
+        error_msg = f"获取文件夹大小失败: {e}"
+        logger.error(error_msg)
+        return False, error_msg
 
-        # 遍历文件夹计算大小
-        for file_path in folder.rglob('*'):
-            if file_path.is_file():
-                try:
-                    total_size += file_path.stat().st_size
-                    file_count += 1
-                except (OSError, PermissionError):
-                    continue
 
-        # 转换为可读格式
-        def format_size(size_bytes):
-            """将字节数转换为可读格式"""
-            if size_bytes == 0:
-                return "0 B"
-            size_names = ["B", "KB", "MB", "GB", "TB"]
-            import math
-            i = int(math.floor(math.log(size_bytes, 1024)))
-            p = math.pow(1024, i)
-            s = round(size_bytes / p, 2)
-            return f"{s} {size_names[i]}"
+@instrument(_duration, _failures)
+def get_folder_report(path, top: int = 20, duplicates: bool = True) -> tuple[bool, FolderReport | str]:
+    """分析当前应用路径下的文件夹：最大的文件与目录、内容重复的文件。
 
-        formatted_size = format_size(total_size)
-        folder_info = f"文件夹: {folder.name}\n路径: {folder}\n总大小: {formatted_size}\n文件数量: {file_count}"
+    读取量较大，应在后台线程（例如 TaskExecutor）中调用
 
-        logger.info(f"文件夹大小: {formatted_size}, 文件数: {file_count}")
-        return True, folder_info
+    Parameters:
+        path: str
+        top: int = 20  # 最大文件、最大目录各列出的条数
+        duplicates: bool = True  # 是否检测重复文件
 
+    Returns:
+        result: tuple[bool, FolderReport | str]: (是否成功, 分析结果或错误信息)
+    """
+    if not path:
+        return False, "路径未设置"
+
+    file = Path(path)
+    if not file.exists():
+        return False, f"文件不存在: {path}"
+
+    try:
+        report = analyze_folder(file.parent, top=top, duplicates=duplicates)
     except Exception as e:
-        error_msg = f"获取文件夹大小失败: {e}"
+        error_msg = f"分析文件夹失败: {e}"
         logger.error(error_msg)
         return False, error_msg
 
+    logger.info(
+        f"文件夹分析: {format_size(report.total_size)}, 重复文件 {len(report.duplicates)} 组, "
+        f"可释放 {format_size(report.wasted_size)}"
+    )
+    return True, report
+
+
+@instrument(_duration, _failures)
+def get_folder_size(path) -> tuple[bool, str]:
+    """获取当前应用路径下文件夹空间占用情况。
+    
+    支持获取指定应用路径下的文件夹大小，自带单位转换
+    
+    Parameters:
+        path: str
+    
+    Returns:
+        result: tuple[bool, str]: (是否成功, 大小信息)
+    """
+    success, stats = get_folder_stats(path)
+    if not success:
+        return False, stats
+
+    folder = stats.path
+    formatted_size = format_size(stats.total_size)
+    folder_info = f"文件夹: {folder.name}\n路径: {folder}\n总大小: {formatted_size}\n文件数量: {stats.file_count}"
+
+    logger.info(f"文件夹大小: {formatted_size}, 文件数: {stats.file_count}")
+    return True, folder_info
 
+
+@instrument(_duration, _failures)
 def get_exe_version(path) -> tuple[bool, str]:
     """检查应用程序版本号。
     
@@ -217,6 +272,8 @@ def get_exe_version(path) -> tuple[bool, str]:
     返回版本信息为版本号
     
     如果无法获取版本信息，则返回文件大小
+
+    结果按 (路径, 大小, mtime) 缓存，文件未变化时只需一次 stat()
     
     Parameters:
         path: str
@@ -228,12 +285,43 @@ def get_exe_version(path) -> tuple[bool, str]:
         return False, "路径未设置"
 
     file = Path(path)
-    if not file.exists():
+    try:
+        file_stat = file.stat()
+    except FileNotFoundError:
         return False, f"文件不存在: {path}"
+    except OSError as e:
+        error_msg = f"检查版本失败: {e}"
+        logger.error(error_msg)
+        return False, error_msg
+
+    cached = version_cache.get(file, file_stat)
+    if cached is not None:
+        _version_lookups.labels("cached").inc()
+        return True, cached
 
+    _version_lookups.labels("probed").inc()
+    success, version = _probe_exe_version(file, file_stat)
+    if success:
+        version_cache.put(file, file_stat, version)
+    return success, version
+
+
+def _probe_exe_version(file: Path, file_stat: os.stat_result) -> tuple[bool, str]:
+    """实际读取版本信息，不经过缓存"""
     try:
+        # 方法0: 直接解析 PE 文件中的版本资源（所有系统通用，不运行程序）
+        is_pe = True
+        try:
+            version = read_pe_version(file)
+            logger.info(f"版本: {version}")
+            return True, version
+        except NoVersionResource:
+            logger.info("PE文件中没有版本资源")
+        except PEFormatError:
+            is_pe = False
+
         # 尝试获取文件版本信息 方法1 (Windows)
-        if os.name == 'nt':
+        if os.name == 'nt' and not is_pe:
             try:
                 import win32api
                 info = win32api.GetFileVersionInfo(str(file), "\\")
@@ -248,40 +336,41 @@ def get_exe_version(path) -> tuple[bool, str]:
             except Exception as e:
                 logger.warning(f"获取Windows版本信息失败: {e}")
 
-        # 方法2: 尝试运行程序获取版本信息
-        try:
-            result = subprocess.run(
-                [str(file), '--version'],
-                capture_output=True,
-                text=True,
-                timeout=3  # 减少超时时间
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                version_info = f"{result.stdout.strip()}"
-                return True, version_info
-        except subprocess.TimeoutExpired:
-            logger.warning("版本检查超时")
-        except Exception:
-            pass
-
-        # 方法3: 尝试其他版本参数（跳过可能有问题的参数）
-        for version_arg in ['-v']:  # 只尝试简单的参数
+        # 非 PE 文件才尝试运行程序，避免为了读版本号启动 GUI 程序
+        if not is_pe:
+            # 方法2: 尝试运行程序获取版本信息
             try:
                 result = subprocess.run(
-                    [str(file), version_arg],
+                    [str(file), '--version'],
                     capture_output=True,
                     text=True,
-                    timeout=2  # 更短的超时时间
+                    timeout=3  # 减少超时时间
                 )
-                if result.stdout and ('version' in result.stdout.lower() or 'v' in result.stdout.lower()[:10]):
-                    version_info = f"{result.stdout.strip()[:200]}"
+                if result.returncode == 0 and result.stdout.strip():
+                    version_info = f"{result.stdout.strip()}"
                     return True, version_info
-            except Exception as e:
-                logger.warning(f"[方法三]获取版本信息失败: {e}")
-                continue
+            except subprocess.TimeoutExpired:
+                logger.warning("版本检查超时")
+            except Exception:
+                pass
+
+            # 方法3: 尝试其他版本参数（跳过可能有问题的参数）
+            for version_arg in ['-v']:  # 只尝试简单的参数
+                try:
+                    result = subprocess.run(
+                        [str(file), version_arg],
+                        capture_output=True,
+                        text=True,
+                        timeout=2  # 更短的超时时间
+                    )
+                    if result.stdout and ('version' in result.stdout.lower() or 'v' in result.stdout.lower()[:10]):
+                        version_info = f"{result.stdout.strip()[:200]}"
+                        return True, version_info
+                except Exception as e:
+                    logger.warning(f"[方法三]获取版本信息失败: {e}")
+                    continue
 
         # 方法4: 返回文件基本信息
-        file_stat = file.stat()
         file_size = file_stat.st_size / 1024 / 1024  # MB
         size = f"{file_size:.2f} MB\n"
 
@@ -294,11 +383,13 @@ def get_exe_version(path) -> tuple[bool, str]:
         return False, error_msg
 
 
+# 返回 False 表示未运行，不计为失败
+@instrument(_duration)
 def check_exe_running(path) -> bool:
     """检查程序是否正在运行。
     
     检查指定路径的程序是否正在运行
-    支持多系统处理
+    通过共享进程注册表查询，不再启动 tasklist / pgrep 子进程
     
     Parameters:
         path: str
@@ -306,29 +397,18 @@ def check_exe_running(path) -> bool:
     Returns:
         bool: 正在运行返回True
     """
+    if not path:
+        return False
+
     try:
-        process = path.rsplit('/', 1)[-1] or path.rsplit('\\', 1)[-1]
-        # 在Windows上检查进程
-        if os.name == 'nt':
-            result = subprocess.run(
-                ['tasklist', '/FI', f"IMAGENAME eq {process}"],
-                capture_output=True,
-                text=True
-            )
-            return f'{process}' in result.stdout
-        else:
-            # Linux/Mac
-            result = subprocess.run(
-                ['pgrep', '-f', f'{process.rsplit(".exe")[0]}'],
-                capture_output=True,
-                text=True
-            )
-            return bool(result.stdout.strip())
+        # 共享进程注册表：同一 tick 内的多次查询只遍历一次进程表
+        return process_registry.is_running(path)
     except Exception as e:
         logger.error(f"检查进程失败: {e}")
         return False
 
 
+@instrument(_duration, _failures)
 def get_exe_usage(path, name="") -> tuple[bool, list[str]]:
     """获取进程资源占用情况。
     
@@ -349,33 +429,21 @@ def get_exe_usage(path, name="") -> tuple[bool, list[str]]:
         其中list[str]:[概述，内存占用大小(自带单位), CPU使用率(%)]
     """
     try:
-        processes = []
-        process = path.rsplit('/', 1)[-1] or path.rsplit('\\', 1)[-1]
-
-        # 查找相关进程
-        for proc in psutil.process_iter(['pid', 'name', 'memory_info', 'cpu_percent']):
-            try:
-                if f"{process.rsplit(".exe")[0]}" in proc.info['name'] or f"{process.rsplit(".exe")[0]}".lower() in \
-                        proc.info['name'].lower():
-                    processes.append(proc)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        processes = process_registry.processes(path, name)
 
         if not processes:
-            try:
-                if name in proc.info['name']:
-                    processes.append(proc)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
             return False, "未找到进程"
 
+        # cpu_percent() 首次调用恒为 0，先统一打底
+        prime_cpu_percent(processes)
+
         memory_info = []
         total_memory = 0
         total_cpu = 0
 
         for proc in processes:
             try:
-                memory_mb = proc.info['memory_info'].rss / 1024 / 1024  # 转换为MB
+                memory_mb = proc.memory_info().rss / 1024 / 1024  # 转换为MB
                 cpu_percent = proc.cpu_percent()
                 total_memory += memory_mb
                 total_cpu += cpu_percent
@@ -393,9 +461,13 @@ def get_exe_usage(path, name="") -> tuple[bool, list[str]]:
         if memory_info:
             result = f"找到 {len(processes)} 个进程\n"
             result += f"总内存占用: {total_memory:.2f} MB\n\n"
-            logger.info(f"进程内存占用: {total_memory:.2f} MB")
             result += f"总CPU使用率: {total_cpu:.1f}%\n"
-            logger.info(f"进程CPU使用率: {total_cpu:.1f}%")
+            # 该函数常被轮询调用，限频输出避免日志刷屏
+            log_throttled(
+                f"exe_usage:{path}",
+                "INFO",
+                f"进程内存占用: {total_memory:.2f} MB, CPU使用率: {total_cpu:.1f}%",
+            )
             result += "\n" + "=" * 40 + "\n" + "".join(memory_info)
 
             usage_info.append(result)
@@ -0,0 +1,343 @@
+import hashlib
+import heapq
+import mmap
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from loguru import logger
+
+# 快速哈希读取文件头尾各多少字节；不超过两倍该值的文件快速哈希即完整哈希
+EDGE_SIZE = 64 * 1024
+# 小于该大小的文件不参与重复检测（删除收益太小）
+MIN_DUPLICATE_SIZE = 4 * 1024
+# 每个进程任务处理的文件数，减少进程间通信次数
+HASH_BATCH = 16
+# 需要完整哈希的数据量超过该值才使用进程池；数据量小时子进程的启动开销（Windows 上需重新导入主模块）得不偿失
+PROCESS_POOL_MIN_BYTES = 512 * 1024 * 1024
+DIGEST_SIZE = 20
+
+
+@dataclass(slots=True, frozen=True)
+class SizedPath:
+    path: Path
+    size: int
+
+
+@dataclass(slots=True)
+class DuplicateGroup:
+    """内容完全相同的一组文件"""
+
+    size: int
+    digest: str
+    paths: list[Path]
+
+    @property
+    def wasted(self) -> int:
+        """只保留一份时可以释放的空间"""
+        return self.size * (len(self.paths) - 1)
+
+
+@dataclass(slots=True)
+class AnalyzeProgress:
+    stage: str  # "scan" / "partial" / "full"
+    done: int
+    total: int  # 扫描阶段为 0（总数未知）
+
+
+@dataclass(slots=True)
+class FolderReport:
+    path: Path
+    total_size: int = 0
+    file_count: int = 0
+    dir_count: int = 0
+    largest_files: list[SizedPath] = field(default_factory=list)
+    largest_dirs: list[SizedPath] = field(default_factory=list)  # 按包含子目录的总大小
+    duplicates: list[DuplicateGroup] = field(default_factory=list)  # 按可释放空间从大到小
+    hashed_bytes: int = 0  # 为检测重复实际读取的字节数
+    interrupted: bool = False  # 因取消提前结束，统计与重复文件都可能不完整
+    elapsed: float = 0.0
+
+    @property
+    def wasted_size(self) -> int:
+        return sum(group.wasted for group in self.duplicates)
+
+
+def _scan_dir(path: str) -> tuple[list[tuple[str, int, int]], list[str]]:
+    """扫描单个目录，返回 ([(文件路径, 大小, inode)], [子目录路径])"""
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        # POSIX 上 inode 来自目录项本身，用于识别硬链接；Windows 上获取需要额外 stat，跳过
+                        inode = entry.inode() if os.name != "nt" else 0
+                        files.append((entry.path, entry.stat(follow_symlinks=False).st_size, inode))
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.debug(f"无法读取目录 {path}: {e}")
+    return files, subdirs
+
+
+def _partial_hash(path: str, size: int) -> str | None:
+    """文件头尾各 EDGE_SIZE 字节的哈希；小文件即整个文件的哈希"""
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    try:
+        with open(path, "rb") as f:
+            h.update(f.read(EDGE_SIZE))
+            if size > EDGE_SIZE:
+                f.seek(max(EDGE_SIZE, size - EDGE_SIZE))
+                h.update(f.read(EDGE_SIZE))
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def _full_hash(path: str) -> str | None:
+    """通过 mmap 计算整个文件的哈希，不经过 Python 的读缓冲"""
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            h.update(m)
+    except (OSError, ValueError):
+        return None
+    return h.hexdigest()
+
+
+def _partial_hash_batch(items: list[tuple[str, int]]) -> list[str | None]:
+    return [_partial_hash(path, size) for path, size in items]
+
+
+def _full_hash_batch(items: list[tuple[str, int]]) -> list[str | None]:
+    return [_full_hash(path) for path, _ in items]
+
+
+def _hash_stage(
+        pool: Executor,
+        fn: Callable[[list[tuple[str, int]]], list[str | None]],
+        groups: list[list[tuple[str, int]]],
+        stage: str,
+        report: FolderReport,
+        read_size: Callable[[int], int],
+        progress: Callable[[AnalyzeProgress], None] | None,
+        cancel: threading.Event | None,
+) -> list[list[tuple[str, int, str]]] | None:
+    """对每组候选文件计算哈希，按哈希再分组，返回仍然重复的组；被取消时返回 None。
+
+    每完成一批，把 read_size(文件大小) 累加到 report.hashed_bytes
+    """
+    items = [item for group in groups for item in group]
+    futures: dict[Future, list[tuple[str, int]]] = {}
+    for i in range(0, len(items), HASH_BATCH):
+        batch = items[i:i + HASH_BATCH]
+        futures[pool.submit(fn, batch)] = batch
+
+    buckets: dict[tuple[int, str], list[tuple[str, int, str]]] = defaultdict(list)
+    done_count = 0
+    pending = set(futures)
+    while pending:
+        if cancel is not None and cancel.is_set():
+            for fut in pending:
+                fut.cancel()
+            return None
+        done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+        for fut in done:
+            batch = futures[fut]
+            for (path, size), digest in zip(batch, fut.result()):
+                if digest is not None:
+                    buckets[(size, digest)].append((path, size, digest))
+            done_count += len(batch)
+            report.hashed_bytes += sum(read_size(size) for _, size in batch)
+        if progress is not None and done:
+            progress(AnalyzeProgress(stage, done_count, len(items)))
+    return [group for group in buckets.values() if len(group) > 1]
+
+
+def analyze_folder(
+        path,
+        *,
+        top: int = 20,
+        duplicates: bool = True,
+        min_duplicate_size: int = MIN_DUPLICATE_SIZE,
+        processes: int | None = None,
+        progress: Callable[[AnalyzeProgress], None] | None = None,
+        cancel: threading.Event | None = None,
+) -> FolderReport:
+    """分析文件夹：最大的文件与目录、内容重复的文件。
+
+    扫描时用大小为 top 的最小堆保留最大的文件，内存与文件总数无关；
+    重复检测分三步逐步缩小范围：按大小分组 -> 头尾快速哈希 -> 仍冲突的才用 mmap 读取完整哈希。
+    完整哈希在进程池中计算，大文件夹的耗时主要取决于磁盘读取而不是哈希计算
+
+    Parameters:
+        path: str | Path  # 要分析的文件夹
+        top: int = 20  # 最大文件、最大目录各保留的条数
+        duplicates: bool = True  # 是否检测重复文件
+        min_duplicate_size: int = MIN_DUPLICATE_SIZE  # 参与重复检测的最小文件大小
+        processes: int | None = None  # 完整哈希的进程数，0 表示使用线程；默认按数据量自动选择
+        progress: 进度回调，在调用线程中执行
+        cancel: threading.Event | None = None  # 置位后尽快结束，返回已得到的部分结果（interrupted 为 True）
+
+    Returns:
+        FolderReport: 分析结果
+
+    Raises:
+        NotADirectoryError: 路径不是文件夹
+    """
+    start = time.perf_counter()
+    root = Path(path).resolve()
+    if not root.is_dir():
+        raise NotADirectoryError(f"不是文件夹: {root}")
+
+    report = FolderReport(path=root)
+    largest: list[tuple[int, str]] = []  # 最小堆，堆顶是当前入选的最小文件
+    dir_sizes: dict[str, int] = {}
+    parents: dict[str, str] = {}
+    by_size: dict[int, list[tuple[str, int]]] = defaultdict(list)  # 大小 -> [(路径, inode)]
+
+    workers = min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="folder-analyze") as pool:
+        root_key = str(root)
+        pending: dict[Future, str] = {pool.submit(_scan_dir, root_key): root_key}
+        while pending:
+            if cancel is not None and cancel.is_set():
+                for fut in pending:
+                    fut.cancel()
+                report.interrupted = True
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                dir_path = pending.pop(fut)
+                files, subdirs = fut.result()
+                report.dir_count += 1
+                dir_total = 0
+                for file_path, size, inode in files:
+                    dir_total += size
+                    if len(largest) < top:
+                        heapq.heappush(largest, (size, file_path))
+                    elif size > largest[0][0]:
+                        heapq.heapreplace(largest, (size, file_path))
+                    if duplicates and size >= min_duplicate_size:
+                        by_size[size].append((file_path, inode))
+                report.file_count += len(files)
+                report.total_size += dir_total
+                dir_sizes[dir_path] = dir_total
+                for sub in subdirs:
+                    parents[sub] = dir_path
+                    pending[pool.submit(_scan_dir, sub)] = sub
+            if progress is not None:
+                progress(AnalyzeProgress("scan", report.file_count, 0))
+    report.dir_count -= 1
+
+    # 子目录大小累加到各级父目录：按路径长度从深到浅，保证子目录先于父目录处理
+    for dir_path in sorted(dir_sizes, key=len, reverse=True):
+        parent = parents.get(dir_path)
+        if parent is not None:
+            dir_sizes[parent] += dir_sizes[dir_path]
+    dir_sizes.pop(str(root), None)
+    report.largest_files = [SizedPath(Path(p), s) for s, p in sorted(largest, reverse=True)]
+    report.largest_dirs = [
+        SizedPath(Path(p), s) for p, s in heapq.nlargest(top, dir_sizes.items(), key=lambda item: item[1])
+    ]
+
+    if duplicates and not report.interrupted:
+        report.duplicates = _find_duplicates(by_size, report, processes, progress, cancel)
+    report.elapsed = time.perf_counter() - start
+    logger.debug(
+        f"分析 {root} {'已取消' if report.interrupted else '完成'}: {report.file_count} 个文件, "
+        f"{len(report.duplicates)} 组重复, 读取 {report.hashed_bytes} 字节, 用时 {report.elapsed:.3f}s"
+    )
+    return report
+
+
+def _find_duplicates(
+        by_size: dict[int, list[tuple[str, int]]],
+        report: FolderReport,
+        processes: int | None,
+        progress: Callable[[AnalyzeProgress], None] | None,
+        cancel: threading.Event | None,
+) -> list[DuplicateGroup]:
+    # 第一步：大小相同才可能重复；同一 inode 的硬链接不占额外空间，只保留一个
+    candidates: list[list[tuple[str, int]]] = []
+    for size, entries in by_size.items():
+        if len(entries) < 2:
+            continue
+        seen: set[int] = set()
+        unique = [p for p, inode in entries if not inode or not (inode in seen or seen.add(inode))]
+        if len(unique) > 1:
+            candidates.append([(p, size) for p in unique])
+    if not candidates:
+        return []
+
+    # 第二步：头尾快速哈希，读取量很小，用线程即可（读文件与哈希都会释放 GIL）
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4), thread_name_prefix="hash") as pool:
+        partial = _hash_stage(
+            pool, _partial_hash_batch, candidates, "partial", report,
+            lambda size: min(size, 2 * EDGE_SIZE), progress, cancel,
+        )
+    if partial is None:
+        report.interrupted = True
+        return []
+
+    confirmed: list[DuplicateGroup] = []
+    need_full: list[list[tuple[str, int]]] = []
+    for group in partial:
+        paths = [p for p, _, _ in group]
+        size, digest = group[0][1], group[0][2]
+        if size <= 2 * EDGE_SIZE:
+            # 快速哈希已经覆盖整个文件
+            confirmed.append(DuplicateGroup(size, digest, [Path(p) for p in paths]))
+        else:
+            need_full.append([(p, size) for p in paths])
+
+    # 第三步：剩余的冲突读取完整内容
+    if need_full:
+        full_bytes = sum(s for group in need_full for _, s in group)
+        if processes is None and full_bytes < PROCESS_POOL_MIN_BYTES:
+            processes = 0
+        full = _run_full_hash(need_full, report, processes, progress, cancel)
+        if full is None:
+            # 已确认的小文件重复组仍然返回
+            report.interrupted = True
+            full = []
+        for group in full:
+            confirmed.append(DuplicateGroup(group[0][1], group[0][2], [Path(p) for p, _, _ in group]))
+
+    for group in confirmed:
+        group.paths.sort()
+    confirmed.sort(key=lambda g: g.wasted, reverse=True)
+    return confirmed
+
+
+def _run_full_hash(
+        groups: list[list[tuple[str, int]]],
+        report: FolderReport,
+        processes: int | None,
+        progress: Callable[[AnalyzeProgress], None] | None,
+        cancel: threading.Event | None,
+) -> list[list[tuple[str, int, str]]] | None:
+    if processes != 0:
+        try:
+            with ProcessPoolExecutor(max_workers=processes or os.cpu_count() or 1) as pool:
+                return _hash_stage(pool, _full_hash_batch, groups, "full", report, lambda size: size, progress, cancel)
+        except (OSError, RuntimeError) as e:
+            # 打包后的程序等环境可能无法创建子进程，退回线程池
+            logger.warning(f"无法创建进程池，改用线程计算哈希: {e}")
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="hash") as pool:
+        return _hash_stage(pool, _full_hash_batch, groups, "full", report, lambda size: size, progress, cancel)
@@ -0,0 +1,220 @@
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+
+from src.config import DATA_DIR
+from src.utils.atomic_io import atomic_write_json, read_json
+
+INDEX_PATH = DATA_DIR / "folder_index.json"
+
+# 进度回调的最小间隔（秒），避免回调本身拖慢扫描
+PROGRESS_INTERVAL = 0.1
+
+
+@dataclass(slots=True)
+class FolderStats:
+    """文件夹扫描结果"""
+
+    path: Path
+    total_size: int = 0
+    file_count: int = 0
+    dir_count: int = 0
+    # 本次真正执行了 scandir 的目录数 / 直接复用索引的目录数
+    scanned_dirs: int = 0
+    reused_dirs: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass(slots=True)
+class ScanProgress:
+    """扫描进度，传给进度回调"""
+
+    dirs_done: int
+    file_count: int
+    total_size: int
+
+
+ProgressCallback = Callable[[ScanProgress], None]
+
+# 索引记录: [目录mtime_ns, 目录内文件总大小, 目录内文件数, 子目录名列表]
+_Record = list
+
+
+class FolderIndex:
+    """按目录持久化的扫描索引。
+
+    每个目录记录其 mtime 与直属文件的小计，目录 mtime 未变化时直接复用小计，
+    只需对子目录做一次 stat 即可继续向下检查。
+
+    注意: 目录 mtime 只在增删改名直属条目时变化，原地覆写文件内容不会更新，
+    这种情况需要使用 force=True 进行完整扫描。
+    """
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._roots: dict[str, dict[str, _Record]] | None = None
+
+    def _ensure_loaded(self) -> dict[str, dict[str, _Record]]:
+        if self._roots is None:
+            self._roots = read_json(self.path, {})
+        return self._roots
+
+    def get_root(self, root: str) -> dict[str, _Record]:
+        with self._lock:
+            return self._ensure_loaded().get(root, {})
+
+    def replace_root(self, root: str, records: dict[str, _Record]) -> None:
+        with self._lock:
+            self._ensure_loaded()[root] = records
+            self._save()
+
+    def clear(self, root: str | None = None) -> None:
+        """清除某个根目录（或全部）的索引"""
+        with self._lock:
+            roots = self._ensure_loaded()
+            if root is None:
+                roots.clear()
+            else:
+                roots.pop(root, None)
+            self._save()
+
+    def _save(self) -> None:
+        try:
+            atomic_write_json(self.path, self._roots)
+        except OSError as e:
+            logger.warning(f"保存文件夹索引失败: {e}")
+
+
+folder_index = FolderIndex()
+
+
+def _scan_dir(path: str, mtime_ns: int, cached: _Record | None) -> tuple[_Record, list[tuple[str, int]], bool]:
+    """扫描单个目录。
+
+    mtime 与索引一致时复用小计，只 stat 子目录；否则用 scandir 重新统计。
+
+    Returns:
+        (目录记录, [(子目录路径, 子目录mtime_ns)], 是否复用了索引)
+    """
+    if cached is not None and cached[0] == mtime_ns:
+        subdirs = []
+        for name in cached[3]:
+            sub = os.path.join(path, name)
+            try:
+                subdirs.append((sub, os.stat(sub, follow_symlinks=False).st_mtime_ns))
+            except OSError:
+                # 子目录消失但父目录 mtime 未变（一般不会发生），按未知处理
+                subdirs.append((sub, -1))
+        return cached, subdirs, True
+
+    size = 0
+    count = 0
+    names: list[str] = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        names.append(entry.name)
+                        subdirs.append((entry.path, entry.stat(follow_symlinks=False).st_mtime_ns))
+                    elif entry.is_file():
+                        size += entry.stat().st_size
+                        count += 1
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.debug(f"无法读取目录 {path}: {e}")
+        # mtime 记为 -1，下次一定会重新扫描
+        return [-1, 0, 0, []], [], False
+
+    return [mtime_ns, size, count, names], subdirs, False
+
+
+def scan_folder(
+        path,
+        *,
+        workers: int | None = None,
+        progress: ProgressCallback | None = None,
+        force: bool = False,
+        index: FolderIndex | None = None,
+) -> FolderStats:
+    """统计文件夹大小。
+
+    使用线程池并行 scandir 遍历目录，并借助持久化索引只重新遍历发生变化的目录。
+
+    Parameters:
+        path: str | Path  # 要统计的文件夹
+        workers: int | None = None  # 并行线程数，默认按 CPU 数量
+        progress: ProgressCallback | None = None  # 进度回调，在调用线程中执行
+        force: bool = False  # 忽略索引，完整扫描
+        index: FolderIndex | None = None  # 自定义索引，默认使用 data/folder_index.json
+
+    Returns:
+        FolderStats: 扫描结果
+
+    Raises:
+        FileNotFoundError / NotADirectoryError: 路径不存在或不是文件夹
+    """
+    start = time.perf_counter()
+    root = Path(path).resolve()
+    root_mtime = os.stat(root).st_mtime_ns
+    if not root.is_dir():
+        raise NotADirectoryError(f"不是文件夹: {root}")
+
+    index = index or folder_index
+    root_key = str(root)
+    old_records = {} if force else index.get_root(root_key)
+    new_records: dict[str, _Record] = {}
+
+    stats = FolderStats(path=root)
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    last_report = 0.0
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="folder-scan") as pool:
+        pending: dict[Future, str] = {
+            pool.submit(_scan_dir, root_key, root_mtime, old_records.get(root_key)): root_key
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                dir_path = pending.pop(fut)
+                record, subdirs, reused = fut.result()
+
+                new_records[dir_path] = record
+                stats.total_size += record[1]
+                stats.file_count += record[2]
+                stats.dir_count += 1
+                if reused:
+                    stats.reused_dirs += 1
+                else:
+                    stats.scanned_dirs += 1
+
+                for sub, mtime_ns in subdirs:
+                    pending[pool.submit(_scan_dir, sub, mtime_ns, old_records.get(sub))] = sub
+
+            if progress is not None:
+                now = time.perf_counter()
+                if now - last_report >= PROGRESS_INTERVAL or not pending:
+                    last_report = now
+                    progress(ScanProgress(stats.dir_count, stats.file_count, stats.total_size))
+
+    # 根目录本身不算在子目录数量里
+    stats.dir_count -= 1
+
+    if stats.scanned_dirs or len(new_records) != len(old_records):
+        index.replace_root(root_key, new_records)
+
+    stats.elapsed = time.perf_counter() - start
+    logger.debug(
+        f"扫描 {root} 完成: {stats.file_count} 个文件, 重新扫描 {stats.scanned_dirs} 个目录, "
+        f"复用 {stats.reused_dirs} 个目录, 用时 {stats.elapsed:.3f}s"
+    )
+    return stats
@@ -0,0 +1,296 @@
+import gzip
+import http.client
+import json
+import queue
+import threading
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from loguru import logger
+
+USER_AGENT = "swarmToolbox/0.1.0"
+DEFAULT_TIMEOUT = 10.0
+# 每个主机保留的空闲连接数
+POOL_SIZE = 8
+MAX_REDIRECTS = 5
+# 流式读取的块大小
+CHUNK_SIZE = 64 * 1024
+
+
+class HttpError(Exception):
+    """请求失败（网络错误或非 2xx/304 状态码）"""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass(slots=True)
+class HttpResponse:
+    """已完整读取的响应"""
+
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    url: str
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    def header(self, name: str, default: str | None = None) -> str | None:
+        return self.headers.get(name.lower(), default)
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class HttpStream:
+    """流式读取中的响应"""
+
+    def __init__(self, status: int, headers: dict[str, str], url: str, resp: http.client.HTTPResponse):
+        self.status = status
+        self.headers = headers
+        self.url = url
+        self._resp = resp
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    def header(self, name: str, default: str | None = None) -> str | None:
+        return self.headers.get(name.lower(), default)
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """逐块读取响应体（已解压）
+
+        Raises:
+            HttpError: 读取过程中网络出错
+        """
+        encoding = self.header("content-encoding", "")
+        decompressor = None
+        if encoding == "gzip":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            decompressor = zlib.decompressobj()
+        while True:
+            try:
+                chunk = self._resp.read1(chunk_size)
+            except (http.client.HTTPException, OSError) as e:
+                raise HttpError(f"读取 {self.url} 的响应失败: {e}") from e
+            if not chunk:
+                break
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+                if not chunk:
+                    continue
+            yield chunk
+        if decompressor is not None:
+            tail = decompressor.flush()
+            if tail:
+                yield tail
+
+
+@dataclass(slots=True)
+class _Pool:
+    idle: "queue.LifoQueue[http.client.HTTPConnection]" = field(default_factory=lambda: queue.LifoQueue(POOL_SIZE))
+
+
+class HttpClient:
+    """带连接池的简单 HTTP 客户端（仅标准库）。
+
+    同一主机的请求复用 keep-alive 连接，可在多个线程中共享使用；
+    支持 gzip/deflate 解压与重定向。304 视为正常响应返回，由调用方处理条件请求
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, headers: dict[str, str] | None = None):
+        self.timeout = timeout
+        self.headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"}
+        self.headers.update(headers or {})
+        self._pools: dict[tuple[str, str], _Pool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, scheme: str, netloc: str) -> _Pool:
+        with self._lock:
+            pool = self._pools.get((scheme, netloc))
+            if pool is None:
+                pool = self._pools[(scheme, netloc)] = _Pool()
+            return pool
+
+    def _connect(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout)
+        if scheme == "http":
+            return http.client.HTTPConnection(netloc, timeout=self.timeout)
+        raise HttpError(f"不支持的协议: {scheme}")
+
+    def _open(
+            self, method: str, url: str, headers: dict[str, str], body: bytes | None, timeout: float | None = None
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse, _Pool]:
+        """发送请求并读取响应头，返回的连接需要用 _release 归还。timeout 为 None 时使用 self.timeout"""
+        timeout = self.timeout if timeout is None else timeout
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        pool = self._pool(parts.scheme, parts.netloc)
+
+        # 池中的连接可能已被服务器关闭，失败时用新连接重试一次
+        for attempt in range(2):
+            try:
+                conn = pool.idle.get_nowait()
+                reused = True
+            except queue.Empty:
+                conn = self._connect(parts.scheme, parts.netloc)
+                reused = False
+            # 池中的连接可能由使用其他超时的请求建立，每次请求重新设置
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse(), pool
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise HttpError(f"请求 {url} 失败: {e}") from e
+
+        raise HttpError(f"请求 {url} 失败")
+
+    @staticmethod
+    def _release(conn: http.client.HTTPConnection, resp: http.client.HTTPResponse, pool: _Pool) -> None:
+        # 响应未读完（提前结束的流式读取）时连接不能复用
+        if resp.will_close or not resp.isclosed():
+            conn.close()
+            return
+        try:
+            pool.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _send(self, method: str, url: str, headers: dict[str, str], body: bytes | None) -> HttpResponse:
+        conn, resp, pool = self._open(method, url, headers, body)
+        try:
+            data = resp.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            raise HttpError(f"读取 {url} 的响应失败: {e}") from e
+        self._release(conn, resp, pool)
+
+        resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+        encoding = resp_headers.get("content-encoding", "")
+        if encoding == "gzip":
+            data = gzip.decompress(data)
+        elif encoding == "deflate":
+            data = zlib.decompress(data)
+        return HttpResponse(resp.status, resp_headers, data, url)
+
+    def request(
+            self,
+            method: str,
+            url: str,
+            *,
+            params: dict[str, Any] | None = None,
+            headers: dict[str, str] | None = None,
+            body: bytes | None = None,
+            allow_status: tuple[int, ...] = (),
+    ) -> HttpResponse:
+        """发送请求并读取完整响应。
+
+        Parameters:
+            params: 附加到 URL 的查询参数
+            headers: 额外请求头
+            allow_status: 除 2xx 和 304 外，也视为成功的状态码
+
+        Raises:
+            HttpError: 网络错误或状态码不被接受
+        """
+        if params:
+            url += ("&" if "?" in url else "?") + urlencode(params)
+        merged = {**self.headers, **(headers or {})}
+
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = self._send(method, url, merged, body)
+            location = resp.header("location")
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                if resp.status == 303:
+                    method, body = "GET", None
+                continue
+            if 200 <= resp.status < 300 or resp.status == 304 or resp.status in allow_status:
+                return resp
+            raise HttpError(f"请求 {url} 返回 {resp.status}", resp.status)
+
+        raise HttpError(f"请求 {url} 重定向次数过多")
+
+    def get(self, url: str, **kwargs) -> HttpResponse:
+        return self.request("GET", url, **kwargs)
+
+    @contextmanager
+    def stream(
+            self,
+            url: str,
+            *,
+            params: dict[str, Any] | None = None,
+            headers: dict[str, str] | None = None,
+            allow_status: tuple[int, ...] = (),
+            timeout: float | None = None,
+    ) -> Iterator["HttpStream"]:
+        """以流的方式发送 GET 请求，响应体通过 HttpStream.iter_chunks() 边下载边读取。
+
+        读完整个响应后连接归还连接池；提前退出时关闭连接。
+        timeout 为连接与每次读取的超时（秒），默认使用客户端的超时
+
+        Raises:
+            HttpError: 网络错误或状态码不被接受
+        """
+        if params:
+            url += ("&" if "?" in url else "?") + urlencode(params)
+        merged = {**self.headers, **(headers or {})}
+
+        for _ in range(MAX_REDIRECTS + 1):
+            conn, resp, pool = self._open("GET", url, merged, None, timeout)
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            location = resp_headers.get("location")
+            ok = 200 <= resp.status < 300 or resp.status == 304 or resp.status in allow_status
+            if not ok or (resp.status in (301, 302, 303, 307, 308) and location):
+                try:
+                    resp.read()
+                except (http.client.HTTPException, OSError):
+                    pass
+                self._release(conn, resp, pool)
+                if not ok and not location:
+                    raise HttpError(f"请求 {url} 返回 {resp.status}", resp.status)
+                url = urljoin(url, location)
+                continue
+
+            try:
+                yield HttpStream(resp.status, resp_headers, url, resp)
+            finally:
+                self._release(conn, resp, pool)
+            return
+
+        raise HttpError(f"请求 {url} 重定向次数过多")
+
+    def close(self) -> None:
+        """关闭所有空闲连接"""
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            while True:
+                try:
+                    pool.idle.get_nowait().close()
+                except queue.Empty:
+                    break
+        logger.debug("HTTP 连接池已关闭")
+
+
+http_client = HttpClient()
@@ -0,0 +1,333 @@
+import json
+import math
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import psutil
+from loguru import logger
+
+from src.config import DATA_DIR, IS_WINDOWS
+from src.utils.atomic_io import atomic_write_bytes
+
+TELEMETRY_PATH = DATA_DIR / "launch_telemetry.jsonl"
+# 启动后观察的时长（秒），峰值内存按这段时间统计
+PROBE_SECONDS = 20.0
+# 采样间隔（秒）
+SAMPLE_INTERVAL = 0.1
+# CPU 使用率（进程树求和，100 = 一个核心）持续低于该值 SETTLE_SECONDS 秒视为启动完成
+SETTLE_CPU_PERCENT = 10.0
+SETTLE_SECONDS = 1.0
+# 文件中保留的记录数，超过 1.5 倍时压缩
+MAX_RECORDS = 1000
+# 新版本启动耗时中位数超过上一版本的倍数时记录警告
+REGRESSION_RATIO = 1.2
+# 比较版本时每个版本至少需要的启动次数
+MIN_LAUNCHES = 3
+
+
+@dataclass(slots=True, frozen=True)
+class LaunchRecord:
+    """一次启动的测量结果，耗时均为秒，从调用启动函数开始计时"""
+
+    app: str
+    version: str
+    timestamp: float  # 启动时刻（Unix 时间）
+    spawn: float  # 创建进程返回
+    window: float | None  # 出现第一个可见窗口（仅 Windows），观察期内没有出现时为 None
+    settled: float | None  # CPU 平稳，观察期内没有平稳时为 None
+    peak_rss: int  # 观察期内进程树的峰值内存（字节）
+    exited: bool  # 观察期内进程已退出
+
+    @property
+    def ready(self) -> float | None:
+        """可用耗时：优先第一个可见窗口，没有窗口时取 CPU 平稳时刻"""
+        return self.window if self.window is not None else self.settled
+
+    def to_row(self) -> list:
+        # 按位置存储，每条记录一行紧凑的 JSON 数组
+        return [
+            self.app, self.version, round(self.timestamp), round(self.spawn, 4),
+            None if self.window is None else round(self.window, 3),
+            None if self.settled is None else round(self.settled, 3),
+            self.peak_rss, int(self.exited),
+        ]
+
+    @classmethod
+    def from_row(cls, row: list) -> "LaunchRecord":
+        app, version, timestamp, spawn, window, settled, peak_rss, exited = row
+        return cls(app, version, float(timestamp), float(spawn), window, settled, int(peak_rss), bool(exited))
+
+
+@dataclass(slots=True, frozen=True)
+class VersionSummary:
+    """某个版本所有启动的汇总"""
+
+    version: str
+    launches: int
+    first_seen: float
+    spawn_median: float
+    ready_median: float | None  # 没有任何一次测到可用时刻时为 None
+    ready_p90: float | None
+    peak_rss_median: int
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+def _visible_window_pids() -> set[int]:
+    """拥有可见顶层窗口的进程 PID（仅 Windows）"""
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    pids: set[int] = set()
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def callback(hwnd, _):
+        if user32.IsWindowVisible(hwnd):
+            pid = wintypes.DWORD()
+            user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+            pids.add(pid.value)
+        return True
+
+    user32.EnumWindows(callback, 0)
+    return pids
+
+
+def probe_launch(
+        pid: int,
+        started: float,
+        *,
+        duration: float = PROBE_SECONDS,
+        interval: float = SAMPLE_INTERVAL,
+        window_pids: Callable[[], set[int]] | None = _visible_window_pids if IS_WINDOWS else None,
+        stop: threading.Event | None = None,
+) -> tuple[float | None, float | None, int, bool]:
+    """观察刚启动的进程（连同其子进程），直到 started 之后 duration 秒。
+
+    Parameters:
+        pid: 进程 PID
+        started: 开始启动时的 time.perf_counter()
+        window_pids: 返回拥有可见窗口的 PID 集合，None 时不检测窗口
+
+    Returns:
+        (第一个可见窗口的耗时, CPU 平稳的耗时, 峰值内存, 是否已退出)
+    """
+    try:
+        root = psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        return None, None, 0, True
+
+    procs = {pid: root}
+    window = settled = None
+    quiet_since: float | None = None
+    peak_rss = 0
+    exited = False
+    first = True
+    stop = stop or threading.Event()
+
+    while (now := time.perf_counter()) - started < duration:
+        # 启动器类程序常常再派生出真正的主进程，按进程树统计
+        try:
+            for child in root.children(recursive=True):
+                procs.setdefault(child.pid, child)
+        except psutil.NoSuchProcess:
+            pass
+        rss = 0
+        cpu = 0.0
+        for child_pid, proc in list(procs.items()):
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    cpu += proc.cpu_percent(None)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                del procs[child_pid]
+            except psutil.AccessDenied:
+                continue
+        if not procs:
+            exited = True
+            break
+        peak_rss = max(peak_rss, rss)
+
+        if window is None and window_pids is not None and not procs.keys().isdisjoint(window_pids()):
+            window = now - started
+        # 第一次 cpu_percent() 总是返回 0，不参与判断
+        if settled is None and not first:
+            if cpu < SETTLE_CPU_PERCENT:
+                quiet_since = now if quiet_since is None else quiet_since
+                if now - quiet_since >= SETTLE_SECONDS:
+                    settled = quiet_since - started
+            else:
+                quiet_since = None
+        first = False
+        if stop.wait(interval):
+            break
+    return window, settled, peak_rss, exited
+
+
+class LaunchTelemetry:
+    """记录托管应用每次启动的耗时与峰值内存，并按版本汇总。
+
+    watch 在后台线程中观察进程，不阻塞启动；记录按行追加到 data/launch_telemetry.jsonl，
+    每行是一个紧凑的 JSON 数组，超过 MAX_RECORDS 的旧记录在追加时压缩掉。
+    同一应用的新版本启动明显变慢时记录警告
+    """
+
+    def __init__(self, path: Path = TELEMETRY_PATH, max_records: int = MAX_RECORDS):
+        self.path = path
+        self.max_records = max_records
+        self._lock = threading.Lock()
+        self._records: list[LaunchRecord] | None = None
+
+    def _ensure_loaded(self) -> list[LaunchRecord]:
+        if self._records is None:
+            records = []
+            try:
+                with self.path.open("r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            records.append(LaunchRecord.from_row(json.loads(line)))
+                        except (ValueError, TypeError):
+                            # 写入中断留下的不完整行
+                            continue
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"读取启动记录失败: {e}")
+            self._records = records
+        return self._records
+
+    def add(self, record: LaunchRecord) -> None:
+        """保存一条记录"""
+        with self._lock:
+            records = self._ensure_loaded()
+            records.append(record)
+            try:
+                if len(records) > self.max_records * 3 // 2:
+                    del records[:-self.max_records]
+                    data = "".join(json.dumps(r.to_row(), separators=(",", ":")) + "\n" for r in records)
+                    atomic_write_bytes(self.path, data.encode("utf-8"))
+                else:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with self.path.open("a", encoding="utf-8") as f:
+                        f.write(json.dumps(record.to_row(), separators=(",", ":")) + "\n")
+            except OSError as e:
+                logger.warning(f"保存启动记录失败: {e}")
+        self._check_regression(record.app)
+
+    def records(self, app: str | None = None) -> list[LaunchRecord]:
+        with self._lock:
+            records = list(self._ensure_loaded())
+        return records if app is None else [r for r in records if r.app == app]
+
+    def apps(self) -> list[str]:
+        return sorted({r.app for r in self.records()})
+
+    # ---- 测量 ----
+
+    def watch(
+            self,
+            app: str,
+            pid: int,
+            started: float,
+            spawn: float,
+            version: Callable[[], str],
+            duration: float = PROBE_SECONDS,
+    ) -> threading.Thread:
+        """在后台线程中观察刚启动的进程，结束后保存记录
+
+        Parameters:
+            app: 应用名称
+            pid: 进程 PID
+            started: 调用启动函数前的 time.perf_counter()
+            spawn: 创建进程的耗时（秒）
+            version: 返回版本号，在后台线程中调用
+        """
+        timestamp = time.time() - (time.perf_counter() - started)
+
+        def run():
+            try:
+                window, settled, peak_rss, exited = probe_launch(pid, started, duration=duration)
+                try:
+                    tag = version()
+                except Exception as e:  # noqa: BLE001
+                    logger.debug(f"读取 {app} 版本失败: {e}")
+                    tag = ""
+                record = LaunchRecord(app, tag, timestamp, spawn, window, settled, peak_rss, exited)
+                self.add(record)
+                logger.info(
+                    f"{app} {tag} 启动: 创建进程 {spawn * 1000:.0f}ms，"
+                    f"可用 {'未知' if record.ready is None else f'{record.ready:.2f}s'}，"
+                    f"峰值内存 {peak_rss / 1024 / 1024:.0f} MB"
+                )
+            except Exception:  # noqa: BLE001
+                logger.exception(f"测量 {app} 启动失败")
+
+        thread = threading.Thread(target=run, name=f"launch-telemetry-{pid}", daemon=True)
+        thread.start()
+        return thread
+
+    # ---- 汇总 ----
+
+    def summarize(self, app: str) -> list[VersionSummary]:
+        """按版本汇总，版本按首次出现的时间排序"""
+        groups: dict[str, list[LaunchRecord]] = {}
+        for record in self.records(app):
+            groups.setdefault(record.version, []).append(record)
+
+        summaries = []
+        for version, records in groups.items():
+            ready = sorted(r.ready for r in records if r.ready is not None)
+            summaries.append(VersionSummary(
+                version,
+                len(records),
+                min(r.timestamp for r in records),
+                statistics.median(r.spawn for r in records),
+                statistics.median(ready) if ready else None,
+                _percentile(ready, 0.9) if ready else None,
+                int(statistics.median(r.peak_rss for r in records)),
+            ))
+        summaries.sort(key=lambda s: s.first_seen)
+        return summaries
+
+    def compare_latest(self, app: str) -> tuple[VersionSummary, VersionSummary, float] | None:
+        """最新版本与上一版本的可用耗时中位数之比，启动次数不足时返回 None
+
+        Returns:
+            (上一版本, 最新版本, 耗时倍数)
+        """
+        summaries = [
+            s for s in self.summarize(app)
+            if s.launches >= MIN_LAUNCHES and s.ready_median
+        ]
+        if len(summaries) < 2:
+            return None
+        previous, latest = summaries[-2], summaries[-1]
+        return previous, latest, latest.ready_median / previous.ready_median
+
+    def _check_regression(self, app: str) -> None:
+        compared = self.compare_latest(app)
+        if compared is not None and compared[2] >= REGRESSION_RATIO:
+            previous, latest, ratio = compared
+            logger.warning(
+                f"{app} {latest.version} 启动耗时 {latest.ready_median:.2f}s，"
+                f"是 {previous.version} 的 {ratio:.1f} 倍（{previous.ready_median:.2f}s）"
+            )
+
+    def format_summary(self, app: str) -> str:
+        lines = []
+        for s in self.summarize(app):
+            ready = "未知" if s.ready_median is None else f"{s.ready_median:.2f}s (P90 {s.ready_p90:.2f}s)"
+            lines.append(
+                f"{s.version or '未知版本'}: {s.launches} 次，可用 {ready}，"
+                f"创建进程 {s.spawn_median * 1000:.0f}ms，峰值内存 {s.peak_rss_median / 1024 / 1024:.0f} MB"
+            )
+        return "\n".join(lines)
+
+
+launch_telemetry = LaunchTelemetry()
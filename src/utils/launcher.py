@@ -0,0 +1,411 @@
+import asyncio
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+from loguru import logger
+
+from src.config import LOGS_DIR
+
+APP_LOGS_DIR = LOGS_DIR / "apps"
+
+# 每个应用日志文件的大小上限，超过后轮转为 .1 备份
+DEFAULT_LOG_MAX_BYTES = 2 * 1024 * 1024
+# 内存中为每个输出流保留的最近行数
+DEFAULT_TAIL_LINES = 200
+# cancel() 后等待进程自行退出的时间（秒），超时则强制结束
+TERMINATE_GRACE = 3.0
+# 进程退出后等待输出读取完毕的时间（秒）
+READER_JOIN_TIMEOUT = 1.0
+# 独立运行的程序检查日志大小的间隔（秒）
+DETACHED_LOG_CHECK_INTERVAL = 5.0
+
+
+class LaunchState(str, Enum):
+    """启动句柄状态"""
+
+    RUNNING = "running"
+    FINISHED = "finished"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+
+@dataclass(slots=True, frozen=True)
+class LaunchResult:
+    """进程结束后的结果"""
+
+    state: LaunchState
+    returncode: int | None
+    stdout_tail: str
+    stderr_tail: str
+    elapsed: float
+
+    @property
+    def success(self) -> bool:
+        return self.state is LaunchState.FINISHED and self.returncode == 0
+
+
+OutputListener = Callable[[str, str], None]  # (流名称 "stdout"/"stderr", 行内容)
+DoneCallback = Callable[[LaunchResult], None]
+
+
+class BoundedLog:
+    """大小受限的日志文件，超过上限时轮转为一个 .1 备份"""
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_LOG_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("ab")
+        self._size = self._file.tell()
+
+    def write(self, stream: str, line: str) -> None:
+        data = f"[{stream}] {line}\n".encode("utf-8", errors="replace")
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        os.replace(self.path, self.path.with_suffix(self.path.suffix + ".1"))
+        self._file = self.path.open("wb")
+        self._size = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class LaunchHandle:
+    """已启动进程的句柄。
+
+    构造后立即返回，输出由后台线程逐行读取并分发给订阅者和日志文件，
+    结束时通过回调通知。回调在后台线程中执行，Qt 中请配合信号使用
+    （见 src.ui.launch_signals），asyncio 中可直接 await wait_async()。
+    """
+
+    def __init__(
+            self,
+            process: subprocess.Popen,
+            *,
+            log: BoundedLog | None = None,
+            timeout: float | None = None,
+            tail_lines: int = DEFAULT_TAIL_LINES,
+    ):
+        self.process = process
+        self.pid = process.pid
+        self.started_at = time.monotonic()
+        self._log = log
+        # 可重入：补发输出时允许回调中再次访问句柄
+        self._lock = threading.RLock()
+        self._listeners: list[OutputListener] = []
+        self._done_callbacks: list[DoneCallback] = []
+        self._tails = {"stdout": deque(maxlen=tail_lines), "stderr": deque(maxlen=tail_lines)}
+        self._state = LaunchState.RUNNING
+        self._result: LaunchResult | None = None
+        self._finished = threading.Event()
+
+        self._readers = [
+            threading.Thread(target=self._pump, args=(name, pipe), name=f"launch-{self.pid}-{name}", daemon=True)
+            for name, pipe in (("stdout", process.stdout), ("stderr", process.stderr))
+            if pipe is not None
+        ]
+        for reader in self._readers:
+            reader.start()
+
+        self._timer: threading.Timer | None = None
+        if timeout is not None:
+            self._timer = threading.Timer(timeout, self._on_timeout)
+            self._timer.daemon = True
+            self._timer.start()
+
+        threading.Thread(target=self._wait, name=f"launch-{self.pid}-wait", daemon=True).start()
+
+    # ---- 订阅 ----
+
+    def subscribe(self, listener: OutputListener, replay: bool = True) -> None:
+        """订阅逐行输出。
+
+        进程在订阅前可能已经输出了内容，replay 为 True 时先补发内存中保留的最近输出
+        （两个流分别按顺序补发）
+        """
+        with self._lock:
+            if replay:
+                for name, lines in self._tails.items():
+                    for line in lines:
+                        listener(name, line)
+            self._listeners.append(listener)
+
+    def add_done_callback(self, callback: DoneCallback) -> None:
+        """进程结束时回调；若已结束则立即回调"""
+        with self._lock:
+            if self._result is None:
+                self._done_callbacks.append(callback)
+                return
+        callback(self._result)
+
+    # ---- 状态 ----
+
+    @property
+    def running(self) -> bool:
+        return not self._finished.is_set()
+
+    @property
+    def result(self) -> LaunchResult | None:
+        return self._result
+
+    def tail(self, stream: str = "stdout") -> str:
+        with self._lock:
+            return "\n".join(self._tails[stream])
+
+    # ---- 控制 ----
+
+    def cancel(self) -> None:
+        """请求结束进程，不阻塞调用线程"""
+        self._stop(LaunchState.CANCELLED)
+
+    def _on_timeout(self) -> None:
+        logger.warning(f"进程 {self.pid} 执行超时")
+        self._stop(LaunchState.TIMED_OUT)
+
+    def _stop(self, state: LaunchState) -> None:
+        with self._lock:
+            if self._finished.is_set() or self._state is not LaunchState.RUNNING:
+                return
+            self._state = state
+        try:
+            self._signal(terminate=True)
+        except OSError:
+            return
+        threading.Thread(target=self._kill_after_grace, name=f"launch-{self.pid}-kill", daemon=True).start()
+
+    def _signal(self, terminate: bool) -> None:
+        # POSIX 下子进程位于独立的进程组中，连同其派生的子进程一起结束
+        if os.name != "nt" and self.process.poll() is None:
+            os.killpg(self.process.pid, signal.SIGTERM if terminate else signal.SIGKILL)
+        elif terminate:
+            self.process.terminate()
+        else:
+            self.process.kill()
+
+    def _kill_after_grace(self) -> None:
+        if not self._finished.wait(TERMINATE_GRACE):
+            try:
+                self._signal(terminate=False)
+            except OSError:
+                pass
+
+    def wait(self, timeout: float | None = None) -> LaunchResult | None:
+        """阻塞等待进程结束，超时返回 None（不会结束进程）"""
+        if not self._finished.wait(timeout):
+            return None
+        return self._result
+
+    async def wait_async(self) -> LaunchResult:
+        """在 asyncio 中等待进程结束"""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[LaunchResult] = loop.create_future()
+
+        def resolve(result: LaunchResult) -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(result))
+
+        self.add_done_callback(resolve)
+        return await future
+
+    # ---- 后台线程 ----
+
+    def _pump(self, name: str, pipe) -> None:
+        with pipe:
+            for raw in iter(pipe.readline, b""):
+                line = raw.decode(errors="replace").rstrip("\r\n")
+                with self._lock:
+                    self._tails[name].append(line)
+                    listeners = list(self._listeners)
+                if self._log is not None:
+                    self._log.write(name, line)
+                for listener in listeners:
+                    try:
+                        listener(name, line)
+                    except Exception:  # noqa: BLE001
+                        logger.exception("输出回调出错")
+
+    def _wait(self) -> None:
+        returncode = self.process.wait()
+        # 孙进程可能继承了管道而迟迟不关闭，不无限等待读取线程
+        for reader in self._readers:
+            reader.join(READER_JOIN_TIMEOUT)
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._log is not None:
+            self._log.close()
+
+        with self._lock:
+            state = LaunchState.FINISHED if self._state is LaunchState.RUNNING else self._state
+            self._state = state
+            self._result = LaunchResult(
+                state,
+                returncode,
+                "\n".join(self._tails["stdout"]),
+                "\n".join(self._tails["stderr"]),
+                time.monotonic() - self.started_at,
+            )
+            callbacks, self._done_callbacks = self._done_callbacks, []
+        self._finished.set()
+
+        logger.info(f"进程 {self.pid} 已结束，状态: {state.value}，返回码: {returncode}")
+        for callback in callbacks:
+            try:
+                callback(self._result)
+            except Exception:  # noqa: BLE001
+                logger.exception("结束回调出错")
+
+
+def _open_append(path: Path) -> int:
+    """以内核级追加方式打开日志文件，返回文件描述符。
+
+    子进程的每次写入都落在文件末尾，文件被截断后不会在原来的偏移处继续写出空洞。
+    Windows 上 O_APPEND 只由本进程的 C 运行库模拟，需要只带 FILE_APPEND_DATA 权限的句柄
+    """
+    if os.name != "nt":
+        return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.CreateFileW.argtypes = (
+        wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+        wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE,
+    )
+    file_append_data, synchronize = 0x0004, 0x00100000
+    share_all, open_always, attribute_normal = 0x7, 4, 0x80
+    handle = kernel32.CreateFileW(
+        str(path), file_append_data | synchronize, share_all, None, open_always, attribute_normal, None
+    )
+    if handle is None or handle == wintypes.HANDLE(-1).value:
+        raise ctypes.WinError(ctypes.get_last_error())
+    return msvcrt.open_osfhandle(handle, os.O_WRONLY | os.O_APPEND)
+
+
+def _limit_detached_log(process: subprocess.Popen, path: Path, max_bytes: int) -> None:
+    """本程序运行期间限制独立运行的程序的日志大小，超过上限时复制为 .1 备份后截断。
+
+    子进程直接写文件，不能像 BoundedLog 那样换新文件，只能原地截断（复制与截断之间写入的少量内容会丢失）；
+    本程序退出后由下次启动该程序时轮转
+    """
+    backup = path.with_suffix(path.suffix + ".1")
+    while True:
+        try:
+            process.wait(DETACHED_LOG_CHECK_INTERVAL)
+            return
+        except subprocess.TimeoutExpired:
+            pass
+        try:
+            if path.stat().st_size <= max_bytes:
+                continue
+            with path.open("r+b") as f:
+                with backup.open("wb") as out:
+                    while chunk := f.read(1024 * 1024):
+                        out.write(chunk)
+                f.truncate(0)
+        except OSError as e:
+            logger.debug(f"限制日志 {path} 大小失败: {e}")
+
+
+def _detached_kwargs() -> dict:
+    """让子进程脱离本程序独立运行所需的 Popen 参数"""
+    if os.name == "nt":
+        return {
+            "creationflags": (
+                    subprocess.CREATE_NEW_PROCESS_GROUP
+                    | subprocess.DETACHED_PROCESS
+                    | subprocess.CREATE_BREAKAWAY_FROM_JOB
+            )
+        }
+    return {"start_new_session": True}
+
+
+def launch(
+        path,
+        args: Sequence[str] = (),
+        *,
+        detached: bool = False,
+        timeout: float | None = None,
+        log_path: Path | None = None,
+        log_max_bytes: int = DEFAULT_LOG_MAX_BYTES,
+) -> LaunchHandle:
+    """启动程序并立即返回句柄。
+
+    直接创建进程，不经过 shell。
+
+    Parameters:
+        path: str | Path  # 可执行文件路径，工作目录为其所在文件夹
+        args: Sequence[str] = ()  # 命令行参数
+        detached: bool = False  # 独立运行，本程序退出后不受影响；输出直接写入日志文件，不逐行分发
+        timeout: float | None = None  # 超时（秒）后自动结束进程
+        log_path: Path | None = None  # 日志文件，默认 logs/apps/<程序名>.log
+        log_max_bytes: int  # 日志文件大小上限
+
+    Returns:
+        LaunchHandle
+
+    Raises:
+        OSError: 创建进程失败（文件不存在、无权限等）
+    """
+    file = Path(path)
+    log_path = log_path or APP_LOGS_DIR / f"{file.stem}.log"
+    command = [str(file), *args]
+
+    if detached:
+        # 子进程可能比本程序活得更久，因此直接把输出交给它自己写入文件；
+        # 每次启动时把上一次的日志保留为 .1，运行期间超过 log_max_bytes 时截断
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        if log_path.exists():
+            os.replace(log_path, log_path.with_suffix(log_path.suffix + ".1"))
+        out = _open_append(log_path)
+        try:
+            process = subprocess.Popen(
+                command,
+                cwd=str(file.parent),
+                stdin=subprocess.DEVNULL,
+                stdout=out,
+                stderr=subprocess.STDOUT,
+                **_detached_kwargs(),
+            )
+        finally:
+            os.close(out)
+        handle = LaunchHandle(process, timeout=timeout)
+        threading.Thread(
+            target=_limit_detached_log,
+            args=(process, log_path, log_max_bytes),
+            name=f"launch-{process.pid}-log",
+            daemon=True,
+        ).start()
+    else:
+        process = subprocess.Popen(
+            command,
+            cwd=str(file.parent),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=os.name != "nt",
+        )
+        handle = LaunchHandle(process, log=BoundedLog(log_path, log_max_bytes), timeout=timeout)
+
+    logger.info(f"程序已启动: {file}, PID: {process.pid}")
+    return handle
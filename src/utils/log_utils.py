@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+from loguru import logger
+
+LOG_FORMAT = "<g>{time:HH:mm:ss}</g> [<lvl>{level:<7}</lvl>] <c><u>{name}</u></c>:<c>{function}:{line}</c> | {message}"
+
+# 日志文件按天或按大小轮转，旧文件压缩保存，超过保留期自动删除
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_RETENTION_DAYS = 14
+LOG_COMPRESSION = "zip"
+
+# 节流状态: key -> [上次输出时间, 被省略的条数]
+_throttle_state: dict[str, list] = {}
+# 采样状态: key -> 计数
+_sample_counts: dict[str, int] = {}
+_lock = threading.Lock()
+
+
+def log_throttled(key: str, level: str, message: str, interval: float = 10.0) -> bool:
+    """按 key 限频输出日志。
+
+    同一 key 在 interval 秒内只输出一次，期间被省略的条数附加在下一次输出中。
+    被省略时不会进入任何 sink，适合在轮询等热点路径中使用
+
+    Returns:
+        bool: 本次是否输出
+    """
+    now = time.monotonic()
+    with _lock:
+        state = _throttle_state.get(key)
+        if state is not None and now - state[0] < interval:
+            state[1] += 1
+            return False
+        suppressed = state[1] if state else 0
+        _throttle_state[key] = [now, 0]
+
+    if suppressed:
+        message = f"{message} (已省略 {suppressed} 条相同来源的日志)"
+    logger.opt(depth=1).log(level, message)
+    return True
+
+
+def log_sampled(key: str, level: str, message: str, every: int = 100) -> bool:
+    """按 key 采样输出日志，每 every 次调用只输出第一次"""
+    with _lock:
+        count = _sample_counts.get(key, 0)
+        _sample_counts[key] = count + 1
+    if count % every:
+        return False
+    logger.opt(depth=1).log(level, f"{message} (采样 1/{every})" if every > 1 else message)
+    return True
+
+
+def json_formatter(record) -> str:
+    """紧凑的 JSON Lines 格式，每条日志一行。
+
+    比 loguru 的 serialize=True 少了大量重复字段，适合机器读取
+    """
+    entry = {
+        "t": record["time"].isoformat(timespec="milliseconds"),
+        "lvl": record["level"].name,
+        "src": f"{record['name']}:{record['function']}:{record['line']}",
+        "msg": record["message"],
+    }
+    extra = {k: v for k, v in record["extra"].items() if k != "_json"}
+    if extra:
+        entry["extra"] = extra
+    if record["exception"] is not None:
+        exc_type, exc_value, _ = record["exception"]
+        entry["exc"] = f"{exc_type.__name__ if exc_type else ''}: {exc_value}"
+    record["extra"]["_json"] = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str)
+    return "{extra[_json]}\n"
+
+
+class DailySizeRotation:
+    """按日期或文件大小轮转（满足任一条件即轮转），供 loguru 的 rotation 参数使用"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._day = datetime.now().date()
+
+    def __call__(self, message, file) -> bool:
+        day = message.record["time"].date()
+        if day != self._day:
+            self._day = day
+            return True
+        file.seek(0, 2)
+        return file.tell() + len(message) > self.max_bytes
+
+
+def _cleanup_legacy_logs() -> None:
+    """清理旧版本按启动次数生成的 logs/<日期>/ 目录（超过保留期的部分）"""
+    from src.config import LOGS_DIR
+
+    cutoff = datetime.now().date() - timedelta(days=LOG_RETENTION_DAYS)
+    for folder in LOGS_DIR.glob("????-??-??"):
+        try:
+            if folder.is_dir() and datetime.strptime(folder.name, "%Y-%m-%d").date() < cutoff:
+                shutil.rmtree(folder, ignore_errors=True)
+        except ValueError:
+            continue
+
+
+def setup_logger(json_logs: bool = False, name: str = "swarmToolbox", level: str = "DEBUG") -> None:
+    """配置日志。
+
+    所有 sink 都通过队列（enqueue）在后台线程写入，调用 logger 的线程（通常是界面线程）
+    不会被文件 I/O 阻塞。设置环境变量 SWARM_LOG_JSON=1 或传入 json_logs=True
+    可额外输出紧凑的 JSON Lines 日志。name 为日志文件名前缀，level 为控制台输出的级别
+    """
+    from src.config import LOGS_DIR
+
+    logger.remove()
+
+    # pyinstaller 打包并禁用控制台后, sys.stdout 为 None
+    if sys.stdout:
+        logger.add(
+            sys.stdout,
+            format=LOG_FORMAT,
+            level=level,
+            colorize=True,
+            enqueue=True,
+        )
+
+    logger.add(
+        LOGS_DIR / f"{name}_{{time:YYYY-MM-DD}}.log",
+        format=LOG_FORMAT,
+        level="DEBUG",
+        diagnose=True,
+        enqueue=True,
+        rotation=DailySizeRotation(LOG_MAX_BYTES),
+        retention=f"{LOG_RETENTION_DAYS} days",
+        compression=LOG_COMPRESSION,
+        encoding="utf-8",
+    )
+
+    if json_logs or os.environ.get("SWARM_LOG_JSON") == "1":
+        logger.add(
+            LOGS_DIR / f"{name}_{{time:YYYY-MM-DD}}.jsonl",
+            format=json_formatter,
+            level="DEBUG",
+            enqueue=True,
+            rotation=DailySizeRotation(LOG_MAX_BYTES),
+            retention=f"{LOG_RETENTION_DAYS} days",
+            compression=LOG_COMPRESSION,
+            encoding="utf-8",
+        )
+
+    _cleanup_legacy_logs()
@@ -0,0 +1,510 @@
+import functools
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+from loguru import logger
+
+from src.utils.atomic_io import atomic_write_bytes
+
+# 耗时直方图的默认桶上界（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 写出 Prometheus 文本文件的默认间隔（秒）
+TEXTFILE_INTERVAL = 15.0
+
+
+@dataclass(slots=True, frozen=True)
+class Sample:
+    """某个指标（一组标签）在读取时的值"""
+
+    name: str
+    kind: str  # "counter" / "gauge" / "histogram"
+    labels: tuple[tuple[str, str], ...]
+    value: float  # 直方图为观测值之和
+    count: int = 0  # 直方图的观测次数
+    bounds: tuple[float, ...] = ()  # 直方图的桶上界（不含 +Inf）
+    buckets: tuple[int, ...] = ()  # 直方图各桶的累计次数，最后一项为 +Inf
+
+    @property
+    def average(self) -> float | None:
+        return self.value / self.count if self.count else None
+
+    def quantile(self, q: float) -> float | None:
+        """按桶线性插值估算分位数，落在 +Inf 桶时返回最大的有限上界"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        previous_bound, previous_count = 0.0, 0
+        for bound, cumulative in zip(self.bounds, self.buckets):
+            if cumulative >= rank:
+                in_bucket = cumulative - previous_count
+                fraction = (rank - previous_count) / in_bucket if in_bucket else 0.0
+                return previous_bound + (bound - previous_bound) * fraction
+            previous_bound, previous_count = bound, cumulative
+        return self.bounds[-1] if self.bounds else None
+
+
+class _CounterValue:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        with self._lock:
+            self.value += amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self.value = 0.0
+
+
+class _GaugeValue:
+    __slots__ = ("_lock", "function", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+        self.function: Callable[[], float] | None = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """改为读取时调用 function 取值，平时没有任何开销"""
+        self.function = function
+
+    def reset(self) -> None:
+        # 读取时计算的值不受影响
+        with self._lock:
+            self.value = 0.0
+
+    def read(self) -> float:
+        if self.function is None:
+            return self.value
+        try:
+            return float(self.function())
+        except Exception as e:  # noqa: BLE001
+            logger.debug(f"读取指标失败: {e}")
+            return math.nan
+
+
+class _HistogramValue:
+    __slots__ = ("_lock", "bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.bounds = bounds
+        # 每个桶的次数（非累计），最后一项为 +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> "_Timer":
+        """计时上下文管理器：with histogram.time(): ..."""
+        return _Timer(self.observe)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.sum = 0.0
+
+    def read(self) -> tuple[float, int, tuple[int, ...]]:
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return total, running, tuple(cumulative)
+
+
+class _Timer:
+    __slots__ = ("_observe", "_start")
+
+    def __init__(self, observe: Callable[[float], None]):
+        self._observe = observe
+        self._start = 0.0
+
+    def __enter__(self) -> Self:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._observe(time.perf_counter() - self._start)
+
+
+class Metric(ABC):
+    """指标族：同名、标签取值不同的一组时间序列。
+
+    记录时只修改内存中的数值（一次加锁），不格式化、不分配对象，
+    只有界面或导出读取时才汇总，没有读取者时几乎没有开销
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_child(self):
+        """创建一组标签取值对应的时间序列"""
+
+    def labels(self, *values):
+        """返回指定标签取值的时间序列，按 labelnames 的顺序传入"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"指标 {self.name} 需要标签 {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"指标 {self.name} 有标签，需先调用 labels()")
+        return self.labels()
+
+    def _items(self) -> list[tuple[tuple[tuple[str, str], ...], object]]:
+        with self._lock:
+            children = list(self._children.items())
+        return [(tuple(zip(self.labelnames, key)), child) for key, child in children]
+
+    @abstractmethod
+    def samples(self) -> list[Sample]:
+        """读取所有时间序列的当前值"""
+
+    def reset(self) -> None:
+        """所有时间序列原地清零"""
+        for _, child in self._items():
+            child.reset()
+
+
+class Counter(Metric):
+    """只增不减的计数"""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def samples(self) -> list[Sample]:
+        return [Sample(self.name, self.kind, labels, child.value) for labels, child in self._items()]
+
+
+class Gauge(Metric):
+    """可增可减的当前值，或在读取时计算的值（set_function）"""
+
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeValue:
+        return _GaugeValue()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default().set_function(function)
+
+    def samples(self) -> list[Sample]:
+        return [Sample(self.name, self.kind, labels, child.read()) for labels, child in self._items()]
+
+
+class Histogram(Metric):
+    """固定桶的直方图，记录观测次数、总和与各桶次数"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        if not self.buckets:
+            raise ValueError("直方图至少需要一个有限的桶")
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self) -> _Timer:
+        return self._default().time()
+
+    def samples(self) -> list[Sample]:
+        result = []
+        for labels, child in self._items():
+            total, count, cumulative = child.read()
+            result.append(Sample(self.name, self.kind, labels, total, count, self.buckets, cumulative))
+        return result
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in labels]
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    """进程内的指标注册表。
+
+    同名指标只创建一次，重复注册返回已有的指标（类型或标签不同时报错），
+    模块可以在导入时直接声明自己的指标
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+            raise ValueError(f"指标 {metric.name} 已以不同的类型或标签注册")
+        return existing
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def metrics(self) -> list[Metric]:
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda m: m.name)
+
+    def collect(self) -> list[Sample]:
+        """读取所有指标的当前值"""
+        return [sample for metric in self.metrics() for sample in metric.samples()]
+
+    def reset(self) -> None:
+        """把所有已记录的数值清零。
+
+        时间序列本身保留并原地清零：instrument() 等在声明时取得的序列对象之后仍然有效
+        """
+        for metric in self.metrics():
+            metric.reset()
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式（0.0.4）"""
+        lines = []
+        for metric in self.metrics():
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample in samples:
+                if sample.kind != "histogram":
+                    lines.append(f"{sample.name}{_format_labels(sample.labels)} {_format_value(sample.value)}")
+                    continue
+                bounds = [_format_value(b) for b in sample.bounds] + ["+Inf"]
+                for bound, count in zip(bounds, sample.buckets):
+                    labels = _format_labels((*sample.labels, ("le", bound)))
+                    lines.append(f"{sample.name}_bucket{labels} {count}")
+                labels = _format_labels(sample.labels)
+                lines.append(f"{sample.name}_sum{labels} {_format_value(sample.value)}")
+                lines.append(f"{sample.name}_count{labels} {sample.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """原子写出 Prometheus 文本文件，供 node exporter 的 textfile collector 读取"""
+        atomic_write_bytes(path, self.to_prometheus().encode("utf-8"))
+        if os.name != "nt":
+            # 临时文件创建时只有本用户可读，node exporter 通常以其他用户运行
+            os.chmod(path, 0o644)
+
+
+metrics = MetricsRegistry()
+
+
+def _is_failure(result) -> bool:
+    return result is False or (isinstance(result, tuple) and len(result) > 0 and result[0] is False)
+
+
+def instrument(duration: Histogram, failures: Counter | None = None):
+    """装饰器：以函数名为标签记录耗时。
+
+    duration / failures 需要且只需要一个标签（函数名）。抛出异常，或返回 False / (False, ...)
+    时计为失败；返回值中的 False 表示“否”而不是失败的函数（如 check_exe_running）不要传 failures
+    """
+
+    def decorator(fn):
+        observe = duration.labels(fn.__name__).observe
+        fail = failures.labels(fn.__name__).inc if failures is not None else None
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = _is_failure(result)
+                return result
+            finally:
+                observe(time.perf_counter() - start)
+                if failed and fail is not None:
+                    fail()
+
+        return wrapper
+
+    return decorator
+
+
+# ---- 进程自身 ----
+
+def _process():
+    import psutil
+
+    return psutil.Process()
+
+
+metrics.gauge("swarm_process_resident_bytes", "本进程的常驻内存（RSS）").set_function(
+    lambda: _process().memory_info().rss
+)
+metrics.gauge("swarm_process_threads", "本进程的线程数").set_function(threading.active_count)
+metrics.gauge("swarm_process_start_time_seconds", "本进程的启动时间（Unix 时间戳）").set_function(
+    lambda: _process().create_time()
+)
+
+
+# ---- 导出到文件 ----
+
+class TextfileExporter:
+    """按固定间隔把注册表写成 Prometheus 文本文件。
+
+    路径或间隔变化时唤醒正在运行的线程立即按新配置写出，不重新启动线程
+    """
+
+    def __init__(self, registry: MetricsRegistry = metrics):
+        self.registry = registry
+        self.path: Path | None = None
+        self.interval = TEXTFILE_INTERVAL
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+
+    def start(self, path: Path, interval: float = TEXTFILE_INTERVAL) -> None:
+        """开始写出；已在运行时改用新的路径与间隔"""
+        self.path = path
+        self.interval = interval
+        if self._thread and self._thread.is_alive():
+            self._wake.set()
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-textfile", daemon=True)
+        self._thread.start()
+
+    def pause(self) -> None:
+        """暂停写出，线程保留并一直等待到下次 start()"""
+        self.path = None
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def write(self) -> bool:
+        if self.path is None:
+            return False
+        try:
+            self.registry.write_textfile(self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"写出指标文件失败: {e}")
+            return False
+
+    def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            if self._stop_event.is_set():
+                break
+            self.write()
+            # 暂停时不定时醒来
+            self._wake.wait(self.interval if self.path is not None else None)
+        # 退出前写出最后一次的数值
+        self.write()
+
+
+textfile_exporter = TextfileExporter()
+_watching = False
+
+
+def watch_textfile_config() -> None:
+    """按配置（Metrics 组）启停 Prometheus 文本文件导出，并跟随配置变化"""
+    global _watching
+    from src.config import load_config
+
+    cfg = load_config()
+
+    def update(_=None):
+        # 在界面线程中调用，只通知写出线程，不等待它
+        path = cfg.metrics_textfile.value
+        if path:
+            textfile_exporter.start(Path(path), cfg.metrics_textfile_interval.value)
+            logger.info(f"指标写出到 {path}")
+        else:
+            textfile_exporter.pause()
+
+    update()
+    if not _watching:
+        _watching = True
+        cfg.subscribe(cfg.metrics_textfile, update)
+        cfg.subscribe(cfg.metrics_textfile_interval, update)
@@ -0,0 +1,175 @@
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from loguru import logger
+
+from src.config import DATA_DIR
+from src.utils.atomic_io import atomic_write_json, read_json
+
+VERSION_CACHE_PATH = DATA_DIR / "version_cache.json"
+
+RT_VERSION = 16
+_RESOURCE_DIRECTORY_INDEX = 2
+_FIXED_FILE_INFO_SIGNATURE = b"\xbd\x04\xef\xfe"  # 0xFEEF04BD, 小端
+
+
+class PEFormatError(ValueError):
+    """文件不是有效的 PE 文件"""
+
+
+class NoVersionResource(PEFormatError):
+    """是 PE 文件，但不包含版本资源"""
+
+
+def _rva_to_offset(sections: list[tuple[int, int, int, int]], rva: int) -> int:
+    for virtual_address, virtual_size, raw_size, raw_pointer in sections:
+        if virtual_address <= rva < virtual_address + max(virtual_size, raw_size):
+            return rva - virtual_address + raw_pointer
+    raise PEFormatError(f"RVA 0x{rva:x} 不在任何节中")
+
+
+def _find_version_entry(view: mmap.mmap, res_offset: int) -> int:
+    """在资源目录树中查找 RT_VERSION 的第一个数据项，返回 IMAGE_RESOURCE_DATA_ENTRY 的文件偏移"""
+
+    def entries(dir_offset: int) -> list[tuple[int, int]]:
+        named, ids = struct.unpack_from("<HH", view, dir_offset + 12)
+        return [
+            struct.unpack_from("<II", view, dir_offset + 16 + i * 8)
+            for i in range(named + ids)
+        ]
+
+    # 第一层: 资源类型
+    for name, offset in entries(res_offset):
+        if name == RT_VERSION and offset & 0x80000000:
+            node = res_offset + (offset & 0x7FFFFFFF)
+            break
+    else:
+        raise NoVersionResource("没有版本资源")
+
+    # 第二层（资源名）与第三层（语言）都取第一项
+    for _ in range(2):
+        children = entries(node)
+        if not children:
+            raise NoVersionResource("版本资源为空")
+        offset = children[0][1]
+        if not offset & 0x80000000:
+            return res_offset + offset
+        node = res_offset + (offset & 0x7FFFFFFF)
+    raise PEFormatError("版本资源目录层级异常")
+
+
+def read_pe_version(path) -> str:
+    """从 PE 文件的 VS_VERSIONINFO 资源中读取文件版本号。
+
+    纯 Python 实现，通过 mmap 只访问文件头、节表和版本资源所在的页，
+    不依赖 win32api，在 Linux 上同样可用，也不会运行目标程序。
+
+    Parameters:
+        path: str | Path
+
+    Returns:
+        str: 形如 "1.2.3.4" 的版本号
+
+    Raises:
+        NoVersionResource: 是 PE 文件但没有版本资源
+        PEFormatError: 不是 PE 文件
+        OSError: 文件无法读取
+    """
+    with open(path, "rb") as f:
+        try:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # 空文件
+            raise PEFormatError("文件为空") from e
+
+    with view:
+        try:
+            if view[:2] != b"MZ":
+                raise PEFormatError("缺少 MZ 头")
+            pe_offset = struct.unpack_from("<I", view, 0x3C)[0]
+            if view[pe_offset:pe_offset + 4] != b"PE\0\0":
+                raise PEFormatError("缺少 PE 签名")
+
+            coff = pe_offset + 4
+            section_count = struct.unpack_from("<H", view, coff + 2)[0]
+            optional_size = struct.unpack_from("<H", view, coff + 16)[0]
+            optional = coff + 20
+
+            magic = struct.unpack_from("<H", view, optional)[0]
+            if magic == 0x10B:  # PE32
+                dir_count_offset, dir_offset = 92, 96
+            elif magic == 0x20B:  # PE32+
+                dir_count_offset, dir_offset = 108, 112
+            else:
+                raise PEFormatError(f"未知的可选头类型: 0x{magic:x}")
+
+            dir_count = struct.unpack_from("<I", view, optional + dir_count_offset)[0]
+            if dir_count <= _RESOURCE_DIRECTORY_INDEX:
+                raise NoVersionResource("没有资源目录")
+            res_rva, res_size = struct.unpack_from(
+                "<II", view, optional + dir_offset + _RESOURCE_DIRECTORY_INDEX * 8
+            )
+            if not res_rva or not res_size:
+                raise NoVersionResource("没有资源目录")
+
+            section_table = optional + optional_size
+            sections = []
+            for i in range(section_count):
+                virtual_size, virtual_address, raw_size, raw_pointer = struct.unpack_from(
+                    "<IIII", view, section_table + i * 40 + 8
+                )
+                sections.append((virtual_address, virtual_size, raw_size, raw_pointer))
+
+            res_offset = _rva_to_offset(sections, res_rva)
+            entry = _find_version_entry(view, res_offset)
+            data_rva, data_size = struct.unpack_from("<II", view, entry)
+            data = _rva_to_offset(sections, data_rva)
+
+            # VS_FIXEDFILEINFO 紧跟在 "VS_VERSION_INFO" 键之后（4 字节对齐）
+            block = view[data:data + min(data_size, 256)]
+            index = block.find(_FIXED_FILE_INFO_SIGNATURE)
+            if index < 0:
+                raise NoVersionResource("缺少 VS_FIXEDFILEINFO")
+            ms, ls = struct.unpack_from("<II", block, index + 8)
+        except (struct.error, IndexError) as e:
+            raise PEFormatError(f"PE 结构损坏: {e}") from e
+
+    return f"{(ms >> 16) & 0xFFFF}.{ms & 0xFFFF}.{(ls >> 16) & 0xFFFF}.{ls & 0xFFFF}"
+
+
+class VersionCache:
+    """按 (路径, 大小, mtime) 缓存的版本信息。
+
+    文件未变化时一次 stat() 即可得到结果，缓存持久化在 data/version_cache.json
+    """
+
+    def __init__(self, path: Path = VERSION_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, list] | None = None
+
+    def _ensure_loaded(self) -> dict[str, list]:
+        if self._entries is None:
+            self._entries = read_json(self.path, {})
+        return self._entries
+
+    def get(self, file: Path, st: os.stat_result) -> str | None:
+        with self._lock:
+            entry = self._ensure_loaded().get(str(file))
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def put(self, file: Path, st: os.stat_result, version: str) -> None:
+        with self._lock:
+            entries = self._ensure_loaded()
+            entries[str(file)] = [st.st_size, st.st_mtime_ns, version]
+            try:
+                atomic_write_json(self.path, entries)
+            except OSError as e:
+                logger.warning(f"保存版本缓存失败: {e}")
+
+
+version_cache = VersionCache()
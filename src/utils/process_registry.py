@@ -0,0 +1,277 @@
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import PureWindowsPath
+
+import psutil
+from loguru import logger
+
+# 同一“tick”内的查询复用同一份快照，超过该时间（秒）才重新扫描进程表
+DEFAULT_MAX_AGE = 1.0
+
+
+class ProcessEventKind(str, Enum):
+    """进程事件类型"""
+
+    STARTED = "started"
+    EXITED = "exited"
+
+
+@dataclass(slots=True, frozen=True)
+class ProcessEvent:
+    """进程启动/退出事件"""
+
+    kind: ProcessEventKind
+    target: str  # 注册时使用的 exe 路径
+    pid: int
+
+
+ProcessListener = Callable[[ProcessEvent], None]
+
+
+def exe_stem(path: str) -> str:
+    """取 exe 路径的文件名（不含 .exe，小写），同时兼容 / 与 \\ 分隔符"""
+    name = PureWindowsPath(path).name.lower()
+    return name.removesuffix(".exe")
+
+
+@dataclass(slots=True)
+class _ProcInfo:
+    """缓存的进程身份信息，在进程生命周期内只读取一次"""
+
+    proc: psutil.Process
+    name: str
+    exe_name: str
+    cmd_names: tuple[str, ...]
+    targets: set[str] = field(default_factory=set)
+
+
+class ProcessRegistry:
+    """共享的进程注册表。
+
+    每个 tick 只遍历一次进程表，按 (PID, 创建时间) 缓存 psutil.Process，
+    新进程的名称/路径/命令行只读取一次，然后为所有注册的 exe 路径批量匹配。
+    进程启动或退出时向监听者发出事件，调用方无需自行轮询。
+    """
+
+    def __init__(self, max_age: float = DEFAULT_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        # target 路径 -> (exe 文件名, 额外进程名)
+        self._targets: dict[str, tuple[str, str]] = {}
+        self._cache: dict[tuple[int, float], _ProcInfo] = {}
+        self._running: dict[str, dict[int, psutil.Process]] = {}
+        self._listeners: list[ProcessListener] = []
+        self._last_refresh = 0.0
+
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    # ---- 目标管理 ----
+
+    def set_targets(self, paths: Iterable[str]) -> None:
+        """替换全部监视目标，空路径会被忽略"""
+        with self._lock:
+            self._targets = {}
+            self._running = {}
+            for info in self._cache.values():
+                info.targets.clear()
+            for path in paths:
+                self.add_target(path)
+
+    def add_target(self, path: str, name: str = "") -> None:
+        """添加一个监视目标，name 为可选的额外进程名"""
+        if not path:
+            return
+        with self._lock:
+            if self._targets.get(path) == (exe_stem(path), name.lower()):
+                return
+            self._targets[path] = (exe_stem(path), name.lower())
+            self._running.setdefault(path, {})
+            # 已缓存的进程需要重新匹配新目标
+            for info in self._cache.values():
+                if self._match(info, path):
+                    info.targets.add(path)
+                else:
+                    info.targets.discard(path)
+            self._last_refresh = 0.0
+
+    def remove_target(self, path: str) -> None:
+        with self._lock:
+            self._targets.pop(path, None)
+            self._running.pop(path, None)
+            for info in self._cache.values():
+                info.targets.discard(path)
+
+    # ---- 事件订阅 ----
+
+    def subscribe(self, listener: ProcessListener) -> Callable[[], None]:
+        """订阅进程启动/退出事件，返回取消订阅的函数"""
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe():
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+        return unsubscribe
+
+    # ---- 快照 ----
+
+    def _match(self, info: _ProcInfo, target: str) -> bool:
+        stem, extra = self._targets[target]
+        if stem and (stem in info.name or stem == info.exe_name or stem in info.cmd_names):
+            return True
+        return bool(extra) and extra in info.name
+
+    def _describe(self, proc: psutil.Process) -> _ProcInfo:
+        with proc.oneshot():
+            name = proc.name().lower()
+            try:
+                exe_name = exe_stem(proc.exe())
+            except (psutil.AccessDenied, psutil.ZombieProcess, OSError):
+                exe_name = ""
+            try:
+                # Wine 等场景下 exe 名出现在命令行前两项中
+                cmd_names = tuple(exe_stem(arg) for arg in proc.cmdline()[:2])
+            except (psutil.AccessDenied, psutil.ZombieProcess, OSError):
+                cmd_names = ()
+        info = _ProcInfo(proc, name, exe_name, cmd_names)
+        info.targets = {t for t in self._targets if self._match(info, t)}
+        return info
+
+    @staticmethod
+    def _is_zombie(proc: psutil.Process) -> bool:
+        # 只对匹配到的少量进程检查状态，已退出但未被回收的进程视为退出
+        try:
+            return proc.status() == psutil.STATUS_ZOMBIE
+        except psutil.NoSuchProcess:
+            return True
+        except psutil.AccessDenied:
+            return False
+
+    def refresh(self) -> dict[str, list[int]]:
+        """遍历一次进程表并更新所有目标的运行状态。
+
+        Returns:
+            dict[str, list[int]]: 目标路径 -> 正在运行的 PID 列表
+        """
+        events: list[ProcessEvent] = []
+        with self._lock:
+            seen: dict[tuple[int, float], _ProcInfo] = {}
+            for proc in psutil.process_iter():
+                try:
+                    key = (proc.pid, proc.create_time())
+                    info = self._cache.get(key)
+                    if info is None:
+                        info = self._describe(proc)
+                    seen[key] = info
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+            self._cache = seen
+
+            running: dict[str, dict[int, psutil.Process]] = {t: {} for t in self._targets}
+            for info in seen.values():
+                if not info.targets or self._is_zombie(info.proc):
+                    continue
+                for target in info.targets:
+                    if target in running:
+                        running[target][info.proc.pid] = info.proc
+
+            for target, procs in running.items():
+                before = self._running.get(target, {})
+                events.extend(
+                    ProcessEvent(ProcessEventKind.STARTED, target, pid) for pid in procs.keys() - before.keys()
+                )
+                events.extend(
+                    ProcessEvent(ProcessEventKind.EXITED, target, pid) for pid in before.keys() - procs.keys()
+                )
+
+            self._running = running
+            self._last_refresh = time.monotonic()
+            listeners = list(self._listeners)
+            result = {t: sorted(p) for t, p in running.items()}
+
+        # 在锁外回调，允许监听者再次查询注册表
+        for event in events:
+            logger.debug(f"进程{'启动' if event.kind is ProcessEventKind.STARTED else '退出'}: {event.target} (PID {event.pid})")
+            for listener in listeners:
+                try:
+                    listener(event)
+                except Exception:  # noqa: BLE001
+                    logger.exception("进程事件回调出错")
+
+        return result
+
+    def _ensure_fresh(self, path: str, name: str = "") -> None:
+        with self._lock:
+            if path not in self._targets or (name and self._targets[path][1] != name.lower()):
+                self.add_target(path, name)
+            stale = time.monotonic() - self._last_refresh > self.max_age
+        if stale:
+            self.refresh()
+
+    # ---- 查询 ----
+
+    def processes(self, path: str, name: str = "") -> list[psutil.Process]:
+        """获取目标对应的 psutil.Process 列表（按需刷新快照）"""
+        self._ensure_fresh(path, name)
+        with self._lock:
+            return list(self._running.get(path, {}).values())
+
+    def pids(self, path: str, name: str = "") -> list[int]:
+        return [proc.pid for proc in self.processes(path, name)]
+
+    def is_running(self, path: str, name: str = "") -> bool:
+        return bool(self.processes(path, name))
+
+    # ---- 后台轮询 ----
+
+    def start(self, interval: float = 2.0) -> None:
+        """启动后台线程，每 interval 秒刷新一次并发出事件"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="process-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception:  # noqa: BLE001
+                logger.exception("刷新进程注册表失败")
+            self._stop_event.wait(interval)
+
+
+process_registry = ProcessRegistry()
+
+
+_watching = False
+
+
+def watch_configured_apps() -> None:
+    """将配置中的 NSP / EvZ / Neurolings 路径注册为监视目标，并跟随配置变化更新"""
+    global _watching
+    from src.config import load_config
+
+    cfg = load_config()
+    items = (cfg.nsp_path, cfg.evz_path, cfg.neurolings_path)
+
+    def update(_=None):
+        process_registry.set_targets([item.value for item in items])
+
+    update()
+    if not _watching:
+        _watching = True
+        for item in items:
+            cfg.subscribe(item, update)
@@ -0,0 +1,39 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """线程安全的令牌桶限速器。
+
+    以 rate 个/秒的速度补充令牌，最多积攒 capacity 个（允许的突发量）。
+    等待发生在锁外，多个线程可以同时排队
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate 必须大于 0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """预占令牌，返回需要等待的秒数（令牌允许透支，由等待时间偿还）"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """获取令牌，必要时阻塞等待。
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
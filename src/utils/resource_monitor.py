@@ -0,0 +1,281 @@
+import math
+import threading
+import time
+import weakref
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import Enum
+
+import psutil
+from loguru import logger
+
+from src.config import cfg
+from src.utils.process_registry import ProcessRegistry, process_registry
+
+# 首次 cpu_percent() 打底后的等待时间（秒）
+CPU_PRIME_DELAY = 0.1
+
+# 已经调用过 cpu_percent() 的 Process 对象，进程对象由注册表缓存，因此打底只需一次
+_primed: "weakref.WeakSet[psutil.Process]" = weakref.WeakSet()
+
+
+def prime_cpu_percent(procs: Iterable[psutil.Process], delay: float = CPU_PRIME_DELAY) -> None:
+    """为尚未打底的进程调用一次 cpu_percent()。
+
+    psutil 的 cpu_percent() 首次调用总是返回 0，这里统一打底并只等待一次 delay
+    """
+    fresh = [proc for proc in procs if proc not in _primed]
+    if not fresh:
+        return
+    for proc in fresh:
+        try:
+            proc.cpu_percent(None)
+            _primed.add(proc)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    if delay > 0:
+        time.sleep(delay)
+
+
+class Metric(str, Enum):
+    """监控指标"""
+
+    RSS = "rss"  # 常驻内存（字节）
+    USS = "uss"  # 独占内存（字节），无权限时等于 RSS
+    CPU = "cpu"  # CPU 使用率（%），多进程求和
+    THREADS = "threads"
+    HANDLES = "handles"  # Windows 为句柄数，其他系统为文件描述符数
+
+
+class RingBuffer:
+    """基于 array 的定长环形缓冲区。
+
+    push 为 O(1)，并维护全量窗口的累加和，使整窗平均值为 O(1)；
+    其余按窗口的统计为 O(window)。
+    """
+
+    __slots__ = ("_data", "_size", "_start", "_sum", "capacity")
+
+    def __init__(self, capacity: int, typecode: str = "d"):
+        self.capacity = capacity
+        self._data = array(typecode, [0] * capacity)
+        self._start = 0
+        self._size = 0
+        self._sum = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, i: int) -> float:
+        """按时间顺序的第 i 个值（0 为最旧），不复制数据，可直接用于 bisect"""
+        if not 0 <= i < self._size:
+            raise IndexError(i)
+        return self._data[(self._start + i) % self.capacity]
+
+    def push(self, value: float) -> None:
+        if self._size < self.capacity:
+            self._data[(self._start + self._size) % self.capacity] = value
+            self._size += 1
+        else:
+            self._sum -= self._data[self._start]
+            self._data[self._start] = value
+            self._start = (self._start + 1) % self.capacity
+        self._sum += value
+
+    def last(self) -> float | None:
+        if not self._size:
+            return None
+        return self._data[(self._start + self._size - 1) % self.capacity]
+
+    def mean(self) -> float | None:
+        """整个缓冲区的平均值，O(1)"""
+        return self._sum / self._size if self._size else None
+
+    def tail(self, n: int | None = None) -> list[float]:
+        """按时间顺序返回最近 n 个值"""
+        n = self._size if n is None else max(0, min(n, self._size))
+        first = (self._start + self._size - n) % self.capacity
+        end = first + n
+        if end <= self.capacity:
+            return self._data[first:end].tolist()
+        return self._data[first:].tolist() + self._data[:end - self.capacity].tolist()
+
+
+@dataclass(slots=True, frozen=True)
+class SeriesStats:
+    """窗口统计结果"""
+
+    count: int
+    minimum: float
+    average: float
+    p95: float
+    maximum: float
+    last: float
+
+
+class AppSeries:
+    """单个应用的资源时间序列"""
+
+    def __init__(self, capacity: int):
+        self.timestamps = RingBuffer(capacity)
+        self.metrics = {metric: RingBuffer(capacity) for metric in Metric}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def push(self, timestamp: float, values: dict[Metric, float]) -> None:
+        self.timestamps.push(timestamp)
+        for metric, buffer in self.metrics.items():
+            buffer.push(values[metric])
+
+    def window_size(self, seconds: float | None) -> int:
+        """最近 seconds 秒内的样本数，None 表示全部"""
+        size = len(self.timestamps)
+        if seconds is None or not size:
+            return size
+        cutoff = self.timestamps.last() - seconds
+        # 时间戳单调递增，直接在环形缓冲区上二分查找窗口起点
+        return size - bisect_left(self.timestamps, cutoff)
+
+    def stats(self, metric: Metric, seconds: float | None = None) -> SeriesStats | None:
+        buffer = self.metrics[metric]
+        n = self.window_size(seconds)
+        if not n:
+            return None
+        values = buffer.tail(n)
+        average = buffer.mean() if n == len(buffer) else math.fsum(values) / n
+        ordered = sorted(values)
+        p95 = ordered[min(n - 1, math.ceil(0.95 * n) - 1)]
+        return SeriesStats(n, ordered[0], average, p95, ordered[-1], values[-1])
+
+
+class ResourceMonitor:
+    """托管应用的资源采样器。
+
+    按固定间隔为注册表中的每个应用采样一次 RSS / USS / CPU / 线程数 / 句柄数，
+    使用 Process.oneshot() 合并系统调用，并写入每个应用的环形缓冲区。
+    UI 刷新时直接读取历史数据，不再重新查询操作系统。
+    """
+
+    def __init__(
+            self,
+            registry: ProcessRegistry = process_registry,
+            interval: float | None = None,
+            capacity: int | None = None,
+    ):
+        # interval / capacity 为 None 时在使用时读取配置（Monitor 组）
+        self.registry = registry
+        self.interval = interval
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._series: dict[str, AppSeries] = {}
+        # USS 读取失败（权限不足）的进程不再重复尝试
+        self._no_uss: weakref.WeakSet[psutil.Process] = weakref.WeakSet()
+
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def _read(self, proc: psutil.Process) -> dict[Metric, float]:
+        with proc.oneshot():
+            if proc in self._no_uss:
+                rss = uss = proc.memory_info().rss
+            else:
+                try:
+                    full = proc.memory_full_info()
+                    rss, uss = full.rss, full.uss
+                except psutil.AccessDenied:
+                    self._no_uss.add(proc)
+                    rss = uss = proc.memory_info().rss
+            cpu = proc.cpu_percent(None)
+            threads = proc.num_threads()
+            try:
+                handles = proc.num_handles() if hasattr(proc, "num_handles") else proc.num_fds()
+            except psutil.AccessDenied:
+                handles = 0
+        return {
+            Metric.RSS: rss,
+            Metric.USS: uss,
+            Metric.CPU: cpu,
+            Metric.THREADS: threads,
+            Metric.HANDLES: handles,
+        }
+
+    def sample(self) -> None:
+        """为所有目标采样一次"""
+        running = self.registry.refresh()
+        now = time.time()
+        for target, pids in running.items():
+            # 未运行的应用不记录样本，否则窗口统计会被 0 拉低
+            if not pids:
+                continue
+            totals = dict.fromkeys(Metric, 0.0)
+            sampled = False
+            for proc in self.registry.processes(target):
+                try:
+                    first = proc not in _primed
+                    values = self._read(proc)
+                    _primed.add(proc)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                if first:
+                    # 首次 cpu_percent() 恒为 0，不计入
+                    values[Metric.CPU] = 0.0
+                for metric, value in values.items():
+                    totals[metric] += value
+                sampled = True
+            if not sampled:
+                # 进程在采样期间全部退出
+                continue
+
+            with self._lock:
+                series = self._series.get(target)
+                if series is None:
+                    capacity = self.capacity or cfg.monitor_history_size.value
+                    series = self._series[target] = AppSeries(capacity)
+                series.push(now, totals)
+
+    def stats(self, path: str, metric: Metric, seconds: float | None = None) -> SeriesStats | None:
+        """查询某个应用在最近 seconds 秒内某指标的 min/avg/p95/max/last"""
+        with self._lock:
+            series = self._series.get(path)
+            return series.stats(metric, seconds) if series else None
+
+    def history(self, path: str, metric: Metric, n: int | None = None) -> list[tuple[float, float]]:
+        """返回最近 n 个 (时间戳, 值)"""
+        with self._lock:
+            series = self._series.get(path)
+            if series is None:
+                return []
+            return list(zip(series.timestamps.tail(n), series.metrics[metric].tail(n)))
+
+    # ---- 后台采样 ----
+
+    def start(self, interval: float | None = None) -> None:
+        if interval is not None:
+            self.interval = interval
+        elif self.interval is None:
+            self.interval = cfg.monitor_interval.value
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception:  # noqa: BLE001
+                logger.exception("资源采样失败")
+            self._stop_event.wait(self.interval)
+
+
+resource_monitor = ResourceMonitor()
@@ -0,0 +1,273 @@
+import json
+import threading
+from collections.abc import Callable
+from enum import Enum
+from pathlib import Path
+
+from loguru import logger
+
+# 不依赖 Qt 的配置项，接口与 qfluentwidgets 的 ConfigItem / QConfig 一致：
+# 核心模块与无界面模式（python -m src.daemon）只导入本模块，不会载入 Qt
+
+
+class ValueChanged:
+    """配置项值变化的通知，接口与 pyqtSignal 相同（connect / disconnect / emit）。
+
+    回调在修改值的线程中同步执行，与未指定接收对象的 Qt 信号连接行为一致
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots: list[Callable[[object], None]] = []
+
+    def connect(self, slot: Callable[[object], None]) -> None:
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self, slot: Callable[[object], None] | None = None) -> None:
+        with self._lock:
+            if slot is None:
+                self._slots.clear()
+            elif slot in self._slots:
+                self._slots.remove(slot)
+
+    def emit(self, value: object) -> None:
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            try:
+                slot(value)
+            except Exception:  # noqa: BLE001
+                logger.exception("配置项回调出错")
+
+
+class ConfigValidator:
+    """配置值校验器"""
+
+    def validate(self, value) -> bool:
+        return True
+
+    def correct(self, value):
+        return value
+
+
+class RangeValidator(ConfigValidator):
+    """范围校验器"""
+
+    def __init__(self, min, max):
+        self.min = min
+        self.max = max
+        self.range = (min, max)
+
+    def validate(self, value) -> bool:
+        return self.min <= value <= self.max
+
+    def correct(self, value):
+        return min(max(self.min, value), self.max)
+
+
+class OptionsValidator(ConfigValidator):
+    """选项校验器，不在选项中的值改为第一个选项"""
+
+    def __init__(self, options):
+        if not options:
+            raise ValueError("选项不能为空")
+        if isinstance(options, type) and issubclass(options, Enum):
+            options = list(options)
+        self.options = list(options)
+
+    def validate(self, value) -> bool:
+        return value in self.options
+
+    def correct(self, value):
+        return value if self.validate(value) else self.options[0]
+
+
+class BoolValidator(OptionsValidator):
+    """布尔值校验器"""
+
+    def __init__(self):
+        super().__init__([True, False])
+
+
+class ConfigSerializer:
+    """配置值序列化器"""
+
+    def serialize(self, value):
+        return value
+
+    def deserialize(self, value):
+        return value
+
+
+class EnumSerializer(ConfigSerializer):
+    """枚举序列化器"""
+
+    def __init__(self, enum_class: type[Enum]):
+        self.enum_class = enum_class
+
+    def serialize(self, value):
+        return value.value
+
+    def deserialize(self, value):
+        return self.enum_class(value)
+
+
+class ConfigItem:
+    """配置项"""
+
+    def __init__(self, group: str, name: str, default, validator: ConfigValidator | None = None,
+                 serializer: ConfigSerializer | None = None, restart: bool = False):
+        """
+        Parameters:
+            group: 配置组名
+            name: 配置项名，可以为空
+            default: 默认值
+            validator: 校验器
+            serializer: 序列化器
+            restart: 修改后是否需要重启程序
+        """
+        self.group = group
+        self.name = name
+        self.validator = validator or ConfigValidator()
+        self.serializer = serializer or ConfigSerializer()
+        self.restart = restart
+        self.valueChanged = ValueChanged()
+        self._value = self.validator.correct(default)
+        self.defaultValue = self._value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, v):
+        v = self.validator.correct(v)
+        old, self._value = self._value, v
+        if old != v:
+            self.valueChanged.emit(v)
+
+    @property
+    def key(self) -> str:
+        """以 . 分隔的配置键"""
+        return f"{self.group}.{self.name}" if self.name else self.group
+
+    def __str__(self):
+        return f"{self.__class__.__name__}[value={self.value}]"
+
+    def serialize(self):
+        return self.serializer.serialize(self.value)
+
+    def deserializeFrom(self, value) -> None:
+        self.value = self.serializer.deserialize(value)
+
+
+class RangeConfigItem(ConfigItem):
+    """范围配置项"""
+
+    @property
+    def range(self) -> tuple:
+        return self.validator.range
+
+    def __str__(self):
+        return f"{self.__class__.__name__}[range={self.range}, value={self.value}]"
+
+
+class OptionsConfigItem(ConfigItem):
+    """选项配置项"""
+
+    @property
+    def options(self) -> list:
+        return self.validator.options
+
+    def __str__(self):
+        return f"{self.__class__.__name__}[options={self.options}, value={self.value}]"
+
+
+class BaseConfig:
+    """配置基类：类属性中的 ConfigItem 即为配置项，按 组.名称 存入 JSON 文件。
+
+    读取时保留文件中不属于任何配置项的组（例如旧版本由 qfluentwidgets 写入的 QFluentWidgets 组），
+    保存时原样写回
+    """
+
+    def __init__(self, path: Path):
+        self.file = path
+        self._extra: dict = {}
+
+    @classmethod
+    def items(cls) -> dict[str, ConfigItem]:
+        """配置键 -> 配置项，按定义顺序"""
+        items = {}
+        for klass in reversed(cls.__mro__):
+            for value in vars(klass).values():
+                if isinstance(value, ConfigItem):
+                    items[value.key] = value
+        return items
+
+    def get(self, item: ConfigItem):
+        return item.value
+
+    def set(self, item: ConfigItem, value, save: bool = True) -> None:
+        if item.value == value:
+            return
+        item.value = value
+        if save:
+            self.save()
+
+    def toDict(self, serialize: bool = True) -> dict:
+        """配置项转换为 dict"""
+        result = {group: dict(values) if isinstance(values, dict) else values for group, values in self._extra.items()}
+        for item in self.items().values():
+            value = item.serialize() if serialize else item.value
+            if not item.name:
+                result[item.group] = value
+                continue
+            group = result.get(item.group)
+            if not isinstance(group, dict):
+                group = result[item.group] = {}
+            group[item.name] = value
+        return result
+
+    def save(self) -> None:
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.file, "w", encoding="utf-8") as f:
+            json.dump(self.toDict(), f, ensure_ascii=False, indent=4)
+
+    def load(self, file: str | Path | None = None) -> None:
+        """从文件读取配置，文件不存在或损坏时保持默认值"""
+        if file is not None:
+            self.file = Path(file)
+        try:
+            with open(self.file, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取配置文件失败，使用默认配置: {e}")
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+
+        items = self.items()
+        groups = {item.group for item in items.values()}
+        self._extra = {}
+        for group, values in data.items():
+            if group not in groups:
+                self._extra[group] = values
+                continue
+            if not isinstance(values, dict):
+                if group in items:
+                    self._deserialize(items[group], values)
+                continue
+            for name, value in values.items():
+                item = items.get(f"{group}.{name}")
+                if item is not None:
+                    self._deserialize(item, value)
+
+    @staticmethod
+    def _deserialize(item: ConfigItem, value) -> None:
+        try:
+            item.deserializeFrom(value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"配置项 {item.key} 的值无效，保持原值: {e}")
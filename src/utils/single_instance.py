@@ -0,0 +1,205 @@
+import getpass
+import json
+import os
+import re
+import socket
+import tempfile
+import time
+from collections.abc import Sequence
+from typing import BinaryIO
+
+# 本模块只依赖标准库：第二次启动时在导入 Qt 之前完成检查与转发
+
+# 实例名，可用环境变量 SWARM_INSTANCE_NAME 覆盖（例如同时运行开发版与正式版）
+SERVER_NAME = os.environ.get("SWARM_INSTANCE_NAME", "swarmToolbox")
+# 等待运行中的实例回复的时间（秒）
+REPLY_TIMEOUT = 2.0
+# Windows 命名管道全部占用时的重试时间（秒）
+PIPE_BUSY_RETRY = 0.5
+# 单条消息的最大字节数
+MAX_MESSAGE = 64 * 1024
+# CreateMutexW 打开已存在的互斥量时的错误码
+ERROR_ALREADY_EXISTS = 183
+
+
+def _user() -> str:
+    try:
+        name = getpass.getuser()
+    except (KeyError, OSError):
+        name = str(os.getuid()) if hasattr(os, "getuid") else "user"
+    return re.sub(r"[^0-9A-Za-z_.-]", "_", name) or "user"
+
+
+def server_address() -> str:
+    """本用户的实例地址：POSIX 为 Unix 套接字文件的完整路径，Windows 为命名管道名。
+
+    与 QLocalServer.listen 使用同一地址，每个用户各自一个实例
+    """
+    name = f"{SERVER_NAME}-{_user()}"
+    if os.name == "nt":
+        return name
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    base = runtime if runtime and os.path.isdir(runtime) else tempfile.gettempdir()
+    return os.path.join(base, f"{name}.sock")
+
+
+class InstanceLock:
+    """本用户实例的互斥锁，由监听中的实例在整个运行期间持有。
+
+    POSIX 为套接字旁边的 .lock 文件上的 flock，Windows 为同名的命名互斥量；
+    进程退出（包括崩溃）时由系统释放，因此持有锁的一方可以安全地删除残留的套接字文件
+    """
+
+    def __init__(self, address: str | None = None):
+        self.address = address or server_address()
+        self._handle = None
+
+    def acquire(self) -> bool:
+        """尝试获取锁（不等待），已被其他进程持有时返回 False"""
+        if self._handle is not None:
+            return True
+        if os.name == "nt":
+            import ctypes
+
+            kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            handle = kernel32.CreateMutexW(None, False, f"Local\\{self.address}")
+            if not handle:
+                return False
+            if ctypes.get_last_error() == ERROR_ALREADY_EXISTS:
+                kernel32.CloseHandle(handle)
+                return False
+        else:
+            import fcntl
+
+            # os.open 打开的描述符不会被启动的托管应用继承
+            handle = os.open(f"{self.address}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(handle)
+                return False
+        self._handle = handle
+        return True
+
+    def release(self) -> None:
+        if self._handle is None:
+            return
+        if os.name == "nt":
+            import ctypes
+
+            ctypes.WinDLL("kernel32").CloseHandle(self._handle)
+        else:
+            # 不删除锁文件：删除后其他进程可能锁住不同的文件
+            os.close(self._handle)
+        self._handle = None
+
+
+def encode_message(message: dict) -> bytes:
+    """消息为一行 UTF-8 JSON"""
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode_message(data: bytes) -> dict:
+    """解析一行消息
+
+    Raises:
+        ValueError: 不是有效的 JSON
+        TypeError: 不是 JSON 对象
+    """
+    message = json.loads(data.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise TypeError("消息必须是 JSON 对象")
+    return message
+
+
+def _read_line(recv) -> bytes:
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = recv(4096)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_MESSAGE:
+            raise ValueError("消息过长")
+    return data
+
+
+def _send_unix(address: str, request: bytes, timeout: float) -> bytes:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall(request)
+        return _read_line(sock.recv)
+
+
+def _open_pipe(path: str, timeout: float) -> BinaryIO:
+    deadline = time.monotonic() + min(timeout, PIPE_BUSY_RETRY)
+    while True:
+        try:
+            return open(path, "r+b", buffering=0)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # ERROR_PIPE_BUSY：服务端正在处理其他连接
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.01)
+
+
+def _send_pipe(address: str, request: bytes, timeout: float) -> bytes:
+    with _open_pipe(rf"\\.\pipe\{address}", timeout) as pipe:
+        pipe.write(request)
+        return _read_line(pipe.read)
+
+
+def instance_running() -> bool:
+    """是否有实例正在监听本用户的地址。
+
+    只建立连接、不发送命令：监听中的实例即使还没有进入事件循环（仍在启动）也能被检测到
+    """
+    address = server_address()
+    try:
+        if os.name == "nt":
+            with open(rf"\\.\pipe\{address}", "r+b", buffering=0):
+                pass
+        else:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(REPLY_TIMEOUT)
+                sock.connect(address)
+    except FileNotFoundError:
+        return False
+    except ConnectionRefusedError:
+        # 残留的套接字文件
+        return False
+    except OSError:
+        # 管道全部占用等：有实例在运行
+        return True
+    return True
+
+
+def send_command(command: str, args: Sequence[str] = (), timeout: float = REPLY_TIMEOUT) -> tuple[bool, str] | None:
+    """把命令转发给本用户正在运行的实例。
+
+    Parameters:
+        command: 命令名，如 "activate"（激活窗口）、"launch"（启动程序）
+        args: 命令参数
+        timeout: 等待回复的时间（秒）
+
+    Returns:
+        没有正在运行的实例（或残留的套接字文件）时返回 None，否则返回 (是否成功, 回复信息)
+    """
+    request = encode_message({"command": command, "args": list(args)})
+    address = server_address()
+    try:
+        if os.name == "nt":
+            data = _send_pipe(address, request, timeout)
+        else:
+            data = _send_unix(address, request, timeout)
+    except OSError:
+        # 地址不存在、残留的套接字文件（连接被拒绝），或实例无响应（卡死、正在退出），都按没有实例处理
+        return None
+    try:
+        reply = decode_message(data)
+    except (ValueError, TypeError):
+        return None
+    return bool(reply.get("ok")), str(reply.get("message", ""))
@@ -0,0 +1,290 @@
+import bisect
+import heapq
+import json
+import math
+import re
+import struct
+import threading
+import unicodedata
+import zlib
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.utils.atomic_io import atomic_write_bytes
+
+# 索引文件格式: MAGIC + 元数据长度 + zlib(JSON 元数据) + 各词项的文档 ID 数组 + 权重数组
+MAGIC = b"SWTIDX1\0"
+# 前缀查询最多展开的词项数
+MAX_PREFIX_TERMS = 2000
+# 标题中的词项权重高于正文
+TITLE_WEIGHT = 3
+
+_TOKEN_RE = re.compile(
+    r"[0-9a-z]+"
+    r"|[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿]+"
+)
+
+
+def _is_cjk(token: str) -> bool:
+    return not ("0" <= token[0] <= "9" or "a" <= token[0] <= "z")
+
+
+def tokenize(text: str, unigrams: bool = False) -> list[str]:
+    """分词：拉丁字母与数字按单词切分，CJK 文字按相邻两字切分（单字保留单字）。
+
+    先做 NFKC 规范化与大小写折叠，全角字母、大小写都能互相匹配。
+    unigrams=True 时 CJK 文字额外输出单字（建索引时使用，使单字查询也能命中词中间的字）
+    """
+    tokens = []
+    for run in _TOKEN_RE.findall(unicodedata.normalize("NFKC", text).casefold()):
+        if not _is_cjk(run) or len(run) == 1:
+            tokens.append(run)
+            continue
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        if unigrams:
+            tokens.extend(run)
+    return tokens
+
+
+@dataclass(slots=True, frozen=True)
+class SearchHit:
+    key: str
+    score: float
+
+
+class TextIndex:
+    """倒排索引，支持增量添加、前缀匹配与相关度排序。
+
+    每个词项对应按文档 ID 递增的 ID 数组和权重数组（array，内存紧凑）；
+    更新或删除文档只标记旧 ID 失效，失效过多时在保存前压缩。
+    查询时所有词项取交集，最后一个拉丁词项按前缀匹配（边输入边搜索），
+    得分为 Σ 权重 × IDF，同分时较新加入的文档在前
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._keys: list[str | None] = []  # 文档 ID -> key，已删除为 None
+        self._ids: dict[str, int] = {}
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._sorted_terms: list[str] | None = None
+        self._deleted = 0
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+
+    def keys(self, prefix: str = "") -> list[str]:
+        with self._lock:
+            return [key for key in self._ids if key.startswith(prefix)]
+
+    # ---- 写入 ----
+
+    def add(self, key: str, title: str, body: str = "") -> None:
+        """添加或更新文档"""
+        weights = Counter()
+        for token in tokenize(title, unigrams=True):
+            weights[token] += TITLE_WEIGHT
+        for token in tokenize(body, unigrams=True):
+            weights[token] += 1
+
+        with self._lock:
+            self._remove(key)
+            doc = len(self._keys)
+            self._keys.append(key)
+            self._ids[key] = doc
+            for term, weight in weights.items():
+                entry = self._postings.get(term)
+                if entry is None:
+                    entry = self._postings[term] = (array("I"), array("H"))
+                    self._sorted_terms = None
+                entry[0].append(doc)
+                entry[1].append(min(weight, 0xFFFF))
+            self.dirty = True
+
+    def remove(self, key: str) -> bool:
+        with self._lock:
+            removed = self._remove(key)
+            self.dirty |= removed
+            return removed
+
+    def _remove(self, key: str) -> bool:
+        doc = self._ids.pop(key, None)
+        if doc is None:
+            return False
+        self._keys[doc] = None
+        self._deleted += 1
+        return True
+
+    def compact(self) -> None:
+        """重新编号，去掉已删除文档占用的空间"""
+        with self._lock:
+            if not self._deleted:
+                return
+            remap = array("i", [-1]) * len(self._keys)
+            keys = []
+            for doc, key in enumerate(self._keys):
+                if key is not None:
+                    remap[doc] = len(keys)
+                    keys.append(key)
+            postings = {}
+            for term, (docs, weights) in self._postings.items():
+                new_docs, new_weights = array("I"), array("H")
+                for doc, weight in zip(docs, weights):
+                    if remap[doc] >= 0:
+                        new_docs.append(remap[doc])
+                        new_weights.append(weight)
+                if new_docs:
+                    postings[term] = (new_docs, new_weights)
+            self._keys = keys
+            self._ids = {key: doc for doc, key in enumerate(keys)}
+            self._postings = postings
+            self._sorted_terms = None
+            self._deleted = 0
+
+    # ---- 查询 ----
+
+    def _expand(self, token: str, prefix: bool) -> list[str]:
+        if not prefix:
+            return [token] if token in self._postings else []
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        terms = self._sorted_terms
+        start = bisect.bisect_left(terms, token)
+        end = bisect.bisect_left(terms, token + "\U0010ffff", start)
+        return terms[start:min(end, start + MAX_PREFIX_TERMS)]
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """搜索，返回按相关度排序的前 limit 个结果"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        with self._lock:
+            # 每个查询词项展开为一组索引词项（前缀匹配时可能有多个）
+            groups: list[list[str]] = []
+            for i, token in enumerate(tokens):
+                # 最后一个拉丁词项按前缀匹配；CJK 的二元组和单字本身已覆盖输入中途的情况
+                prefix = i == len(tokens) - 1 and not _is_cjk(token)
+                terms = self._expand(token, prefix)
+                if not terms:
+                    return []
+                groups.append(terms)
+            # 从文档最少的一组开始，其余各组只需检查已有的候选文档
+            groups.sort(key=lambda terms: sum(len(self._postings[t][0]) for t in terms))
+
+            keys = self._keys
+            live = len(self._ids) or 1
+            if len(groups) == 1 and len(groups[0]) == 1:
+                top = self._top_single(groups[0][0], limit)
+                if top is not None:
+                    idf = math.log(1 + live / len(self._postings[groups[0][0]][0]))
+                    return [SearchHit(keys[doc], weight * idf) for weight, doc in top]
+
+            result: dict[int, float] = {}
+            for term in groups[0]:
+                docs, weights = self._postings[term]
+                idf = math.log(1 + live / len(docs))
+                for doc, weight in zip(docs, weights):
+                    result[doc] = result.get(doc, 0.0) + weight * idf
+            for terms in groups[1:]:
+                scores: dict[int, float] = {}
+                for term in terms:
+                    docs, weights = self._postings[term]
+                    idf = math.log(1 + live / len(docs))
+                    if len(docs) > 8 * len(result):
+                        # 候选远少于倒排表长度时，在有序的文档 ID 数组中二分查找
+                        for doc in result:
+                            pos = bisect.bisect_left(docs, doc)
+                            if pos < len(docs) and docs[pos] == doc:
+                                scores[doc] = scores.get(doc, 0.0) + weights[pos] * idf
+                    else:
+                        for doc, weight in zip(docs, weights):
+                            if doc in result:
+                                scores[doc] = scores.get(doc, 0.0) + weight * idf
+                result = {doc: score + result[doc] for doc, score in scores.items()}
+                if not result:
+                    return []
+            top = heapq.nlargest(
+                limit,
+                ((score, doc) for doc, score in result.items() if keys[doc] is not None),
+            )
+            return [SearchHit(keys[doc], score) for score, doc in top]
+
+    def _top_single(self, term: str, limit: int) -> list[tuple[int, int]] | None:
+        """单个词项的查询：得分只取决于权重，直接在倒排表上取前 limit 个。
+        结果中含有已删除的文档时返回 None，交给通用流程处理
+        """
+        docs, weights = self._postings[term]
+        top = heapq.nlargest(limit, zip(weights, docs))
+        if any(self._keys[doc] is None for _, doc in top):
+            return None
+        return top
+
+    # ---- 持久化 ----
+
+    def save(self, path: Path) -> None:
+        """原子写入索引文件，失效文档较多时先压缩"""
+        with self._lock:
+            if self._deleted > len(self._ids) // 5:
+                self.compact()
+            terms = list(self._postings)
+            meta = {
+                "keys": self._keys,
+                "terms": terms,
+                "counts": [len(self._postings[t][0]) for t in terms],
+            }
+            blobs = [self._postings[t][0].tobytes() for t in terms]
+            blobs += [self._postings[t][1].tobytes() for t in terms]
+            self.dirty = False
+        header = zlib.compress(json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 1)
+        try:
+            atomic_write_bytes(path, b"".join([MAGIC, struct.pack("<Q", len(header)), header, *blobs]))
+        except OSError:
+            self.dirty = True
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> "TextIndex":
+        """读取索引文件
+
+        Raises:
+            OSError: 文件无法读取
+            ValueError: 文件格式错误
+        """
+        data = Path(path).read_bytes()
+        if not data.startswith(MAGIC):
+            raise ValueError("不是有效的索引文件")
+        offset = len(MAGIC)
+        (length,) = struct.unpack_from("<Q", data, offset)
+        offset += 8
+        try:
+            meta = json.loads(zlib.decompress(data[offset:offset + length]))
+        except zlib.error as e:
+            raise ValueError(f"索引文件已损坏: {e}") from e
+        offset += length
+
+        index = cls()
+        terms, counts = meta["terms"], meta["counts"]
+        view = memoryview(data)
+        id_arrays = []
+        for count in counts:
+            docs = array("I")
+            docs.frombytes(view[offset:offset + count * docs.itemsize])
+            offset += count * docs.itemsize
+            id_arrays.append(docs)
+        for term, count, docs in zip(terms, counts, id_arrays):
+            weights = array("H")
+            weights.frombytes(view[offset:offset + count * weights.itemsize])
+            offset += count * weights.itemsize
+            index._postings[term] = (docs, weights)
+        if offset != len(data):
+            raise ValueError("索引文件长度不符")
+
+        index._keys = meta["keys"]
+        index._ids = {key: doc for doc, key in enumerate(index._keys) if key is not None}
+        index._deleted = len(index._keys) - len(index._ids)
+        return index